@@ -0,0 +1,209 @@
+"""
+Calculator generation benchmark suite
+Builds the calculator for synthetic catalogs and order books of several
+sizes and records, per combination:
+
+- generation wall time (build + fill orders + save) and peak RSS
+- xlsx size, in total and per sheet (compressed and uncompressed)
+- formula count per sheet, and the generator's per-stage profile
+- recalculation time with a local formula engine (pycel, optional):
+  cold evaluation of the Order Calculator total and re-evaluation after a
+  package price edit
+
+Each combination runs in a fresh interpreter. Results are written as JSON
+so runs from different commits can be compared with --compare.
+
+Usage:
+    python Reports/benchmarks/generation_benchmark.py [--recipes 6 60 600] [--orders 20 1000 100000]
+        [-o results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+REPORTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RECIPES = [6, 60, 600]
+DEFAULT_ORDERS = [20, 1_000, 100_000]
+# pycel compiles every formula it touches, which gets slow past a few thousand orders
+DEFAULT_RECALC_MAX_ORDERS = 1_000
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+# Metrics shown by --compare (lower is better for all of them)
+COMPARED = ("seconds", "peak_rss_mib", "bytes", "formulas", "recalc_cold_s", "recalc_s")
+
+
+def _peak_rss_mib():
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _sheet_stats(path):
+    from formula_engine import sheet_parts
+
+    with zipfile.ZipFile(path) as zf:
+        parts = sheet_parts(zf)
+        sheets = {}
+        for title, part in parts.items():
+            info = zf.getinfo(part)
+            sheets[title] = {
+                "bytes": info.compress_size,
+                "xml_bytes": info.file_size,
+                "formulas": zf.read(part).count(b"<f>"),
+            }
+    return sheets
+
+
+def _recalc(path, count, price):
+    from recalc_benchmark import load_compiler
+
+    xl = load_compiler(path)
+    total_cell = f"'Order Calculator'!G{count + 5}"
+    start = time.perf_counter()
+    xl.evaluate(total_cell)
+    cold = time.perf_counter() - start
+
+    xl.set_value("'Ingredient Prices'!D5", price + 1)
+    start = time.perf_counter()
+    xl.evaluate(total_cell)
+    return cold, time.perf_counter() - start
+
+
+def _child(n_recipes, n_orders, recalc):
+    sys.path.insert(0, REPORTS_DIR)
+    from generate_cookie_calculator import build_workbook
+    from synthetic import synthetic_catalog, synthetic_orders
+
+    catalog = synthetic_catalog(n_recipes)
+    orders = synthetic_orders(catalog, n_orders)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        profile = {}
+        start = time.perf_counter()
+        wb = build_workbook(catalog, order_count=n_orders, profile=profile, orders=orders)
+        save_start = time.perf_counter()
+        wb.save(path)
+        seconds = time.perf_counter() - start
+        save_seconds = time.perf_counter() - save_start
+        del wb
+
+        # Peak RSS of generation alone, before the formula engine loads the file
+        peak_rss = _peak_rss_mib()
+        sheets = _sheet_stats(path)
+        result = {
+            "recipes": n_recipes,
+            "orders": n_orders,
+            "seconds": round(seconds, 3),
+            "peak_rss_mib": round(peak_rss, 1),
+            "bytes": os.path.getsize(path),
+            "formulas": sum(s["formulas"] for s in sheets.values()),
+            "sheets": sheets,
+            "stages": [dict(st, seconds=round(st["seconds"], 4)) for st in profile["stages"]],
+            "save_seconds": round(save_seconds, 3),
+            "recalc_cold_s": None,
+            "recalc_s": None,
+        }
+        if recalc:
+            cold, warm = _recalc(path, n_orders, catalog.ingredients[0].package_price)
+            result["recalc_cold_s"] = round(cold, 4)
+            result["recalc_s"] = round(warm, 4)
+
+    print(json.dumps(result))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPORTS_DIR,
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(recipes_list, orders_list, recalc_max_orders):
+    try:
+        import pycel  # noqa: F401
+        has_engine = True
+    except ImportError:
+        has_engine = False
+
+    results = []
+    for n_recipes in recipes_list:
+        for n_orders in orders_list:
+            recalc = has_engine and n_orders <= recalc_max_orders
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child",
+                 str(n_recipes), str(n_orders), str(int(recalc))],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "formula_engine": "pycel" if has_engine else None,
+        "results": results,
+    }
+
+
+def compare(report, baseline):
+    """Print each metric's ratio to the matching baseline run."""
+    base = {(r["recipes"], r["orders"]): r for r in baseline["results"]}
+    print(f"vs {baseline.get('commit') or 'baseline'} (ratio current/baseline, < 1 is better)")
+    print(f"{'recipes':>8} {'orders':>8}  " + " ".join(f"{m:>14}" for m in COMPARED))
+    for r in report["results"]:
+        old = base.get((r["recipes"], r["orders"]))
+        if old is None:
+            continue
+        cells = []
+        for metric in COMPARED:
+            if r[metric] is None or not old.get(metric):
+                cells.append(f"{'-':>14}")
+            else:
+                cells.append(f"{r[metric] / old[metric]:>14.2f}")
+        print(f"{r['recipes']:>8} {r['orders']:>8}  " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, nargs="+", default=DEFAULT_RECIPES)
+    parser.add_argument("--orders", type=int, nargs="+", default=DEFAULT_ORDERS)
+    parser.add_argument("--recalc-max-orders", type=int, default=DEFAULT_RECALC_MAX_ORDERS,
+                        help="skip formula-engine recalculation above this many orders")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="results JSON path")
+    parser.add_argument("--compare", metavar="JSON", help="baseline results to compare against")
+    parser.add_argument("--child", nargs=3, metavar=("RECIPES", "ORDERS", "RECALC"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(int(args.child[0]), int(args.child[1]), args.child[2] == "1")
+        return
+
+    report = run(args.recipes, args.orders, args.recalc_max_orders)
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+        fh.write("\n")
+
+    print(f"{'recipes':>8} {'orders':>8}  {'wall (s)':>9} {'peak RSS (MiB)':>15} {'size (KiB)':>11}"
+          f" {'formulas':>9} {'recalc (s)':>11}")
+    for r in report["results"]:
+        recalc = "-" if r["recalc_s"] is None else f"{r['recalc_s']:.3f}"
+        print(f"{r['recipes']:>8} {r['orders']:>8}  {r['seconds']:>9.2f} {r['peak_rss_mib']:>15.1f}"
+              f" {r['bytes'] / 1024:>11.0f} {r['formulas']:>9} {recalc:>11}")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(report, json.load(fh))
+
+
+if __name__ == "__main__":
+    main()
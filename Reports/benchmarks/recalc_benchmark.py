@@ -0,0 +1,134 @@
+"""
+Order Calculator recalculation benchmark
+Measures how long a formula engine takes to re-evaluate the Order Calculator
+totals after a package price edit, for the Recipe Costs lookup and for the
+legacy per-row SUMPRODUCT/VLOOKUP array formula
+
+Needs pycel (pip install pycel) as a local formula engine.
+
+Usage:
+    python Reports/benchmarks/recalc_benchmark.py [--orders 100 1000 3000] [--no-legacy]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPORTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPORTS_DIR)
+
+from catalog import load_catalog
+from generate_cookie_calculator import ORDER_HEADERS, ORDER_TABLE, build_workbook
+
+DEFAULT_ORDERS = [100, 1_000, 3_000]
+
+# Est. Cost formula used before the Recipe Costs helper sheet existed
+LEGACY_COST_FORMULA = (
+    '=IFERROR(IF(F{row}="","",F{row}*SUMPRODUCT((\'Recipe Database\'!A$4:A$100=B{row})'
+    '*(\'Recipe Database\'!F$4:F$100)*VLOOKUP(\'Recipe Database\'!E$4:E$100,'
+    '\'Ingredient Prices\'!A:E,5,FALSE))),"")'
+)
+
+
+def _fill_orders(wb, catalog, count, legacy):
+    ws = wb["Order Calculator"]
+    names = [rec.name for rec in catalog.recipes]
+    for i in range(count):
+        row = 5 + i
+        ws.cell(row=row, column=2, value=names[i % len(names)])
+        ws.cell(row=row, column=3, value=12 + i % 50)
+        ws.cell(row=row, column=4, value=40 + i % 30)
+        if legacy:
+            ws.cell(row=row, column=7).value = LEGACY_COST_FORMULA.format(row=row)
+
+
+def _pycel_column_names(wb):
+    """
+    pycel drops "$" from structured references, so the benchmark copy renames
+    Order Calculator table columns such as "Est. Cost ($)" to "Est. Cost"
+    and rewrites the formulas that refer to them.
+    """
+    renames = {name: name.replace(" ($)", "") for name in ORDER_HEADERS if "$" in name}
+    ws = wb["Order Calculator"]
+
+    def rename(text):
+        for old, new in renames.items():
+            text = text.replace(f"[{old}]", f"[{new}]")
+        return text
+
+    table = ws.tables[ORDER_TABLE]
+    for column in table.tableColumns:
+        column.name = renames.get(column.name, column.name)
+        if column.calculatedColumnFormula is not None:
+            column.calculatedColumnFormula.attr_text = rename(column.calculatedColumnFormula.attr_text)
+    for row in ws.iter_rows():
+        for cell in row:
+            if isinstance(cell.value, str):
+                cell.value = renames.get(cell.value) or rename(cell.value)
+
+
+def load_compiler(path):
+    """pycel ExcelCompiler for ``path`` with the workbook's defined names resolved."""
+    from pycel import ExcelCompiler
+
+    xl = ExcelCompiler(filename=path)
+    # pycel still reads defined names through the pre-3.1 openpyxl API
+    xl.excel._defined_names = {
+        name: [(alias, ws) for ws, alias in dn.destinations]
+        for name, dn in xl.excel.workbook.defined_names.items()
+    }
+    return xl
+
+
+def measure(catalog, count, legacy, edits=3):
+    wb = build_workbook(catalog, order_count=count)
+    _fill_orders(wb, catalog, count, legacy)
+    _pycel_column_names(wb)
+    total_cell = f"'Order Calculator'!G{count + 5}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recalc.xlsx")
+        wb.save(path)
+        xl = load_compiler(path)
+
+        start = time.perf_counter()
+        xl.evaluate(total_cell)
+        cold = time.perf_counter() - start
+
+        # Re-evaluate after editing a package price, as a user would
+        base_price = catalog.ingredients[0].package_price
+        warm = []
+        for k in range(edits):
+            xl.set_value("'Ingredient Prices'!D5", base_price + k + 1)
+            start = time.perf_counter()
+            xl.evaluate(total_cell)
+            warm.append(time.perf_counter() - start)
+
+    return {"orders": count, "formula": "legacy" if legacy else "recipe-costs",
+            "cold_s": cold, "recalc_s": min(warm)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=DEFAULT_ORDERS)
+    parser.add_argument("--no-legacy", action="store_true", help="skip the legacy array formula")
+    args = parser.parse_args()
+
+    try:
+        import pycel  # noqa: F401
+    except ImportError:
+        sys.exit("recalc_benchmark needs pycel: pip install pycel")
+
+    catalog = load_catalog()
+    print(f"{'orders':>7}  {'formula':<13} {'cold (s)':>9} {'recalc (s)':>11} {'recalc/order (µs)':>18}")
+    for count in args.orders:
+        for legacy in ((False,) if args.no_legacy else (False, True)):
+            r = measure(catalog, count, legacy)
+            print(f"{r['orders']:>7}  {r['formula']:<13} {r['cold_s']:>9.2f} {r['recalc_s']:>11.3f} "
+                  f"{r['recalc_s'] / count * 1e6:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
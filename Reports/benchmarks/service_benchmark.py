@@ -0,0 +1,152 @@
+"""
+Pricing service load test
+Starts pricing_service.py (or targets one already running with --url) and
+drives it with concurrent keep-alive clients for a fixed time, reporting
+requests per second and latency percentiles.
+
+Clients draw quotes from a pool of --keys distinct (recipe, qty, size)
+combinations, so the pool size sets the cache hit rate; --shopping-share of
+requests are shopping lists of a few orders. The service's cache counters
+are printed at the end.
+
+Client and server share the machine, so on a single core the numbers are a
+lower bound for the service.
+
+Usage:
+    python Reports/benchmarks/service_benchmark.py [-c 32] [--duration 5] [--keys 200]
+        [--shopping-share 0.1] [--url http://127.0.0.1:8765]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote_plus, urlsplit
+
+REPORTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPORTS_DIR)
+
+from catalog import load_catalog  # noqa: E402
+
+SIZES = (30, 45, 55, 85, 115)
+
+
+def request_targets(keys, seed=0):
+    """``keys`` distinct /quote targets and a few /shopping-list targets."""
+    rng = random.Random(seed)
+    names = [rec.name for rec in load_catalog().recipes]
+    quotes = set()
+    while len(quotes) < keys:
+        quotes.add((rng.choice(names), rng.randint(1, 1000), rng.choice(SIZES)))
+    quote_targets = [f"/quote?recipe={quote_plus(n)}&qty={q}&size={s}" for n, q, s in sorted(quotes)]
+    shopping_targets = []
+    for _ in range(20):
+        orders = [f"{rng.choice(names)}:{rng.randint(1, 500)}:{rng.choice(SIZES)}" for _ in range(5)]
+        shopping_targets.append("/shopping-list?" + "&".join(f"order={quote_plus(o)}" for o in orders))
+    return quote_targets, shopping_targets
+
+
+async def _fetch(reader, writer, host, target):
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line[:15].lower() == b"content-length:":
+            length = int(line[15:])
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def _client(host, port, targets, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, _ = await _fetch(reader, writer, host, rng.choice(targets))
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, concurrency, duration, targets):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(host, port, targets, deadline, latencies, errors, seed)
+                           for seed in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await _fetch(reader, writer, host, "/stats")
+    writer.close()
+    return latencies, errors, elapsed, json.loads(stats)
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def _start_service():
+    proc = subprocess.Popen([sys.executable, os.path.join(REPORTS_DIR, "pricing_service.py"), "--port", "0"],
+                            stdout=subprocess.PIPE, text=True, cwd=REPORTS_DIR)
+    line = proc.stdout.readline()
+    if "http://" not in line:
+        proc.kill()
+        sys.exit(f"service did not start: {line!r}")
+    address = urlsplit(line[line.index("http://"):].split()[0])
+    return proc, address.hostname, address.port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to run")
+    parser.add_argument("--keys", type=int, default=200, help="distinct quotes requested")
+    parser.add_argument("--shopping-share", type=float, default=0.1,
+                        help="fraction of requests that are shopping lists")
+    parser.add_argument("--url", help="test a running service instead of starting one")
+    args = parser.parse_args()
+
+    quote_targets, shopping_targets = request_targets(args.keys)
+    # Weighted pool: about shopping_share of the picks are shopping lists
+    n_shopping = round(len(quote_targets) * args.shopping_share / max(1e-9, 1 - args.shopping_share))
+    targets = quote_targets + [shopping_targets[i % len(shopping_targets)] for i in range(n_shopping)]
+
+    proc = None
+    if args.url:
+        address = urlsplit(args.url)
+        host, port = address.hostname, address.port
+    else:
+        proc, host, port = _start_service()
+    try:
+        latencies, errors, elapsed, stats = asyncio.run(
+            run_load(host, port, args.concurrency, args.duration, targets))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"{len(latencies):,} requests from {args.concurrency} clients in {elapsed:.1f} s "
+          f"({len(quote_targets)} quote keys, {args.shopping_share:.0%} shopping lists)")
+    print(f"  throughput  {len(latencies) / elapsed:>10,.0f} req/s")
+    print(f"  latency     p50 {_percentile(ms, 50):.2f} ms   p90 {_percentile(ms, 90):.2f} ms   "
+          f"p99 {_percentile(ms, 99):.2f} ms   max {ms[-1]:.2f} ms")
+    lookups = stats["hits"] + stats["misses"]
+    print(f"  quote cache {stats['hits']:,} hits / {stats['misses']:,} misses "
+          f"({stats['hits'] / lookups if lookups else 0:.1%} hit rate), {stats['size']} entries")
+    if errors:
+        print(f"\n❌ {len(errors)} non-200 responses")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+CLI startup benchmark
+Times `midnight.py quote` end to end (fresh interpreter each run) and checks
+that the quote path does not import openpyxl or NumPy.
+
+Each run is a separate process, so the numbers include interpreter startup
+and the catalog cache load, which is what a shell loop calling the CLI pays.
+costing.py (NumPy) is timed alongside for reference.
+
+Exits with status 1 if the median exceeds --budget-ms or a heavy module was
+imported, so it can be used as a regression check.
+
+Usage:
+    python Reports/benchmarks/startup_benchmark.py [-n 20] [--budget-ms 150]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPORTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUOTE_ARGS = ("Chocolate Chip", "300", "55")
+QUOTE_BUDGET_MS = 150
+HEAVY_MODULES = ("openpyxl", "numpy")
+
+
+def _time_runs(argv, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, check=True, capture_output=True, cwd=REPORTS_DIR)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "min_ms": timings[0],
+    }
+
+
+def heavy_imports(argv):
+    """Top-level packages from HEAVY_MODULES that ``argv`` imports."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime"] + argv[1:], check=True,
+                            capture_output=True, text=True, cwd=REPORTS_DIR).stderr
+    found = set()
+    for line in stderr.splitlines():
+        module = line.rsplit("|", 1)[-1].strip().split(".")[0]
+        if module in HEAVY_MODULES:
+            found.add(module)
+    return sorted(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=20, help="processes to time per command")
+    parser.add_argument("--budget-ms", type=float, default=QUOTE_BUDGET_MS,
+                        help="maximum median time for midnight.py quote")
+    args = parser.parse_args()
+
+    commands = {
+        "midnight.py quote": [sys.executable, os.path.join(REPORTS_DIR, "midnight.py"), "quote", *QUOTE_ARGS],
+        "costing.py": [sys.executable, os.path.join(REPORTS_DIR, "costing.py"), *QUOTE_ARGS],
+    }
+    # Warm the catalog cache so every timed run takes the same path
+    subprocess.run(commands["midnight.py quote"], check=True, capture_output=True, cwd=REPORTS_DIR)
+
+    print(f"{'command':<20} {'median (ms)':>12} {'p95 (ms)':>10} {'min (ms)':>10}")
+    results = {}
+    for name, argv in commands.items():
+        results[name] = r = _time_runs(argv, args.runs)
+        print(f"{name:<20} {r['median_ms']:>12.1f} {r['p95_ms']:>10.1f} {r['min_ms']:>10.1f}")
+
+    failed = False
+    heavy = heavy_imports(commands["midnight.py quote"])
+    if heavy:
+        print(f"\n❌ midnight.py quote imports {', '.join(heavy)}")
+        failed = True
+    median = results["midnight.py quote"]["median_ms"]
+    if median > args.budget_ms:
+        print(f"\n❌ midnight.py quote median {median:.1f} ms is over the {args.budget_ms:g} ms budget")
+        failed = True
+    if not failed:
+        print(f"\n✅ midnight.py quote: {median:.1f} ms median, no openpyxl/NumPy imports")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Streaming vs in-memory generation benchmark
+Compares peak RSS and wall time of create_cookie_calculator() in the regular
+and --streaming modes at increasing Order Calculator sizes
+
+Each measurement runs in a fresh interpreter so peak RSS is not polluted by
+earlier runs.
+
+Usage:
+    python Reports/benchmarks/streaming_benchmark.py [--rows 1000 10000 100000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPORTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ROWS = [1_000, 10_000, 100_000]
+
+
+def _child(mode, rows):
+    sys.path.insert(0, REPORTS_DIR)
+    from catalog import load_catalog
+    from generate_cookie_calculator import create_cookie_calculator
+
+    catalog = load_catalog()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        start = time.perf_counter()
+        create_cookie_calculator(catalog, filename=path, streaming=(mode == "streaming"),
+                                 order_rows=rows, verbose=False)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mib = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    print(json.dumps({"mode": mode, "rows": rows, "seconds": round(elapsed, 3),
+                      "peak_rss_mib": round(peak_mib, 1), "bytes": size}))
+
+
+def run(rows_list):
+    results = []
+    for rows in rows_list:
+        for mode in ("in-memory", "streaming"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, str(rows)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], int(args.child[1]))
+        return
+
+    results = run(args.rows)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'rows':>8}  {'mode':<10} {'wall (s)':>9} {'peak RSS (MiB)':>15} {'size (KiB)':>11}")
+    for r in results:
+        print(f"{r['rows']:>8}  {r['mode']:<10} {r['seconds']:>9.2f} {r['peak_rss_mib']:>15.1f} {r['bytes'] / 1024:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
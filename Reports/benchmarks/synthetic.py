@@ -0,0 +1,52 @@
+"""
+Synthetic catalogs and order books for the benchmarks
+
+Recipes are copies of the real ones (renamed "<name> #2", "#3", ...) with
+lightly varied amounts, so every synthetic catalog uses the real
+ingredient list and keeps realistic costs.
+"""
+
+import json
+import os
+import random
+import sys
+
+REPORTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPORTS_DIR not in sys.path:
+    sys.path.insert(0, REPORTS_DIR)
+
+from catalog import DATA_DIR, parse_catalog, source_paths
+
+STANDARD_SIZES = (30, 40, 48, 55, 75, 110)
+
+
+def synthetic_catalog(n_recipes, data_dir=DATA_DIR, seed=0):
+    """Catalog with ``n_recipes`` recipes derived from the real catalog."""
+    ingredients_path, recipes_path = source_paths(data_dir)
+    with open(ingredients_path, "rb") as fh:
+        ingredients_bytes = fh.read()
+    with open(recipes_path, encoding="utf-8") as fh:
+        base = json.load(fh)["recipes"]
+
+    rng = random.Random(seed)
+    recipes = []
+    for k in range(n_recipes):
+        src = base[k % len(base)]
+        copy_no = k // len(base)
+        recipe = dict(src, id=k + 1)
+        if copy_no:
+            recipe["name"] = f"{src['name']} #{copy_no + 1}"
+            recipe["ingredients"] = [
+                dict(line, amount=round(line["amount"] * rng.uniform(0.8, 1.2), 1))
+                for line in src["ingredients"]
+            ]
+        recipes.append(recipe)
+    return parse_catalog(ingredients_bytes, json.dumps({"recipes": recipes}).encode())
+
+
+def synthetic_orders(catalog, n_orders, seed=0):
+    """(cookie type, qty, size) tuples spread over every recipe."""
+    rng = random.Random(seed)
+    names = [rec.name for rec in catalog.recipes]
+    return [(rng.choice(names), rng.randint(12, 400), rng.choice(STANDARD_SIZES))
+            for _ in range(n_orders)]
@@ -0,0 +1,148 @@
+"""
+Midnight Dough Calculator Styles
+Shared NamedStyle registry for the report workbooks
+
+Every style is built once per workbook and registered as a NamedStyle;
+sheet builders refer to styles by key ("header", "money", ...), so the
+number of styles in styles.xml depends only on the catalog, never on how
+many rows a sheet has.
+"""
+
+from copy import copy
+
+from openpyxl.styles import DEFAULT_FONT, Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+
+# Prefix keeps our names clear of Excel's built-in styles ("Title", "Input", "Total", ...)
+STYLE_PREFIX = "MD "
+
+# Row fill per recipe in the Recipe Database sheet
+RECIPE_FILL_COLORS = {
+    "Sugar Cookie": "fff3e0",
+    "Snickerdoodle": "fce4ec",
+    "Dark Chocolate Chip": "3e2723",
+    "Chocolate Chip": "8d6e63",
+    "Lemon Sugar": "fffde7",
+    "Oatmeal Raisin": "efebe9"
+}
+
+
+def text_color_for(fill_color):
+    """White text on dark fills, black otherwise."""
+    r, g, b = (int(fill_color[i:i + 2], 16) for i in (0, 2, 4))
+    return "FFFFFF" if (0.299 * r + 0.587 * g + 0.114 * b) < 96 else "000000"
+
+
+def solid(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+header_fill = solid("1a1a2e")
+header_font = Font(color="FFFFFF", bold=True, size=12)
+subheader_fill = solid("16213e")
+money_fill = solid("e8f5e9")
+input_fill = solid("e3f2fd")
+total_fill = solid("c8e6c9")
+thin_border = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+bold_font = Font(bold=True)
+center = Alignment(horizontal='center')
+
+# style key -> NamedStyle attributes
+BASE_STYLES = {
+    "title": dict(font=Font(color="FFFFFF", bold=True, size=16), fill=header_fill, alignment=center),
+    "subtitle": dict(font=Font(italic=True, size=10), alignment=center),
+    "header": dict(font=header_font, fill=subheader_fill, alignment=center, border=thin_border),
+    "label": dict(font=bold_font),
+    "hint": dict(font=Font(italic=True, color="666666")),
+    "cell": dict(border=thin_border),
+    "input": dict(border=thin_border, fill=input_fill),
+    "price_input": dict(border=thin_border, fill=input_fill, number_format='$#,##0.00'),
+    "currency": dict(border=thin_border, number_format='$#,##0.00'),
+    "money": dict(border=thin_border, fill=money_fill, number_format='$#,##0.00'),
+    "rate": dict(border=thin_border, number_format='$#,##0.0000'),
+    "unit_price": dict(border=thin_border, fill=money_fill, number_format='$#,##0.0000'),
+    "amount": dict(border=thin_border, number_format='#,##0.00'),
+    "scaled": dict(border=thin_border, fill=solid("fff3e0"), number_format='#,##0.0'),
+    "scale": dict(border=thin_border, fill=solid("fff9c4"), number_format='0.00'),
+    "factor": dict(border=thin_border, number_format='0.00'),
+    "count": dict(border=thin_border, number_format='#,##0'),
+    "grams": dict(border=thin_border, number_format='#,##0 "g"'),
+    "date": dict(border=thin_border, number_format='yyyy-mm-dd'),
+    "percent": dict(border=thin_border, number_format='0.0%'),
+    "total": dict(font=bold_font, border=thin_border),
+    "total_count": dict(font=bold_font, border=thin_border, number_format='#,##0'),
+    "total_money": dict(font=bold_font, border=thin_border, fill=total_fill, number_format='$#,##0.00'),
+}
+
+
+# Style keys of the per-recipe row fills
+RECIPE_STYLE_PREFIX = "recipe:"
+
+
+def recipe_style(name):
+    return RECIPE_STYLE_PREFIX + name
+
+
+class StyleRegistry:
+    """
+    NamedStyles registered on one workbook, looked up by key.
+
+    ``apply`` copies the registered style array straight onto the cell. This
+    is what openpyxl does when a NamedStyle is assigned, minus the linear
+    name scan ``cell.style = "name"`` performs for every cell.
+
+    With ``lazy=True`` a style is only registered the first time it is
+    applied, so the workbook carries just the styles its cells use, in
+    first-use order.
+    """
+
+    def __init__(self, wb, catalog=None, lazy=False):
+        self.wb = wb
+        self.named = {}
+        self._arrays = {}
+        if lazy:
+            return
+        for key, attrs in BASE_STYLES.items():
+            self.register(key, **attrs)
+        if catalog is not None:
+            for recipe in catalog.recipes:
+                self.register_recipe(recipe.name)
+
+    def register(self, key, **attrs):
+        if key in self.named:
+            return self.named[key]
+        attrs.setdefault("font", DEFAULT_FONT)
+        attrs.setdefault("border", DEFAULT_BORDER)
+        style = NamedStyle(name=STYLE_PREFIX + key, **attrs)
+        self.wb.add_named_style(style)
+        self.named[key] = style
+        self._arrays[key] = style.as_tuple()
+        return style
+
+    def register_recipe(self, name):
+        fill_color = RECIPE_FILL_COLORS.get(name, "ffffff")
+        attrs = dict(border=thin_border, fill=solid(fill_color))
+        if text_color_for(fill_color) == "FFFFFF":
+            attrs["font"] = Font(color="FFFFFF")
+        return self.register(recipe_style(name), **attrs)
+
+    def apply(self, cell, key):
+        try:
+            cell._style = copy(self._arrays[key])
+        except KeyError:
+            if key.startswith(RECIPE_STYLE_PREFIX):
+                self.register_recipe(key[len(RECIPE_STYLE_PREFIX):])
+            else:
+                self.register(key, **BASE_STYLES[key])
+            cell._style = copy(self._arrays[key])
+
+    def __contains__(self, key):
+        return key in self.named
+
+    def __len__(self):
+        return len(self.named)
@@ -0,0 +1,316 @@
+"""
+Midnight Dough Recipe Catalog
+Loads the storefront's ingredient and recipe data (src/data/*.json) into a
+compact, id-indexed model shared by the report generators
+
+Features:
+- Ingredient / Recipe / RecipeLine records with __slots__
+- Name -> id dictionaries and id -> position indexes
+- Recipe x ingredient amount matrix (duplicate lines are summed)
+- Recipe line amounts and package sizes given in another unit ("unit" /
+  "packageUnit") are normalized once to the ingredient's price unit (see
+  units.py), so amount x unit price is always a cost
+- Extra package options per ingredient ("packages": [{"size", "price"}])
+  next to packageSize/packagePrice, for the package mix optimizer
+- On-disk cache keyed by source file mtime/size, falling back to a content hash;
+  units.py is part of the key, since its tables go into the normalized amounts
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import units
+
+REPORTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.normpath(os.path.join(REPORTS_DIR, "..", "src", "data"))
+CACHE_DIR = os.path.join(REPORTS_DIR, ".cache")
+INGREDIENTS_FILE = "ingredients.json"
+RECIPES_FILE = "recipes.json"
+# Densities and weights per item in here are baked into the cached amounts
+UNITS_FILE = units.__file__
+
+# Bump whenever the pickled layout of the model changes
+CACHE_VERSION = 4
+
+
+class Ingredient:
+    __slots__ = ("id", "name", "unit", "package_size", "package_price", "category", "notes",
+                 "current_stock", "min_threshold", "reorder_amount", "density", "grams_each", "packages")
+
+    def __init__(self, id, name, unit, package_size, package_price, category="", notes="",
+                 current_stock=0, min_threshold=0, reorder_amount=0, density=units.DEFAULT_DENSITY,
+                 grams_each=None, packages=None):
+        self.id = id
+        self.name = name
+        self.unit = unit
+        self.package_size = package_size
+        self.package_price = package_price
+        self.category = category
+        # Package description for staff, e.g. "Standard 1lb block"
+        self.notes = notes
+        self.current_stock = current_stock
+        self.min_threshold = min_threshold
+        self.reorder_amount = reorder_amount
+        # g/ml and grams per item, for converting other units to ``unit``
+        self.density = density
+        self.grams_each = grams_each
+        # (size, price) per package option, the standard package first
+        self.packages = tuple(packages) if packages else ((package_size, package_price),)
+
+    @property
+    def unit_price(self):
+        return self.package_price / self.package_size
+
+    def to_unit(self, amount, unit):
+        """``amount`` given in ``unit``, in this ingredient's price unit."""
+        return amount * units.conversion_factor(unit, self.unit, self.density, self.grams_each)
+
+    def __repr__(self):
+        return f"Ingredient({self.id}, {self.name!r})"
+
+
+class RecipeLine:
+    __slots__ = ("ingredient_id", "amount", "category")
+
+    def __init__(self, ingredient_id, amount, category):
+        self.ingredient_id = ingredient_id
+        self.amount = amount
+        self.category = category
+
+
+class Recipe:
+    __slots__ = ("id", "name", "display_name", "base_yield", "base_size", "total_dough",
+                 "oven_temp", "bake_time", "lines")
+
+    def __init__(self, id, name, base_yield, base_size, total_dough, lines,
+                 display_name="", oven_temp="", bake_time=""):
+        self.id = id
+        self.name = name
+        self.display_name = display_name
+        self.base_yield = base_yield
+        self.base_size = base_size
+        self.total_dough = total_dough
+        self.oven_temp = oven_temp
+        self.bake_time = bake_time
+        self.lines = lines
+
+    def __repr__(self):
+        return f"Recipe({self.id}, {self.name!r})"
+
+
+class Catalog:
+    """
+    Id-indexed view of every ingredient and recipe.
+
+    ``amounts[r][i]`` is the base-batch amount of ``ingredients[i]`` in
+    ``recipes[r]``; use ``ingredient_index`` / ``recipe_index`` to turn ids
+    into positions.
+    """
+
+    __slots__ = ("ingredients", "recipes", "ingredient_ids", "recipe_ids",
+                 "ingredient_index", "recipe_index", "amounts", "used_ingredient_ids")
+
+    def __init__(self, ingredients, recipes):
+        self.ingredients = ingredients
+        self.recipes = recipes
+        self.ingredient_ids = {ing.name: ing.id for ing in ingredients}
+        self.recipe_ids = {rec.name: rec.id for rec in recipes}
+        self.ingredient_index = {ing.id: i for i, ing in enumerate(ingredients)}
+        self.recipe_index = {rec.id: r for r, rec in enumerate(recipes)}
+
+        self.amounts = []
+        used = set()
+        for rec in recipes:
+            row = [0] * len(ingredients)
+            for line in rec.lines:
+                if line.ingredient_id not in self.ingredient_index:
+                    raise ValueError(
+                        f"Recipe {rec.name!r} references unknown ingredientId {line.ingredient_id}"
+                    )
+                row[self.ingredient_index[line.ingredient_id]] += line.amount
+                used.add(line.ingredient_id)
+            self.amounts.append(row)
+
+        # Ingredients that appear in at least one recipe, in catalog order
+        self.used_ingredient_ids = [ing.id for ing in ingredients if ing.id in used]
+
+    def ingredient(self, key):
+        """Look up an ingredient by id or name."""
+        if isinstance(key, str):
+            key = self.ingredient_ids[key]
+        return self.ingredients[self.ingredient_index[key]]
+
+    def recipe(self, key):
+        """Look up a recipe by id or name."""
+        if isinstance(key, str):
+            key = self.recipe_ids[key]
+        return self.recipes[self.recipe_index[key]]
+
+    @property
+    def used_ingredients(self):
+        return [self.ingredient(ing_id) for ing_id in self.used_ingredient_ids]
+
+
+# =============================================================================
+# PARSING
+# =============================================================================
+
+def _parse_ingredients(raw):
+    ingredients = []
+    for item in raw["ingredients"]:
+        ing = Ingredient(
+            item["id"], item["name"], units.canonical_unit(item["unit"]), item["packageSize"],
+            item["packagePrice"],
+            category=item.get("category", ""),
+            notes=item.get("notes", ""),
+            current_stock=item.get("currentStock", 0),
+            min_threshold=item.get("minThreshold", 0),
+            reorder_amount=item.get("reorderAmount", 0),
+            density=units.ingredient_density(item["name"], item.get("density")),
+            grams_each=units.ingredient_grams_each(item["name"], item.get("gramsEach")),
+        )
+        try:
+            # Packages sold in another unit than the ingredient is priced in
+            if item.get("packageUnit"):
+                ing.package_size = ing.to_unit(ing.package_size, item["packageUnit"])
+            ing.packages = (ing.package_size, ing.package_price),
+            for option in item.get("packages", ()):
+                size = ing.to_unit(option["size"], option.get("unit", ing.unit))
+                if size <= 0 or option["price"] < 0:
+                    raise ValueError(f"package {option!r} needs a positive size and a price")
+                if (size, option["price"]) not in ing.packages:
+                    ing.packages += (size, option["price"]),
+        except ValueError as exc:
+            raise ValueError(f"Ingredient {ing.name!r}: {exc}") from None
+        ingredients.append(ing)
+    return ingredients
+
+
+def _line_amount(line, ingredients_by_id):
+    # Amount in the ingredient's own unit
+    ing = ingredients_by_id.get(line["ingredientId"])
+    if "unit" not in line or ing is None:
+        return line["amount"]
+    return ing.to_unit(line["amount"], line["unit"])
+
+
+def _parse_recipes(raw, ingredients_by_id):
+    recipes = []
+    for item in raw["recipes"]:
+        try:
+            lines = [
+                RecipeLine(line["ingredientId"], _line_amount(line, ingredients_by_id),
+                           line.get("category", ""))
+                for line in item["ingredients"]
+            ]
+        except ValueError as exc:
+            raise ValueError(f"Recipe {item['name']!r}: {exc}") from None
+        recipes.append(Recipe(
+            item["id"], item["name"], item["baseYield"], item["baseCookieSize"],
+            item.get("totalDough", item["baseYield"] * item["baseCookieSize"]), lines,
+            display_name=item.get("displayName", ""),
+            oven_temp=item.get("ovenTemp", ""),
+            bake_time=item.get("bakeTime", ""),
+        ))
+    return recipes
+
+
+def parse_catalog(ingredients_bytes, recipes_bytes):
+    """Build a Catalog from the raw contents of the two JSON files."""
+    ingredients = _parse_ingredients(json.loads(ingredients_bytes))
+    recipes = _parse_recipes(json.loads(recipes_bytes), {ing.id: ing for ing in ingredients})
+    return Catalog(ingredients, recipes)
+
+
+# =============================================================================
+# CACHING
+# =============================================================================
+
+# In-process memo so repeated calls within one run never touch the disk twice
+_loaded = {}
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _cache_path(cache_dir, data_dir):
+    digest = hashlib.sha1(os.path.abspath(data_dir).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"catalog-{digest}.pickle")
+
+
+def _read_cache(path):
+    try:
+        with open(path, "rb") as fh:
+            cached = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+        return None
+    return cached
+
+
+def _write_cache(path, entry):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def source_paths(data_dir=DATA_DIR):
+    return (os.path.join(data_dir, INGREDIENTS_FILE), os.path.join(data_dir, RECIPES_FILE))
+
+
+def load_catalog(data_dir=DATA_DIR, cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Return the Catalog for ``data_dir``.
+
+    Unchanged source files (same mtime and size) are served straight from the
+    pickle cache. If a file was touched but its content hash still matches,
+    the cached model is reused and only the stat key is refreshed. units.py
+    counts as a source file, so editing its conversion tables rebuilds the
+    cache.
+    """
+    paths = source_paths(data_dir)
+    stats = tuple(_stat_key(p) for p in paths + (UNITS_FILE,))
+
+    memo_key = os.path.abspath(data_dir)
+    memo = _loaded.get(memo_key)
+    if use_cache and memo is not None and memo[0] == stats:
+        return memo[1]
+
+    cache_file = _cache_path(cache_dir, data_dir)
+    cached = _read_cache(cache_file) if use_cache else None
+    if cached is not None and cached["stats"] == stats:
+        _loaded[memo_key] = (stats, cached["catalog"])
+        return cached["catalog"]
+
+    contents = []
+    for p in paths:
+        with open(p, "rb") as fh:
+            contents.append(fh.read())
+    with open(UNITS_FILE, "rb") as fh:
+        units_source = fh.read()
+    hashes = tuple(hashlib.sha256(c).hexdigest() for c in contents + [units_source])
+
+    if cached is not None and cached["hashes"] == hashes:
+        catalog = cached["catalog"]
+    else:
+        catalog = parse_catalog(*contents)
+
+    if use_cache:
+        try:
+            _write_cache(cache_file, {
+                "version": CACHE_VERSION,
+                "stats": stats,
+                "hashes": hashes,
+                "catalog": catalog,
+            })
+        except OSError:
+            pass
+        _loaded[memo_key] = (stats, catalog)
+    return catalog
@@ -0,0 +1,169 @@
+"""
+Midnight Dough Costing Engine
+Reproduces the calculator workbook's cost math in Python, without a
+spreadsheet recalculation
+
+Features:
+- Scale factor (qty*size)/total dough, as in the Order Calculator (Recipe
+  Costs "Total Dough"), and (qty*size)/(base_yield*base_size) as in the
+  Batch Calculator
+- Batch Calculator breakdown: ROUND(amount*scale,1) per ingredient x unit price
+- Order Calculator cost: scale x cost per batch, vectorised over any number of orders
+- Aggregate ingredient demand for an order book in one matrix product
+
+Usage:
+    python costing.py "Chocolate Chip" 300 55 [--breakdown]
+"""
+
+import argparse
+
+import numpy as np
+
+from catalog import load_catalog
+from quoting import amount_type, positive_finite, print_quote, quote_result
+
+
+def excel_round(values, digits=0):
+    """ROUND() as spreadsheets do it: halves go away from zero."""
+    factor = 10.0 ** digits
+    values = np.asarray(values, dtype=float)
+    return np.sign(values) * np.floor(np.abs(values) * factor + 0.5) / factor
+
+
+class CostModel:
+    """
+    Dense arrays built once from a Catalog.
+
+    ``amounts`` is the recipe x ingredient matrix, ``unit_prices`` the
+    package_price/package_size vector, so ``batch_costs = amounts @ unit_prices``
+    is the Recipe Costs sheet's cost per batch for every recipe.
+    """
+
+    def __init__(self, catalog, unit_prices=None):
+        self.catalog = catalog
+        self.amounts = np.array(catalog.amounts, dtype=float).reshape(
+            len(catalog.recipes), len(catalog.ingredients))
+        if unit_prices is None:
+            unit_prices = [ing.unit_price for ing in catalog.ingredients]
+        self.unit_prices = np.asarray(unit_prices, dtype=float)
+        self.base_yield = np.array([rec.base_yield for rec in catalog.recipes], dtype=float)
+        self.base_size = np.array([rec.base_size for rec in catalog.recipes], dtype=float)
+        self.total_dough = np.array([rec.total_dough for rec in catalog.recipes], dtype=float)
+        self.batch_costs = self.amounts @ self.unit_prices
+        self.recipe_positions = {rec.name: r for r, rec in enumerate(catalog.recipes)}
+
+    def recipe_position(self, recipe):
+        """Row of ``recipe`` (name or matrix position) in the matrix."""
+        if isinstance(recipe, str):
+            if recipe not in self.recipe_positions:
+                raise KeyError(f"Unknown cookie type: {recipe!r}")
+            return self.recipe_positions[recipe]
+        if isinstance(recipe, (int, np.integer)) and 0 <= recipe < len(self.base_yield):
+            return int(recipe)
+        raise KeyError(f"Unknown recipe position: {recipe!r}")
+
+    def recipe_positions_for(self, recipes):
+        """Vector of matrix rows for a sequence of recipe names."""
+        return np.fromiter((self.recipe_position(r) for r in recipes), dtype=np.intp)
+
+    def scale_factors(self, positions, qty, size):
+        """
+        (qty*size)/total dough, element-wise: the Order Calculator's Scale
+        Factor, which divides by Recipe Costs "Total Dough (g)".
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        return (np.asarray(qty, dtype=float) * np.asarray(size, dtype=float)) / self.total_dough[positions]
+
+    def batch_scale_factor(self, recipe, qty, size):
+        """Batch Calculator Scale Factor: (qty*size)/(base_yield*base_size)."""
+        r = self.recipe_position(recipe)
+        return (qty * size) / (self.base_yield[r] * self.base_size[r])
+
+    # =========================================================================
+    # BATCH CALCULATOR
+    # =========================================================================
+
+    def batch_breakdown(self, recipe, qty, size):
+        """
+        Per-ingredient rows as the Batch Calculator shows them: ingredient,
+        base amount, scaled amount (rounded to 0.1), unit price and cost.
+        """
+        r = self.recipe_position(recipe)
+        scale = float(self.batch_scale_factor(r, qty, size))
+        base = self.amounts[r]
+        used = np.nonzero(base)[0]
+        scaled = excel_round(base[used] * scale, 1)
+        costs = scaled * self.unit_prices[used]
+        return [
+            {
+                "ingredient": self.catalog.ingredients[i].name,
+                "unit": self.catalog.ingredients[i].unit,
+                "base_amount": float(base[i]),
+                "scaled_amount": float(s),
+                "unit_price": float(self.unit_prices[i]),
+                "cost": float(c),
+            }
+            for i, s, c in zip(used, scaled, costs)
+        ]
+
+    def batch_cost(self, recipe, qty, size):
+        """Batch Calculator TOTAL COST (sum of rounded scaled amounts x unit price)."""
+        r = self.recipe_position(recipe)
+        scale = self.batch_scale_factor(r, qty, size)
+        return float(excel_round(self.amounts[r] * scale, 1) @ self.unit_prices)
+
+    # =========================================================================
+    # ORDER CALCULATOR
+    # =========================================================================
+
+    def order_costs(self, positions, qty, size):
+        """Est. Cost for each order row: scale factor x cost per batch."""
+        positions = np.asarray(positions, dtype=np.intp)
+        return self.scale_factors(positions, qty, size) * self.batch_costs[positions]
+
+    def ingredient_demand(self, positions, qty, size):
+        """
+        Total unrounded amount of every ingredient needed for all orders:
+        per-recipe summed scale factors times the amount matrix.
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        scales = np.bincount(positions, weights=self.scale_factors(positions, qty, size),
+                             minlength=len(self.base_yield))
+        return scales @ self.amounts
+
+
+def quote(recipe, qty, size, catalog=None, breakdown=False):
+    """
+    Order Calculator style quote for a single order; same result as
+    quoting.quote(), which midnight.py uses without NumPy. ``qty`` and
+    ``size`` must be finite and positive (ValueError otherwise).
+    """
+    qty, size = positive_finite(qty, "qty"), positive_finite(size, "size")
+    model = CostModel(catalog if catalog is not None else load_catalog())
+    r = model.recipe_position(recipe)
+    scale = float(model.scale_factors([r], qty, size)[0])
+    cost = float(model.order_costs([r], qty, size)[0])
+    result = quote_result(model.catalog.recipes[r].name, qty, size, scale, cost)
+    if breakdown:
+        result["breakdown"] = model.batch_breakdown(r, qty, size)
+        result["batch_cost"] = model.batch_cost(r, qty, size)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cost an order without opening the workbook")
+    parser.add_argument("recipe", help="cookie type, e.g. \"Chocolate Chip\"")
+    parser.add_argument("qty", type=amount_type("qty"), help="number of cookies")
+    parser.add_argument("size", type=amount_type("size"), help="cookie size in grams")
+    parser.add_argument("--breakdown", action="store_true",
+                        help="show the Batch Calculator ingredient breakdown")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog()
+    if args.recipe not in catalog.recipe_ids:
+        parser.error(f"unknown cookie type {args.recipe!r} (choose from: {', '.join(catalog.recipe_ids)})")
+    print_quote(quote(args.recipe, args.qty, args.size, catalog, breakdown=args.breakdown))
+
+
+if __name__ == "__main__":
+    main()
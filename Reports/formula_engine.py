@@ -0,0 +1,1209 @@
+"""
+Midnight Dough Formula Engine
+Evaluates a workbook's formulas in Python and stores the results as cached
+values, so readers that don't recalculate (pandas, openpyxl data_only=True,
+file previewers) see the costs
+
+Features:
+- Parser for the formula language the generator writes: cell and range
+  references (relative, absolute, cross-sheet, whole-column), defined names,
+  Excel Table structured references (Orders[Qty], Orders[[#This Row],[Qty]]),
+  arithmetic, comparison and & operators
+- Functions: SUM, SUBTOTAL, SUMIFS, SUMPRODUCT, VLOOKUP, INDEX, MATCH, ROUND,
+  ROUNDUP, ROUNDDOWN, IF, IFERROR, AND, OR, NOT, MIN, MAX, ABS
+- Excel semantics for blanks, text/number comparison and error values
+  (#N/A, #DIV/0!, #VALUE!, ...), with array broadcasting for SUMPRODUCT
+- Formulas that differ only by row (every Order Calculator row) share one
+  compiled closure
+- Reads cells straight from the saved xlsx and writes a <v> next to every <f>
+- --check: compares the cached values with costing.CostModel, an
+  independent NumPy recomputation (tests/test_cached_values.py runs the
+  same check on generated workbooks)
+
+Usage:
+    python formula_engine.py calculator.xlsx           # embed cached values in place
+    python formula_engine.py calculator.xlsx --check
+"""
+
+import argparse
+import math
+import operator
+import os
+import posixpath
+import re
+import sys
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+from openpyxl.compat import safe_string
+from openpyxl.utils import column_index_from_string, range_boundaries
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+# =============================================================================
+# VALUES
+# =============================================================================
+
+class ExcelError:
+    __slots__ = ("code",)
+
+    def __init__(self, code):
+        self.code = code
+
+    def __repr__(self):
+        return self.code
+
+
+NA = ExcelError("#N/A")
+DIV0 = ExcelError("#DIV/0!")
+VALUE = ExcelError("#VALUE!")
+REF = ExcelError("#REF!")
+NAME = ExcelError("#NAME?")
+NUM = ExcelError("#NUM!")
+ERRORS = {e.code: e for e in (NA, DIV0, VALUE, REF, NAME, NUM)}
+
+
+class FormulaError(ValueError):
+    """A formula uses syntax or a function the engine doesn't support."""
+
+
+class Range:
+    """A rectangular block of cells on one sheet (1-based, inclusive)."""
+
+    __slots__ = ("sheet", "r1", "c1", "r2", "c2")
+
+    def __init__(self, sheet, r1, c1, r2, c2):
+        self.sheet = sheet
+        self.r1, self.c1, self.r2, self.c2 = r1, c1, r2, c2
+
+    @property
+    def key(self):
+        return (self.sheet, self.r1, self.c1, self.r2, self.c2)
+
+    @property
+    def shape(self):
+        return (self.r2 - self.r1 + 1, self.c2 - self.c1 + 1)
+
+    def rows(self, book):
+        """Evaluated values as a list of rows."""
+        return [[book.value(self.sheet, r, c) for c in range(self.c1, self.c2 + 1)]
+                for r in range(self.r1, self.r2 + 1)]
+
+    def cells(self, book):
+        for r in range(self.r1, self.r2 + 1):
+            for c in range(self.c1, self.c2 + 1):
+                yield book.value(self.sheet, r, c)
+
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _to_number(v):
+    if isinstance(v, ExcelError):
+        return v
+    if v is None:
+        return 0
+    if isinstance(v, bool):
+        return int(v)
+    if isinstance(v, (int, float)):
+        return v
+    try:
+        return float(v.strip()) if v.strip() else VALUE
+    except ValueError:
+        return VALUE
+
+
+def _to_text(v):
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, float):
+        return str(int(v)) if v.is_integer() else "%.15g" % v
+    return str(v)
+
+
+def _to_bool(v):
+    if isinstance(v, ExcelError):
+        return v
+    if v is None:
+        return False
+    if isinstance(v, str):
+        upper = v.upper()
+        if upper in ("TRUE", "FALSE"):
+            return upper == "TRUE"
+        return VALUE
+    return bool(v)
+
+
+def _type_rank(v):
+    return 1 if isinstance(v, str) else 2 if isinstance(v, bool) else 0
+
+
+def _compare(a, b):
+    """-1/0/1 with Excel's ordering: numbers < text < logicals; text ignores case."""
+    if a is None:
+        a = "" if isinstance(b, str) else False if isinstance(b, bool) else 0
+    if b is None:
+        b = "" if isinstance(a, str) else False if isinstance(a, bool) else 0
+    ra, rb = _type_rank(a), _type_rank(b)
+    if ra != rb:
+        return -1 if ra < rb else 1
+    if ra == 1:
+        a, b = a.lower(), b.lower()
+    return (a > b) - (a < b)
+
+
+def _lookup_key(v):
+    if isinstance(v, str):
+        return (1, v.lower())
+    if isinstance(v, bool):
+        return (2, v)
+    if v is None:
+        return None
+    return (0, float(v))
+
+
+def _round_half_away(x, digits, mode):
+    """ROUND / ROUNDUP / ROUNDDOWN on the 15-significant-digit value Excel works with."""
+    factor = 10.0 ** digits
+    scaled = abs(x) * factor
+    # Drop binary noise below Excel's precision so 2.675 rounds like 2.675
+    scaled = float("%.15g" % scaled)
+    if mode == "up":
+        r = math.ceil(scaled)
+    elif mode == "down":
+        r = math.floor(scaled)
+    else:
+        r = math.floor(scaled + 0.5)
+    return math.copysign(r / factor, x) if r else 0.0
+
+
+# =============================================================================
+# PARSER
+# =============================================================================
+
+_SHEET = r"(?:(?:'(?:[^']|'')+'|[A-Za-z_][\w.]*)!)?"
+TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<string>"(?:[^"]|"")*")
+    | (?P<ref>""" + _SHEET + r"""\$?[A-Z]{1,3}\$?[0-9]+(?::\$?[A-Z]{1,3}\$?[0-9]+)?)(?![\w(])
+    | (?P<colref>""" + _SHEET + r"""\$?[A-Z]{1,3}:\$?[A-Z]{1,3})(?![\w(])
+    | (?P<number>(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)
+    | (?P<table>[A-Za-z_][\w.]*\[(?:[^\[\]']|'.|\[(?:[^\[\]']|'.)*\])*\])
+    | (?P<func>[A-Za-z_][\w.]*)(?=\()
+    | (?P<name>[A-Za-z_][\w.]*)
+    | (?P<error>\#(?:N/A|DIV/0!|VALUE!|REF!|NAME\?|NUM!))
+    | (?P<op><>|<=|>=|[-+*/^&=<>%(),])
+    )\s*""", re.X)
+
+CELL = re.compile(r"(\$?)([A-Z]{1,3})(\$?)([0-9]+)")
+COLUMN = re.compile(r"(\$?)([A-Z]{1,3})")
+
+# Sentinel row for whole-column references; clipped to the sheet's used rows
+WHOLE_COLUMN = 0
+
+# One [item] of a structured reference; ' escapes the next character
+TABLE_ITEM = re.compile(r"\[((?:[^\[\]']|'.)*)\]")
+TABLE_ROWS = ("#All", "#Data", "#Headers", "#Totals", "#This Row")
+
+
+def _split_sheet(text):
+    if "!" not in text:
+        return None, text
+    sheet, ref = text.rsplit("!", 1)
+    if sheet.startswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    return sheet, ref
+
+
+def _table_ref(text):
+    """Orders[[#This Row],[Qty]] -> ("Orders", "#This Row", "Qty", "Qty")."""
+    name, inner = text[:text.index("[")], text[text.index("[") + 1:-1]
+    items = TABLE_ITEM.findall(inner) if inner.startswith("[") else [inner] if inner else []
+    rows, columns = "#Data", []
+    for item in items:
+        item = re.sub(r"'(.)", r"\1", item).strip()
+        if item.startswith("@"):
+            rows, item = "#This Row", item[1:]
+        if item.startswith("#"):
+            if item not in TABLE_ROWS:
+                raise FormulaError(f"unsupported table selector {item!r} in {text!r}")
+            rows = item
+        elif item:
+            columns.append(item)
+    return name, rows, (columns[0] if columns else None), (columns[-1] if columns else None)
+
+
+def tokenize(formula, row, col):
+    """
+    Tokens of ``formula`` (without the leading "=") as written in cell
+    (row, col). Relative references become offsets from that cell, so
+    formulas copied down a column tokenize identically.
+    """
+    tokens = []
+    pos = 0
+    while pos < len(formula):
+        m = TOKEN.match(formula, pos)
+        if not m or m.end() == pos:
+            raise FormulaError(f"can't parse {formula!r} at {formula[pos:pos + 20]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "ref":
+            sheet, ref = _split_sheet(text)
+            corners = []
+            for part in ref.split(":"):
+                cabs, letters, rabs, digits = CELL.fullmatch(part).groups()
+                c, r = column_index_from_string(letters), int(digits)
+                corners.append((r if rabs else r - row, bool(rabs), c if cabs else c - col, bool(cabs)))
+            tokens.append(("ref", (sheet, tuple(corners))))
+        elif kind == "colref":
+            sheet, ref = _split_sheet(text)
+            corners = []
+            for part in ref.split(":"):
+                cabs, letters = COLUMN.fullmatch(part).groups()
+                c = column_index_from_string(letters)
+                corners.append((WHOLE_COLUMN, True, c if cabs else c - col, bool(cabs)))
+            tokens.append(("colref", (sheet, tuple(corners))))
+        elif kind == "table":
+            tokens.append(("table", _table_ref(text)))
+        elif kind == "string":
+            tokens.append(("string", text[1:-1].replace('""', '"')))
+        elif kind == "number":
+            tokens.append(("number", float(text)))
+        elif kind in ("func", "name"):
+            tokens.append((kind, text.upper() if kind == "func" else text))
+        else:
+            tokens.append((kind, text))
+    return tuple(tokens)
+
+
+# Cell references outside string literals and table column names, for the compile-cache key
+_REF_IN_TEXT = re.compile(r'"(?:[^"]|"")*"|\[(?:[^\[\]\']|\'.)*\]'
+                          r'|(?<![\w$.])(\$?)([A-Z]{1,3})(\$?)([0-9]+)(?![\w(])')
+
+
+def formula_key(formula, row, col):
+    """
+    ``formula`` with relative references rewritten as offsets from (row, col).
+    Formulas copied down a column share a key, and so a compiled closure.
+    The column is part of the key because whole-column references (A:E)
+    are kept as written.
+    """
+    def relative(m):
+        if m.group(2) is None:
+            return m.group(0)
+        cabs, letters, rabs, digits = m.groups()
+        c = letters if cabs else f"{column_index_from_string(letters) - col:+d}"
+        r = digits if rabs else f"{int(digits) - row:+d}"
+        return f"\0{cabs}{c}\0{rabs}{r}\0"
+    return col, _REF_IN_TEXT.sub(relative, formula)
+
+
+def _resolve(corner, row, col):
+    r, rabs, c, cabs = corner
+    return (r if rabs else row + r), (c if cabs else col + c)
+
+
+def _binary(fn):
+    """Scalar operator lifted over arrays (lists of rows) with broadcasting."""
+    def apply(a, b):
+        a_arr, b_arr = isinstance(a, list), isinstance(b, list)
+        if not (a_arr or b_arr):
+            return fn(a, b)
+        a_rows = a if a_arr else [[a]]
+        b_rows = b if b_arr else [[b]]
+        rows = max(len(a_rows), len(b_rows))
+        cols = max(len(a_rows[0]), len(b_rows[0]))
+        out = []
+        for i in range(rows):
+            ar = a_rows[i if len(a_rows) > 1 else 0]
+            br = b_rows[i if len(b_rows) > 1 else 0]
+            out.append([fn(ar[j if len(ar) > 1 else 0], br[j if len(br) > 1 else 0]) for j in range(cols)])
+        return out
+    return apply
+
+
+def _arith(op):
+    def fn(a, b):
+        a, b = _to_number(a), _to_number(b)
+        if isinstance(a, ExcelError):
+            return a
+        if isinstance(b, ExcelError):
+            return b
+        try:
+            return op(a, b)
+        except ZeroDivisionError:
+            return DIV0
+        except (OverflowError, ValueError):
+            return NUM
+    return _binary(fn)
+
+
+def _comparison(test):
+    def fn(a, b):
+        if isinstance(a, ExcelError):
+            return a
+        if isinstance(b, ExcelError):
+            return b
+        return test(_compare(a, b))
+    return _binary(fn)
+
+
+def _concat(a, b):
+    if isinstance(a, ExcelError):
+        return a
+    if isinstance(b, ExcelError):
+        return b
+    return _to_text(a) + _to_text(b)
+
+
+BINARY_OPS = {
+    "+": _arith(operator.add),
+    "-": _arith(operator.sub),
+    "*": _arith(operator.mul),
+    "/": _arith(operator.truediv),
+    "^": _arith(operator.pow),
+    "&": _binary(_concat),
+    "=": _comparison(lambda c: c == 0),
+    "<>": _comparison(lambda c: c != 0),
+    "<": _comparison(lambda c: c < 0),
+    ">": _comparison(lambda c: c > 0),
+    "<=": _comparison(lambda c: c <= 0),
+    ">=": _comparison(lambda c: c >= 0),
+}
+
+PRECEDENCE = [("=", "<>", "<", ">", "<=", ">="), ("&",), ("+", "-"), ("*", "/"), ("^",)]
+
+
+class _Parser:
+    """Compiles a token tuple into a closure ``node(book, sheet, row, col)``."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, text=None):
+        tok = self.peek()
+        if tok[0] is None or (text is not None and tok[1] != text):
+            raise FormulaError(f"expected {text or 'a token'}, got {tok[1]!r}")
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        node = self.binary(0)
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def binary(self, level):
+        if level == len(PRECEDENCE):
+            return self.unary()
+        node = self.binary(level + 1)
+        while self.peek()[0] == "op" and self.peek()[1] in PRECEDENCE[level]:
+            fn = BINARY_OPS[self.take()[1]]
+            right = self.binary(level + 1)
+            node = (lambda l, r, f: lambda b, s, row, col: f(_value(l(b, s, row, col), b),
+                                                              _value(r(b, s, row, col), b)))(node, right, fn)
+        return node
+
+    def unary(self):
+        tok = self.peek()
+        if tok == ("op", "-"):
+            self.take()
+            inner = self.unary()
+            neg = _arith(operator.sub)
+            return lambda b, s, row, col: neg(0, _value(inner(b, s, row, col), b))
+        if tok == ("op", "+"):
+            self.take()
+            return self.unary()
+        node = self.primary()
+        while self.peek() == ("op", "%"):
+            self.take()
+            node = (lambda n: lambda b, s, row, col: BINARY_OPS["/"](_value(n(b, s, row, col), b), 100))(node)
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+        if kind in ("number", "string"):
+            return lambda b, s, row, col: text
+        if kind == "error":
+            err = ERRORS[text]
+            return lambda b, s, row, col: err
+        if kind in ("ref", "colref"):
+            sheet, corners = text
+            first, last = corners[0], corners[-1]
+
+            def ref(b, s, row, col):
+                r1, c1 = _resolve(first, row, col)
+                r2, c2 = _resolve(last, row, col)
+                target = sheet or s
+                if kind == "colref":
+                    r1, r2 = 1, b.max_row(target)
+                return Range(target, min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+            return ref
+        if kind == "table":
+            name, rows, first_col, last_col = text
+            return lambda b, s, row, col: b.table_range(name, rows, first_col, last_col, row)
+        if kind == "name":
+            upper = text.upper()
+            if upper in ("TRUE", "FALSE"):
+                flag = upper == "TRUE"
+                return lambda b, s, row, col: flag
+            return lambda b, s, row, col: b.names.get(text, NAME)
+        if kind == "func":
+            return self.call(text)
+        if (kind, text) == ("op", "("):
+            node = self.binary(0)
+            self.take(")")
+            return node
+        raise FormulaError(f"unexpected {text!r}")
+
+    def call(self, name):
+        self.take("(")
+        args = []
+        if self.peek() != ("op", ")"):
+            while True:
+                if self.peek() in (("op", ","), ("op", ")")):
+                    args.append(lambda b, s, row, col: None)
+                else:
+                    args.append(self.binary(0))
+                if self.peek() == ("op", ","):
+                    self.take()
+                    continue
+                break
+        self.take(")")
+
+        if name in LAZY_FUNCTIONS:
+            impl = LAZY_FUNCTIONS[name]
+            return lambda b, s, row, col: impl(b, [lambda n=n: n(b, s, row, col) for n in args])
+        if name not in FUNCTIONS:
+            raise FormulaError(f"unsupported function {name}")
+        impl = FUNCTIONS[name]
+        return lambda b, s, row, col: impl(b, *[n(b, s, row, col) for n in args])
+
+
+def _value(v, book):
+    """Scalar (or array) value of an operand; ranges become their values."""
+    if isinstance(v, Range):
+        if v.shape == (1, 1):
+            return book.value(v.sheet, v.r1, v.c1)
+        return v.rows(book)
+    return v
+
+
+def _scalar(v, book):
+    v = _value(v, book)
+    if isinstance(v, list):
+        return v[0][0] if len(v) == 1 and len(v[0]) == 1 else VALUE
+    return v
+
+
+def _flat(v, book):
+    """Every value of a range, array or scalar argument."""
+    if isinstance(v, Range):
+        return list(v.cells(book))
+    if isinstance(v, list):
+        return [x for row in v for x in row]
+    return [v]
+
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def fn_if(book, args):
+    cond = _to_bool(_scalar(args[0](), book))
+    if isinstance(cond, ExcelError):
+        return cond
+    if cond:
+        return args[1]() if len(args) > 1 else True
+    return args[2]() if len(args) > 2 else False
+
+
+def fn_iferror(book, args):
+    value = _value(args[0](), book)
+    if isinstance(value, ExcelError):
+        return args[1]()
+    if isinstance(value, list):
+        fallback = None
+        out = []
+        for row in value:
+            out_row = []
+            for x in row:
+                if isinstance(x, ExcelError):
+                    if fallback is None:
+                        fallback = _scalar(args[1](), book)
+                    x = fallback
+                out_row.append(x)
+            out.append(out_row)
+        return out
+    return value
+
+
+def _logical(book, args, combine):
+    values = []
+    for arg in args:
+        for v in (_flat(arg, book) if isinstance(arg, (Range, list)) else [_scalar(arg, book)]):
+            if v is None or (isinstance(v, str) and isinstance(arg, Range)):
+                continue
+            v = _to_bool(v)
+            if isinstance(v, ExcelError):
+                return v
+            values.append(v)
+    return combine(values) if values else VALUE
+
+
+def fn_and(book, *args):
+    return _logical(book, args, all)
+
+
+def fn_or(book, *args):
+    return _logical(book, args, any)
+
+
+def fn_not(book, value):
+    value = _to_bool(_scalar(value, book))
+    return value if isinstance(value, ExcelError) else not value
+
+
+def _numbers(book, args):
+    """Numbers for SUM/MIN/MAX: ranges skip text and blanks, scalars are coerced."""
+    out = []
+    for arg in args:
+        if isinstance(arg, (Range, list)):
+            for v in _flat(arg, book):
+                if isinstance(v, ExcelError):
+                    return v
+                if _is_number(v):
+                    out.append(v)
+        else:
+            v = _to_number(_scalar(arg, book))
+            if isinstance(v, ExcelError):
+                return v
+            out.append(v)
+    return out
+
+
+def fn_sum(book, *args):
+    values = _numbers(book, args)
+    return values if isinstance(values, ExcelError) else math.fsum(values) if values else 0
+
+
+def fn_min(book, *args):
+    values = _numbers(book, args)
+    return values if isinstance(values, ExcelError) else min(values, default=0)
+
+
+def fn_max(book, *args):
+    values = _numbers(book, args)
+    return values if isinstance(values, ExcelError) else max(values, default=0)
+
+
+def fn_abs(book, value):
+    value = _to_number(_scalar(value, book))
+    return value if isinstance(value, ExcelError) else abs(value)
+
+
+def _count(book, *args):
+    values = _numbers(book, [a for a in args if isinstance(a, (Range, list))])
+    return values if isinstance(values, ExcelError) else len(values)
+
+
+def _average(book, *args):
+    values = _numbers(book, args)
+    if isinstance(values, ExcelError):
+        return values
+    return math.fsum(values) / len(values) if values else DIV0
+
+
+# SUBTOTAL function numbers; 101-111 (ignore hidden rows) map to the same
+# functions since generated sheets have no manually hidden rows
+SUBTOTALS = {1: _average, 2: _count, 4: fn_max, 5: fn_min, 9: fn_sum}
+
+
+def fn_subtotal(book, function_num, *refs):
+    num = _to_number(_scalar(function_num, book))
+    if isinstance(num, ExcelError):
+        return num
+    impl = SUBTOTALS.get(int(num) % 100)
+    return impl(book, *refs) if impl else VALUE
+
+
+def _rounding(mode):
+    def fn(book, value, digits=0):
+        value = _to_number(_scalar(value, book))
+        digits = _to_number(_scalar(digits, book))
+        if isinstance(value, ExcelError):
+            return value
+        if isinstance(digits, ExcelError):
+            return digits
+        return _round_half_away(value, int(digits), mode)
+    return fn
+
+
+def fn_sumproduct(book, *arrays):
+    grids = []
+    for arr in arrays:
+        grid = _value(arr, book)
+        grids.append(grid if isinstance(grid, list) else [[grid]])
+    shape = (len(grids[0]), len(grids[0][0]))
+    if any((len(g), len(g[0])) != shape for g in grids):
+        return VALUE
+    total = 0.0
+    for i in range(shape[0]):
+        for j in range(shape[1]):
+            product = 1.0
+            for g in grids:
+                v = g[i][j]
+                if isinstance(v, ExcelError):
+                    return v
+                product *= v if _is_number(v) else (int(v) if isinstance(v, bool) and len(grids) == 1 else 0)
+            total += product
+    return total
+
+
+CRITERION = re.compile(r"(<>|<=|>=|=|<|>)?(.*)", re.S)
+
+
+def _criterion(crit):
+    """Predicate for a SUMIFS criterion ("Lemon", ">5", "<>", "Choc*", 12)."""
+    if not isinstance(crit, str):
+        return lambda v: v is not None and _compare(v, crit) == 0
+    op, text = CRITERION.fullmatch(crit).groups()
+    op = op or "="
+    number = _to_number(text) if text.strip() else None
+    target = number if _is_number(number) else text
+    if op in ("=", "<>") and isinstance(target, str):
+        if target == "":
+            test = lambda v: v is None or v == ""  # noqa: E731
+        elif any(ch in target for ch in "*?"):
+            pattern = re.compile("".join(".*" if ch == "*" else "." if ch == "?" else re.escape(ch)
+                                         for ch in target), re.I | re.S)
+            test = lambda v: isinstance(v, str) and pattern.fullmatch(v) is not None  # noqa: E731
+        else:
+            test = lambda v: isinstance(v, str) and v.lower() == target.lower()  # noqa: E731
+        return test if op == "=" else (lambda v: not test(v))
+    compare = BINARY_OPS[op]
+    return lambda v: (v is not None and _type_rank(v) == _type_rank(target)
+                      and compare(v, target) is True)
+
+
+def fn_sumifs(book, sum_range, *pairs):
+    if len(pairs) % 2 or not isinstance(sum_range, Range):
+        return VALUE
+    values = _flat(sum_range, book)
+    keep = [True] * len(values)
+    for crit_range, crit in zip(pairs[::2], pairs[1::2]):
+        if not isinstance(crit_range, Range) or crit_range.shape != sum_range.shape:
+            return VALUE
+        test = _criterion(_scalar(crit, book))
+        for i, v in enumerate(_flat(crit_range, book)):
+            if keep[i] and not test(v):
+                keep[i] = False
+    return math.fsum(v for v, k in zip(values, keep) if k and _is_number(v))
+
+
+def fn_vlookup(book, lookup, table, col_index, range_lookup=True):
+    if not isinstance(table, Range):
+        return VALUE
+    col_index = _to_number(_scalar(col_index, book))
+    if isinstance(col_index, ExcelError):
+        return col_index
+    col_index = int(col_index)
+    if col_index < 1:
+        return VALUE
+    if col_index > table.shape[1]:
+        return REF
+    # An empty range_lookup argument counts as FALSE (exact match)
+    exact = range_lookup is None or not _to_bool(_scalar(range_lookup, book))
+
+    def one(value):
+        if isinstance(value, ExcelError):
+            return value
+        if exact:
+            offset = book.index(table).get(_lookup_key(value))
+        else:
+            offset = _approximate(book, table, value)
+        if offset is None:
+            return NA
+        return book.value(table.sheet, table.r1 + offset, table.c1 + col_index - 1)
+
+    lookup = _value(lookup, book)
+    if isinstance(lookup, list):
+        return [[one(v) for v in row] for row in lookup]
+    return one(lookup)
+
+
+def _approximate(book, table, value):
+    """Last row whose first column is <= value (sorted-table VLOOKUP/MATCH 1)."""
+    found = None
+    for offset in range(table.shape[0]):
+        v = book.value(table.sheet, table.r1 + offset, table.c1)
+        if v is None or _type_rank(v) != _type_rank(value):
+            continue
+        if _compare(v, value) > 0:
+            break
+        found = offset
+    return found
+
+
+def fn_match(book, lookup, lookup_range, match_type=1):
+    if not isinstance(lookup_range, Range) or 1 not in lookup_range.shape:
+        return NA
+    lookup = _scalar(lookup, book)
+    if isinstance(lookup, ExcelError):
+        return lookup
+    match_type = _to_number(_scalar(match_type, book)) if match_type is not None else 1
+    if match_type == 0:
+        offset = book.index(lookup_range).get(_lookup_key(lookup))
+        return NA if offset is None else offset + 1
+    found = None
+    for offset, v in enumerate(_flat(lookup_range, book)):
+        if v is None or _type_rank(v) != _type_rank(lookup):
+            continue
+        c = _compare(v, lookup)
+        if (c > 0 and match_type > 0) or (c < 0 and match_type < 0):
+            break
+        found = offset
+    return NA if found is None else found + 1
+
+
+def fn_index(book, array, row_num, col_num=None):
+    if isinstance(array, ExcelError):
+        return array
+    row_num = _to_number(_scalar(row_num, book))
+    col_num = _to_number(_scalar(col_num, book)) if col_num is not None else None
+    for v in (row_num, col_num):
+        if isinstance(v, ExcelError):
+            return v
+    if isinstance(array, Range):
+        rows, cols = array.shape
+        r, c = int(row_num), int(col_num) if col_num is not None else None
+        if c is None:
+            # A single row or column takes one index along its length
+            r, c = (1, r) if rows == 1 else (r, 1)
+        if not (1 <= r <= rows and 1 <= c <= cols):
+            return REF
+        return book.value(array.sheet, array.r1 + r - 1, array.c1 + c - 1)
+    grid = array if isinstance(array, list) else [[array]]
+    r, c = int(row_num), int(col_num or 1)
+    if len(grid) == 1 and col_num is None:
+        r, c = 1, r
+    if not (1 <= r <= len(grid) and 1 <= c <= len(grid[0])):
+        return REF
+    return grid[r - 1][c - 1]
+
+
+LAZY_FUNCTIONS = {"IF": fn_if, "IFERROR": fn_iferror}
+FUNCTIONS = {
+    "AND": fn_and,
+    "OR": fn_or,
+    "NOT": fn_not,
+    "SUM": fn_sum,
+    "SUBTOTAL": fn_subtotal,
+    "MIN": fn_min,
+    "MAX": fn_max,
+    "ABS": fn_abs,
+    "ROUND": _rounding("half"),
+    "ROUNDUP": _rounding("up"),
+    "ROUNDDOWN": _rounding("down"),
+    "SUMPRODUCT": fn_sumproduct,
+    "SUMIFS": fn_sumifs,
+    "VLOOKUP": fn_vlookup,
+    "MATCH": fn_match,
+    "INDEX": fn_index,
+}
+
+
+# =============================================================================
+# WORKBOOK MODEL
+# =============================================================================
+
+class Formula:
+    __slots__ = ("text", "node")
+
+    def __init__(self, text, node):
+        self.text = text
+        self.node = node
+
+
+_EVALUATING = object()
+
+
+class Book:
+    """
+    Cells of every sheet plus defined names and Excel Tables. ``value``
+    evaluates formulas on demand and memoises the result, so each formula
+    runs once.
+    """
+
+    def __init__(self, names=None):
+        self.cells = {}
+        self.names = {}
+        self.tables = {}
+        self._raw_names = names or {}
+        self._results = {}
+        self._indexes = {}
+        self._compiled = {}
+        self._max_rows = {}
+
+    def add_sheet(self, title):
+        self.cells[title] = {}
+        self._results[title] = {}
+        return self.cells[title]
+
+    def set(self, sheet, row, col, value):
+        """Store a value, or a formula string starting with "="."""
+        if isinstance(value, str) and value.startswith("=") and len(value) > 1:
+            key = formula_key(value, row, col)
+            node = self._compiled.get(key)
+            if node is None:
+                node = self._compiled[key] = _Parser(tokenize(value[1:], row, col)).parse()
+            value = Formula(value, node)
+        self.cells[sheet][(row, col)] = value
+
+    def add_table(self, name, sheet, ref, columns, header_rows=1, totals_rows=0):
+        """Register an Excel Table; names and columns match case-insensitively."""
+        c1, r1, c2, r2 = range_boundaries(ref)
+        self.tables[name.upper()] = (sheet, r1, c1, r2, c2, header_rows, totals_rows,
+                                     {c.upper(): offset for offset, c in enumerate(columns)})
+
+    def table_range(self, name, rows, first_col, last_col, row):
+        """Range selected by a structured reference evaluated in ``row``."""
+        table = self.tables.get(name.upper())
+        if table is None:
+            return REF
+        sheet, r1, c1, r2, c2, header_rows, totals_rows, columns = table
+        if first_col is not None:
+            first, last = columns.get(first_col.upper()), columns.get(last_col.upper())
+            if first is None or last is None:
+                return REF
+            c1, c2 = c1 + min(first, last), c1 + max(first, last)
+        data_r1, data_r2 = r1 + header_rows, r2 - totals_rows
+        if rows == "#Data":
+            r1, r2 = data_r1, data_r2
+        elif rows == "#Headers":
+            r2 = data_r1 - 1
+        elif rows == "#Totals":
+            r1 = data_r2 + 1
+        elif rows == "#This Row":
+            if not data_r1 <= row <= data_r2:
+                return VALUE
+            r1 = r2 = row
+        if r1 > r2:
+            return REF
+        return Range(sheet, r1, c1, r2, c2)
+
+    def resolve_names(self):
+        for name, text in self._raw_names.items():
+            try:
+                tokens = tokenize(text, 1, 1)
+                self.names[name] = _Parser(tokens).parse()(self, None, 1, 1)
+            except FormulaError:
+                self.names[name] = REF
+
+    def max_row(self, sheet):
+        if sheet not in self._max_rows:
+            self._max_rows[sheet] = max((r for r, _ in self.cells.get(sheet, {})), default=1)
+        return self._max_rows[sheet]
+
+    def value(self, sheet, row, col):
+        results = self._results.get(sheet)
+        if results is None:
+            return REF
+        key = (row, col)
+        if key in results:
+            result = results[key]
+            # A circular reference reads as 0, like Excel's iterative-off default
+            return 0 if result is _EVALUATING else result
+        cell = self.cells[sheet].get(key)
+        if not isinstance(cell, Formula):
+            return cell
+        results[key] = _EVALUATING
+        try:
+            result = _scalar(cell.node(self, sheet, row, col), self)
+        except RecursionError:
+            result = REF
+        results[key] = result
+        return result
+
+    def index(self, rng):
+        """First-occurrence offset of each value in ``rng``'s first column (or row)."""
+        key = rng.key
+        if key not in self._indexes:
+            index = {}
+            values = ([self.value(rng.sheet, rng.r1, c) for c in range(rng.c1, rng.c2 + 1)]
+                      if rng.r1 == rng.r2 and rng.c1 != rng.c2 else
+                      [self.value(rng.sheet, r, rng.c1) for r in range(rng.r1, rng.r2 + 1)])
+            for offset, v in enumerate(values):
+                k = _lookup_key(v)
+                if k is not None and k not in index:
+                    index[k] = offset
+            self._indexes[key] = index
+        return self._indexes[key]
+
+    def formulas(self, sheet):
+        return [(key, cell) for key, cell in self.cells[sheet].items() if isinstance(cell, Formula)]
+
+
+# =============================================================================
+# XLSX I/O
+# =============================================================================
+
+COORD = re.compile(r"([A-Z]+)([0-9]+)")
+
+
+def sheet_parts(zf):
+    """Sheet title -> worksheet part name inside the xlsx zip."""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{NS_PKG_REL}Relationship")}
+    parts = {}
+    for sheet in workbook.iter(f"{NS_MAIN}sheet"):
+        target = targets[sheet.get(f"{NS_REL}id")]
+        parts[sheet.get("name")] = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    return parts
+
+
+def _defined_names(zf):
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    return {dn.get("name"): dn.text for dn in workbook.iter(f"{NS_MAIN}definedName")
+            if dn.get("localSheetId") is None and dn.text}
+
+
+def table_parts(zf, part):
+    """Part names of the Excel Tables on a sheet part, in relationship order."""
+    folder, base = part.rsplit("/", 1)
+    try:
+        rels = ET.fromstring(zf.read(f"{folder}/_rels/{base}.rels"))
+    except KeyError:
+        return []
+    parts = []
+    for rel in rels.iter(f"{NS_PKG_REL}Relationship"):
+        if rel.get("Type", "").endswith("/table"):
+            target = rel.get("Target")
+            # Targets are relative to the sheet's folder (../tables/table1.xml) unless absolute
+            parts.append(target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"{folder}/{target}"))
+    return parts
+
+
+def _tables(zf, part):
+    """(name, ref, columns, header rows, totals rows) of each Excel Table on a sheet part."""
+    tables = []
+    for path in table_parts(zf, part):
+        table = ET.fromstring(zf.read(path))
+        columns = [c.get("name") for c in table.iter(f"{NS_MAIN}tableColumn")]
+        tables.append((table.get("displayName") or table.get("name"), table.get("ref"), columns,
+                       int(table.get("headerRowCount", 1)), int(table.get("totalsRowCount", 0))))
+    return tables
+
+
+def shared_strings(zf):
+    """Shared string table of an open xlsx zip, as a list."""
+    try:
+        root = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+    except KeyError:
+        return []
+    return ["".join(t.text or "" for t in si.iter(f"{NS_MAIN}t")) for si in root.iter(f"{NS_MAIN}si")]
+
+
+def cell_value(el, strings):
+    """Value of a <c> element: str, bool, int or float, ExcelError, or None if empty."""
+    kind = el.get("t", "n")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in el.iter(f"{NS_MAIN}t"))
+    v = el.find(f"{NS_MAIN}v")
+    text = v.text if v is not None else None
+    if text is None:
+        return None
+    if kind == "s":
+        return strings[int(text)]
+    if kind in ("str", "e"):
+        return ERRORS.get(text, text) if kind == "e" else text
+    if kind == "b":
+        return text == "1"
+    number = float(text)
+    return int(number) if number.is_integer() and "." not in text and "E" not in text.upper() else number
+
+
+def load_book(zf):
+    """Book with every cell of every sheet in an open xlsx zip."""
+    book = Book(_defined_names(zf))
+    strings = shared_strings(zf)
+    for title, part in sheet_parts(zf).items():
+        book.add_sheet(title)
+        for name, ref, columns, header_rows, totals_rows in _tables(zf, part):
+            book.add_table(name, title, ref, columns, header_rows, totals_rows)
+        with zf.open(part) as fh:
+            for _, el in ET.iterparse(fh):
+                if el.tag != f"{NS_MAIN}c":
+                    if el.tag == f"{NS_MAIN}row":
+                        el.clear()
+                    continue
+                letters, digits = COORD.fullmatch(el.get("r")).groups()
+                row, col = int(digits), column_index_from_string(letters)
+                f = el.find(f"{NS_MAIN}f")
+                if f is not None and f.text and f.get("t") in (None, "normal"):
+                    book.set(title, row, col, "=" + f.text)
+                else:
+                    value = cell_value(el, strings)
+                    if value is not None:
+                        book.set(title, row, col, value)
+    book.resolve_names()
+    return book
+
+
+# A formula cell: <c r="E5" s="6"><f>D5/C5</f><v /></c>, possibly with a cached <v>
+FORMULA_CELL = re.compile(rb'<c r="([A-Z]+[0-9]+)"([^>]*)>(<f(?: [^>]*)?>[^<]*</f>)(?:<v ?/>|<v>[^<]*</v>)?</c>')
+TYPE_ATTR = re.compile(rb' t="[^"]*"')
+
+
+def _cached(value):
+    """(t attribute, <v> text) for a formula result."""
+    if isinstance(value, ExcelError):
+        return ' t="e"', value.code
+    if isinstance(value, bool):
+        return ' t="b"', "1" if value else "0"
+    if isinstance(value, str):
+        return ' t="str"', escape(value)
+    if value is None:
+        return "", "0"
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return ' t="e"', NUM.code
+    return "", safe_string(value)
+
+
+def _embed_sheet(xml, book, title):
+    def replace(match):
+        letters, digits = COORD.fullmatch(match.group(1).decode()).groups()
+        value = book.value(title, int(digits), column_index_from_string(letters))
+        kind, text = _cached(value)
+        attrs = TYPE_ATTR.sub(b"", match.group(2))
+        return b'<c r="%s"%s%s>%s<v>%s</v></c>' % (
+            match.group(1), attrs, kind.encode(), match.group(3), text.encode())
+    return FORMULA_CELL.sub(replace, xml)
+
+
+def embed_cached_values(filename):
+    """
+    Evaluate every formula in ``filename`` and write the results into the
+    file as cached values. Returns the number of formulas evaluated.
+    """
+    with zipfile.ZipFile(filename) as zf:
+        book = load_book(zf)
+        parts = sheet_parts(zf)
+        replaced = {part: _embed_sheet(zf.read(part), book, title) for title, part in parts.items()}
+
+        fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(filename)))
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp, "w") as out:
+                for info in zf.infolist():
+                    out.writestr(info, replaced.get(info.filename) or zf.read(info.filename))
+        except BaseException:
+            os.remove(tmp)
+            raise
+    os.replace(tmp, filename)
+    return sum(len(book.formulas(title)) for title in parts)
+
+
+# =============================================================================
+# COST MODEL CHECK
+# =============================================================================
+
+def check_against_cost_model(filename, catalog, tolerance=1e-9):
+    """
+    Compare the cached values in ``filename`` (read with data_only=True)
+    with costing.CostModel. Returns a list of mismatch descriptions.
+    """
+    import openpyxl
+    from costing import CostModel
+
+    model = CostModel(catalog)
+    wb = openpyxl.load_workbook(filename, data_only=True, read_only=True)
+    problems = []
+
+    def expect(where, got, want):
+        if isinstance(want, str) or want is None:
+            ok = got == want
+        else:
+            ok = isinstance(got, (int, float)) and abs(got - want) <= tolerance * max(1.0, abs(want))
+        if not ok:
+            problems.append(f"{where}: cached {got!r}, expected {want!r}")
+
+    rows = wb["Ingredient Prices"].iter_rows(min_row=5, max_row=4 + len(catalog.ingredients), values_only=True)
+    for ing, row in zip(catalog.ingredients, rows):
+        expect(f"Ingredient Prices / {ing.name} price per unit", row[4], ing.unit_price)
+
+    rows = wb["Recipe Costs"].iter_rows(min_row=2, max_row=1 + len(catalog.recipes), values_only=True)
+    for r, (rec, row) in enumerate(zip(catalog.recipes, rows)):
+        expect(f"Recipe Costs / {rec.name} cost per batch", row[4], float(model.batch_costs[r]))
+
+    ws = wb["Batch Calculator"]
+    recipe, qty, size = (ws.cell(row=r, column=2).value for r in (4, 5, 6))
+    if recipe:
+        total_row = 10 + len(catalog.used_ingredients)
+        expect(f"Batch Calculator / {recipe} total", ws.cell(row=total_row, column=6).value,
+               model.batch_cost(recipe, qty, size))
+
+    ws = wb["Order Calculator"]
+    order_total = 0.0
+    for row in ws.iter_rows(min_row=5, values_only=True):
+        if len(row) >= 7 and row[0] == "TOTALS":
+            expect("Order Calculator / total cost", row[6], order_total)
+        if len(row) < 7 or not isinstance(row[0], int) or not row[1]:
+            continue
+        want = float(model.order_costs(model.recipe_positions_for([row[1]]), [row[2]], [row[3]])[0])
+        expect(f"Order Calculator / order {row[0]} cost", row[6], want)
+        order_total += want
+
+    ws = wb["Shopping List"]
+    rows = ws.iter_rows(min_row=5, max_row=4 + len(catalog.used_ingredients), values_only=True)
+    for ing, row in zip(catalog.used_ingredients, rows):
+        if row[1] in (None, ""):
+            continue
+        packages = math.ceil(float("%.15g" % (row[1] / ing.package_size)))
+        expect(f"Shopping List / {ing.name} packages", row[4], packages)
+        expect(f"Shopping List / {ing.name} cost", row[6], packages * ing.package_price)
+        if len(row) > 10 and isinstance(row[9], (int, float)):
+            expect(f"Shopping List / {ing.name} mix savings", row[10], packages * ing.package_price - row[9])
+    wb.close()
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embed cached formula results in an xlsx")
+    parser.add_argument("workbook", help="xlsx file to update in place")
+    parser.add_argument("--check", action="store_true",
+                        help="after embedding, compare the cached costs with costing.CostModel")
+    args = parser.parse_args(argv)
+
+    count = embed_cached_values(args.workbook)
+    problems = []
+    if args.check:
+        from catalog import load_catalog
+
+        problems = check_against_cost_model(args.workbook, load_catalog())
+
+    print(f"Evaluated {count} formulas")
+    for problem in problems:
+        print(f"  ✗ {problem}")
+    if problems:
+        sys.exit(1)
+    if args.check:
+        print("✅ Cached values match the cost model")
+
+
+if __name__ == "__main__":
+    main()
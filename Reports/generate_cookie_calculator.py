@@ -5,666 +5,1121 @@ Creates a comprehensive xlsx spreadsheet for cookie production planning
 Features:
 - Ingredient price database
 - All cookie recipes with precise measurements
-- Order calculator with quantity/size scaling
+- Order calculator with quantity/size scaling, as an Excel Table sized to
+  the order count or order file, with structured references and a totals row
 - Automatic cost calculations
+- Streaming (write-only) mode for very large order books
+- Per-recipe cost workbooks, built in parallel alongside the combined calculator
+- --profile: time, cells, formulas and styles per sheet stage, plus save time
+- Cached formula results embedded in the file (see formula_engine.py)
+- Optional Production Schedule sheet with the oven plan from schedule.py
+- Optional Reorder Plan sheet with the stock projection from inventory.py
+- Optional Sensitivity sheet with Monte Carlo cost bands from sensitivity.py
+- Cheapest package mix per ingredient on the pre-filled Shopping List when
+  ingredients have several package options (see purchasing.py)
+- --pricing: per-recipe pricing JSON/CSV for the web app from the same
+  catalog in the same run (see pricing_export.py)
+- --reproducible: byte-for-byte repeatable files with only the styles in
+  use, fixed timestamps and configurable compression (see reproducible.py)
+
+Each sheet is described by a builder that yields rows of cell specs; the
+same builders drive both the regular in-memory workbook and the
+write-only streaming workbook, so both modes produce the same layout.
 """
 
+import argparse
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from time import perf_counter
+
 import openpyxl
 from openpyxl import Workbook
-from openpyxl.styles import Font, Fill, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-from openpyxl.formatting.rule import DataBarRule
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import absolute_coordinate, get_column_letter, quote_sheetname
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableFormula, TableStyleInfo
+
+from calculator_styles import StyleRegistry, recipe_style
+from catalog import load_catalog
+from formula_engine import embed_cached_values
+from reproducible import COMPRESSION, DEFAULT_COMPRESSION, DEFAULT_LEVEL, normalize_workbook
+
+DEFAULT_FILENAME = "midnight_dough_cookie_calculator.xlsx"
+DEFAULT_ORDER_ROWS = 20
+
+# First data row of the sheets other sheets reference by position
+PRICE_FIRST_ROW = 5
+RECIPE_FIRST_ROW = 4
+COSTS_FIRST_ROW = 2
+
+# Bounded defined names, sized from the data each builder writes. Every
+# cross-sheet formula goes through these instead of whole-column references.
+PRICE_LIST = "PriceList"                # Ingredient Prices A:F (Notes in G are not looked up)
+RECIPE_LIST = "RecipeList"              # Recipe Database A:K
+RECIPE_KEY = "RecipeKey"                # Recipe Database I (Recipe|Ingredient)
+RECIPE_KEY_AMOUNT = "RecipeKeyAmount"   # Recipe Database J
+RECIPE_KEY_CATEGORY = "RecipeKeyCategory"  # Recipe Database K
+RECIPE_COSTS = "RecipeCosts"            # Recipe Costs A:F
+COOKIE_TYPES = "CookieTypes"            # Recipe Costs A (recipe names, dropdown source)
+
+# Excel Table holding the Order Calculator rows
+ORDER_TABLE = "Orders"
+
+# Quick Reference sizing guidance (recipes without an entry show their base size)
+RECOMMENDED_SIZES = {
+    "Sugar Cookie": "45-50g",
+    "Snickerdoodle": "40g (sm) / 70-80g (lg)",
+    "Dark Chocolate Chip": "110-120g",
+    "Chocolate Chip": "40-70g / 80-100g (lg)",
+    "Lemon Sugar": "30g / 45-55g (bakery)",
+    "Oatmeal Raisin": "45-55g",
+}
+
+
+# =============================================================================
+# SHEET WRITERS
+# =============================================================================
+# Builders yield rows; each entry in a row is None (empty), a plain value, or
+# a (value, style_key) tuple naming a StyleRegistry style. Layout (widths,
+# merges, validations) must be declared before the first row so the
+# streaming writer can honour it.
+
+class _Sheet:
+    def __init__(self, ws, styles):
+        self.ws = ws
+        self.styles = styles
+
+    def widths(self, widths):
+        for col, width in widths.items():
+            self.ws.column_dimensions[col].width = width
+
+    def merge(self, ref):
+        self.ws.merge_cells(ref)
+
+    def hide(self):
+        self.ws.sheet_state = "hidden"
+
+    def validate(self, dv, ref):
+        dv.add(ref)
+        self.ws.data_validations.append(dv)
+
+    def table(self, table):
+        self.ws.add_table(table)
+
+    def define(self, name, first_col, first_row, last_col, last_row):
+        """Register a workbook-level name for a bounded range on this sheet."""
+        # An empty table still gets a one-row range so formulas stay valid
+        last_row = max(first_row, last_row)
+        ref = absolute_coordinate(f"{first_col}{first_row}:{last_col}{last_row}")
+        self.ws.parent.defined_names[name] = DefinedName(
+            name, attr_text=f"{quote_sheetname(self.ws.title)}!{ref}"
+        )
+
+
+class InMemorySheet(_Sheet):
+    """Writes rows into a regular openpyxl worksheet."""
+
+    def __init__(self, ws, styles):
+        super().__init__(ws, styles)
+        self.row = 0
+
+    def append(self, row):
+        self.row += 1
+        for col, spec in enumerate(row, 1):
+            if spec is None:
+                continue
+            if type(spec) is tuple:
+                value, style = spec
+                self.styles.apply(self.ws.cell(row=self.row, column=col, value=value), style)
+            else:
+                self.ws.cell(row=self.row, column=col, value=spec)
+
+
+class StreamingSheet(_Sheet):
+    """Streams rows of WriteOnlyCells into a write-only worksheet."""
+
+    def merge(self, ref):
+        self.ws.merged_cells.add(CellRange(ref))
+
+    def table(self, table):
+        # openpyxl always warns in write-only mode; builders set the columns themselves
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            self.ws.add_table(table)
+
+    def append(self, row):
+        cells = []
+        for spec in row:
+            if type(spec) is tuple:
+                value, style = spec
+                spec = WriteOnlyCell(self.ws, value=value)
+                self.styles.apply(spec, style)
+            cells.append(spec)
+        self.ws.append(cells)
+
+
+def cookie_type_validation(catalog, **kwargs):
+    # Points at the recipe names on the hidden Recipe Costs sheet; an inline
+    # "a,b,c" list is capped at 255 characters by Excel
+    return DataValidation(type="list", formula1=COOKIE_TYPES, allow_blank=True, **kwargs)
+
+
+def table_column(table, column, this_row=False):
+    """Structured reference to one column of ``table``, e.g. Orders[[#This Row],[Qty]]."""
+    # [ ] # and ' inside a column name are escaped with a leading '
+    escaped = "".join("'" + ch if ch in "[]#'" else ch for ch in column)
+    if this_row:
+        return f"{table}[[#This Row],[{escaped}]]"
+    return f"{table}[{escaped}]"
+
+
+def price_row(catalog, ingredient_id):
+    """Ingredient Prices row holding ``ingredient_id``."""
+    return PRICE_FIRST_ROW + catalog.ingredient_index[ingredient_id]
+
+
+def recipe_key(recipe_name, ingredient_name):
+    return f"{recipe_name}|{ingredient_name}"
+
+
+def recipe_line_rows(catalog):
+    """Yield (recipe, line, row) for every Recipe Database line, in sheet order."""
+    row = RECIPE_FIRST_ROW
+    for recipe in catalog.recipes:
+        for line in recipe.lines:
+            yield recipe, line, row
+            row += 1
+
+
+# =============================================================================
+# SHEET 1: INGREDIENT PRICE DATABASE
+# =============================================================================
+
+def price_rows(sheet, catalog):
+    sheet.widths({'A': 25, 'B': 10, 'C': 15, 'D': 18, 'E': 18, 'F': 16, 'G': 25})
+    sheet.merge('A1:G1')
+    sheet.merge('A2:G2')
+    sheet.define(PRICE_LIST, "A", PRICE_FIRST_ROW, "F", PRICE_FIRST_ROW + len(catalog.ingredients) - 1)
+
+    yield [("🍪 MIDNIGHT DOUGH - INGREDIENT PRICE DATABASE", "title")]
+    yield [("Edit Package Price - Price per Unit calculates automatically", "subtitle")]
+    yield []
+
+    price_headers = ["Ingredient", "Unit", "Package Size", "Package Price ($)", "Price per Unit", "Category", "Notes"]
+    yield [(header, "header") for header in price_headers]
+
+    for row, ing in enumerate(catalog.ingredients, PRICE_FIRST_ROW):
+        yield [
+            (ing.name, "cell"),
+            (ing.unit, "cell"),
+            (ing.package_size, "cell"),
+            # Package price (editable)
+            (ing.package_price, "price_input"),
+            # Price per unit - FORMULA
+            (f"=D{row}/C{row}", "unit_price"),
+            (ing.category, "cell"),
+            (ing.notes, "cell"),
+        ]
+
+
+# =============================================================================
+# SHEET 2: RECIPE DATABASE
+# =============================================================================
+
+def recipe_rows(sheet, catalog):
+    sheet.widths({'A': 22, 'B': 12, 'C': 14, 'D': 15, 'E': 25, 'F': 10, 'G': 8, 'H': 12,
+                  'I': 36, 'J': 12, 'K': 16})
+    sheet.merge('A1:K1')
+    last_row = RECIPE_FIRST_ROW + sum(len(rec.lines) for rec in catalog.recipes) - 1
+    sheet.define(RECIPE_LIST, "A", RECIPE_FIRST_ROW, "K", last_row)
+    for name, col in ((RECIPE_KEY, "I"), (RECIPE_KEY_AMOUNT, "J"), (RECIPE_KEY_CATEGORY, "K")):
+        sheet.define(name, col, RECIPE_FIRST_ROW, col, last_row)
+
+    yield [("🍪 MIDNIGHT DOUGH - RECIPE DATABASE", "title")]
+    yield []
 
-def create_cookie_calculator():
-    wb = Workbook()
-    
-    # =========================================================================
-    # STYLING
-    # =========================================================================
-    header_fill = PatternFill(start_color="1a1a2e", end_color="1a1a2e", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True, size=12)
-    subheader_fill = PatternFill(start_color="16213e", end_color="16213e", fill_type="solid")
-    money_fill = PatternFill(start_color="e8f5e9", end_color="e8f5e9", fill_type="solid")
-    input_fill = PatternFill(start_color="e3f2fd", end_color="e3f2fd", fill_type="solid")
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    # =========================================================================
-    # SHEET 1: INGREDIENT PRICE DATABASE
-    # =========================================================================
-    ws_prices = wb.active
-    ws_prices.title = "Ingredient Prices"
-    
-    # Header
-    ws_prices.merge_cells('A1:F1')
-    ws_prices['A1'] = "🍪 MIDNIGHT DOUGH - INGREDIENT PRICE DATABASE"
-    ws_prices['A1'].font = Font(color="FFFFFF", bold=True, size=16)
-    ws_prices['A1'].fill = header_fill
-    ws_prices['A1'].alignment = Alignment(horizontal='center')
-    
-    ws_prices.merge_cells('A2:F2')
-    ws_prices['A2'] = "Edit Package Price - Price per Unit calculates automatically"
-    ws_prices['A2'].font = Font(italic=True, size=10)
-    ws_prices['A2'].alignment = Alignment(horizontal='center')
-    
-    # Column headers
-    price_headers = ["Ingredient", "Unit", "Package Size", "Package Price ($)", "Price per Unit", "Notes"]
-    for col, header in enumerate(price_headers, 1):
-        cell = ws_prices.cell(row=4, column=col, value=header)
-        cell.font = header_font
-        cell.fill = subheader_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    # Ingredient data - NO formulas in tuple, we'll add them separately
-    ingredients = [
-        ("Unsalted Butter", "g", 454, 5.99, "Standard 1lb block"),
-        ("Vegetable Shortening", "g", 1360, 6.49, "Crisco 48oz"),
-        ("Granulated Sugar", "g", 1814, 4.29, "4lb bag"),
-        ("Brown Sugar (Light)", "g", 907, 3.99, "2lb bag"),
-        ("Brown Sugar (Dark)", "g", 907, 3.99, "2lb bag"),
-        ("Powdered Sugar", "g", 907, 2.99, "2lb bag"),
-        ("All-Purpose Flour", "g", 2268, 4.49, "5lb bag"),
-        ("Cornstarch", "g", 454, 2.99, "1lb box"),
-        ("Dutch-Process Cocoa", "g", 227, 8.99, "8oz premium"),
-        ("Old-Fashioned Oats", "g", 1134, 4.99, "40oz container"),
-        ("Baking Powder", "g", 283, 3.49, "10oz can"),
-        ("Baking Soda", "g", 454, 1.99, "1lb box"),
-        ("Cream of Tartar", "g", 85, 6.99, "3oz jar"),
-        ("Eggs (large)", "each", 12, 4.99, "Dozen"),
-        ("Egg Yolk", "each", 12, 4.99, "From dozen"),
-        ("Sour Cream", "g", 454, 2.99, "16oz container"),
-        ("Cream Cheese", "g", 227, 3.49, "8oz block"),
-        ("Vanilla Extract", "g", 118, 8.99, "4oz pure vanilla"),
-        ("Lemon Juice (fresh)", "tbsp", 3, 0.50, "Per lemon ~3tbsp"),
-        ("Lemon Zest", "tbsp", 1, 0.17, "Per lemon ~1tbsp"),
-        ("Lemon Extract", "g", 59, 4.99, "2oz bottle"),
-        ("Espresso Powder", "g", 57, 7.99, "2oz jar"),
-        ("Ground Cinnamon", "g", 68, 4.99, "2.4oz jar"),
-        ("Nutmeg", "g", 62, 5.99, "2.2oz jar"),
-        ("Salt (Kosher)", "g", 1361, 3.99, "3lb box"),
-        ("Flaky Sea Salt", "g", 113, 6.99, "4oz Maldon"),
-        ("Chocolate Chips", "g", 340, 4.99, "12oz bag"),
-        ("Dark Chocolate Chunks", "g", 283, 6.99, "10oz premium"),
-        ("Raisins", "g", 425, 4.49, "15oz box"),
-        ("Walnuts (chopped)", "g", 227, 7.99, "8oz bag"),
-        ("Pecans (chopped)", "g", 227, 9.99, "8oz bag"),
+    recipe_headers = ["Recipe Name", "Base Yield", "Base Size (g)", "Total Dough (g)", "Ingredient", "Amount", "Unit", "Category",
+                      "Lookup Key", "Key Amount", "Key Category"]
+    yield [(header, "header") for header in recipe_headers]
+
+    # An ingredient can appear on several lines of one recipe (e.g. Granulated
+    # Sugar as Wet and Rolling). Its first line carries the plain
+    # "Recipe|Ingredient" key, the summed amount and every category in line
+    # order; later lines get a numbered key so every key stays unique.
+    row = RECIPE_FIRST_ROW
+    for recipe in catalog.recipes:
+        style = recipe_style(recipe.name)
+        pairs = {}
+        for offset, line in enumerate(recipe.lines):
+            rows, categories = pairs.setdefault(line.ingredient_id, ([], []))
+            rows.append(row + offset)
+            if line.category not in categories:
+                categories.append(line.category)
+
+        seen = {}
+        for line in recipe.lines:
+            ing = catalog.ingredient(line.ingredient_id)
+            rows, categories = pairs[line.ingredient_id]
+            occurrence = seen[line.ingredient_id] = seen.get(line.ingredient_id, 0) + 1
+            key = recipe_key(recipe.name, ing.name)
+            if occurrence == 1:
+                key_amount = "=" + "+".join(f"F{r}" for r in rows)
+                key_category = " / ".join(categories)
+            else:
+                key, key_amount, key_category = f"{key}|{occurrence}", None, None
+            data = (recipe.name, recipe.base_yield, recipe.base_size, recipe.total_dough,
+                    ing.name, line.amount, ing.unit, line.category, key, key_amount, key_category)
+            yield [(val, style) for val in data]
+            row += 1
+
+
+# =============================================================================
+# SHEET 3: BATCH CALCULATOR
+# =============================================================================
+
+def batch_rows(sheet, catalog):
+    sheet.widths({'A': 25, 'B': 14, 'C': 8, 'D': 16, 'E': 14, 'F': 16, 'G': 12, 'H': 14})
+    sheet.merge('A1:H1')
+    sheet.merge('A2:H2')
+    sheet.validate(cookie_type_validation(catalog), 'B4')
+
+    # Every ingredient used by at least one recipe, followed by a blank row and the total
+    all_ingredients = [ing.name for ing in catalog.used_ingredients]
+    total_row = 9 + len(all_ingredients) + 1
+
+    yield [("📊 BATCH CALCULATOR - Scale Any Recipe", "title")]
+    yield [("Select cookie type, enter quantity & size. Ingredients scale automatically with costs!", "subtitle")]
+    yield []
+
+    # Inputs (column B), recipe lookups (E) and summary (H)
+    yield [
+        ("Cookie Type:", "label"), (None, "input"), None,
+        ("Base Yield:", "label"), (f'=IFERROR(VLOOKUP(B4,{RECIPE_COSTS},2,FALSE),"")', "cell"), None,
+        ("Total Dough:", "label"), ('=IF(OR(B5="",B6=""),"",B5*B6)', "grams"),
     ]
-    
-    # Write ingredient data with PROPER formulas
-    for i, ing in enumerate(ingredients):
-        row = 5 + i
-        # Ingredient name
-        ws_prices.cell(row=row, column=1, value=ing[0]).border = thin_border
-        # Unit
-        ws_prices.cell(row=row, column=2, value=ing[1]).border = thin_border
-        # Package size
-        cell_size = ws_prices.cell(row=row, column=3, value=ing[2])
-        cell_size.border = thin_border
-        # Package price (editable)
-        cell_price = ws_prices.cell(row=row, column=4, value=ing[3])
-        cell_price.border = thin_border
-        cell_price.fill = input_fill
-        cell_price.number_format = '$#,##0.00'
-        # Price per unit - FORMULA
-        cell_ppu = ws_prices.cell(row=row, column=5)
-        cell_ppu.value = f"=D{row}/C{row}"
-        cell_ppu.border = thin_border
-        cell_ppu.fill = money_fill
-        cell_ppu.number_format = '$#,##0.0000'
-        # Notes
-        ws_prices.cell(row=row, column=6, value=ing[4]).border = thin_border
-    
-    # Set column widths
-    ws_prices.column_dimensions['A'].width = 25
-    ws_prices.column_dimensions['B'].width = 10
-    ws_prices.column_dimensions['C'].width = 15
-    ws_prices.column_dimensions['D'].width = 18
-    ws_prices.column_dimensions['E'].width = 18
-    ws_prices.column_dimensions['F'].width = 25
-    
-    # =========================================================================
-    # SHEET 2: RECIPE DATABASE
-    # =========================================================================
-    ws_recipes = wb.create_sheet("Recipe Database")
-    
-    # Header
-    ws_recipes.merge_cells('A1:H1')
-    ws_recipes['A1'] = "🍪 MIDNIGHT DOUGH - RECIPE DATABASE"
-    ws_recipes['A1'].font = Font(color="FFFFFF", bold=True, size=16)
-    ws_recipes['A1'].fill = header_fill
-    ws_recipes['A1'].alignment = Alignment(horizontal='center')
-    
-    recipe_headers = ["Recipe Name", "Base Yield", "Base Size (g)", "Total Dough (g)", "Ingredient", "Amount", "Unit", "Category"]
-    for col, header in enumerate(recipe_headers, 1):
-        cell = ws_recipes.cell(row=3, column=col, value=header)
-        cell.font = header_font
-        cell.fill = subheader_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    # All recipes with ingredients
-    recipes_data = [
-        # Sugar Cookies
-        ("Sugar Cookie", 24, 48, 1152, "Unsalted Butter", 170, "g", "Wet"),
-        ("Sugar Cookie", 24, 48, 1152, "Granulated Sugar", 250, "g", "Wet"),
-        ("Sugar Cookie", 24, 48, 1152, "Eggs (large)", 1, "each", "Wet"),
-        ("Sugar Cookie", 24, 48, 1152, "Vanilla Extract", 8, "g", "Wet"),
-        ("Sugar Cookie", 24, 48, 1152, "Sour Cream", 30, "g", "Wet"),
-        ("Sugar Cookie", 24, 48, 1152, "All-Purpose Flour", 345, "g", "Dry"),
-        ("Sugar Cookie", 24, 48, 1152, "Cornstarch", 8, "g", "Dry"),
-        ("Sugar Cookie", 24, 48, 1152, "Baking Powder", 5, "g", "Dry"),
-        ("Sugar Cookie", 24, 48, 1152, "Baking Soda", 3, "g", "Dry"),
-        ("Sugar Cookie", 24, 48, 1152, "Salt (Kosher)", 4, "g", "Dry"),
-        ("Sugar Cookie", 24, 48, 1152, "Granulated Sugar", 50, "g", "Rolling"),
-        
-        # Snickerdoodle
-        ("Snickerdoodle", 24, 50, 1200, "All-Purpose Flour", 375, "g", "Dry"),
-        ("Snickerdoodle", 24, 50, 1200, "Cream of Tartar", 6, "g", "Dry"),
-        ("Snickerdoodle", 24, 50, 1200, "Baking Soda", 5, "g", "Dry"),
-        ("Snickerdoodle", 24, 50, 1200, "Ground Cinnamon", 4, "g", "Dry"),
-        ("Snickerdoodle", 24, 50, 1200, "Salt (Kosher)", 3, "g", "Dry"),
-        ("Snickerdoodle", 24, 50, 1200, "Unsalted Butter", 226, "g", "Wet"),
-        ("Snickerdoodle", 24, 50, 1200, "Granulated Sugar", 267, "g", "Wet"),
-        ("Snickerdoodle", 24, 50, 1200, "Eggs (large)", 1, "each", "Wet"),
-        ("Snickerdoodle", 24, 50, 1200, "Egg Yolk", 1, "each", "Wet"),
-        ("Snickerdoodle", 24, 50, 1200, "Vanilla Extract", 8, "g", "Wet"),
-        ("Snickerdoodle", 24, 50, 1200, "Granulated Sugar", 70, "g", "Topping"),
-        ("Snickerdoodle", 24, 50, 1200, "Ground Cinnamon", 3, "g", "Topping"),
-        
-        # Dark Chocolate Chocolate Chip
-        ("Dark Chocolate Chip", 10, 115, 1150, "Unsalted Butter", 226, "g", "Wet"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Brown Sugar (Dark)", 220, "g", "Wet"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Granulated Sugar", 100, "g", "Wet"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Eggs (large)", 2, "each", "Wet"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Vanilla Extract", 8, "g", "Wet"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "All-Purpose Flour", 280, "g", "Dry"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Dutch-Process Cocoa", 60, "g", "Dry"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Baking Soda", 5, "g", "Dry"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Salt (Kosher)", 4, "g", "Dry"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Espresso Powder", 2, "g", "Dry"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Dark Chocolate Chunks", 255, "g", "Mix-in"),
-        ("Dark Chocolate Chip", 10, 115, 1150, "Flaky Sea Salt", 2, "g", "Topping"),
-        
-        # Chocolate Chip (Double Batch)
-        ("Chocolate Chip", 48, 55, 2640, "Granulated Sugar", 300, "g", "Wet"),
-        ("Chocolate Chip", 48, 55, 2640, "Brown Sugar (Light)", 400, "g", "Wet"),
-        ("Chocolate Chip", 48, 55, 2640, "Unsalted Butter", 454, "g", "Wet"),
-        ("Chocolate Chip", 48, 55, 2640, "Vanilla Extract", 26, "g", "Wet"),
-        ("Chocolate Chip", 48, 55, 2640, "Eggs (large)", 4, "each", "Wet"),
-        ("Chocolate Chip", 48, 55, 2640, "All-Purpose Flour", 750, "g", "Dry"),
-        ("Chocolate Chip", 48, 55, 2640, "Baking Soda", 9, "g", "Dry"),
-        ("Chocolate Chip", 48, 55, 2640, "Salt (Kosher)", 9, "g", "Dry"),
-        ("Chocolate Chip", 48, 55, 2640, "Chocolate Chips", 1020, "g", "Mix-in"),
-        
-        # Lemon Sugar (Double Batch)
-        ("Lemon Sugar", 44, 30, 1320, "All-Purpose Flour", 500, "g", "Dry"),
-        ("Lemon Sugar", 44, 30, 1320, "Baking Soda", 5, "g", "Dry"),
-        ("Lemon Sugar", 44, 30, 1320, "Baking Powder", 5, "g", "Dry"),
-        ("Lemon Sugar", 44, 30, 1320, "Salt (Kosher)", 6, "g", "Dry"),
-        ("Lemon Sugar", 44, 30, 1320, "Unsalted Butter", 454, "g", "Wet"),
-        ("Lemon Sugar", 44, 30, 1320, "Granulated Sugar", 400, "g", "Wet"),
-        ("Lemon Sugar", 44, 30, 1320, "Eggs (large)", 2, "each", "Wet"),
-        ("Lemon Sugar", 44, 30, 1320, "Lemon Juice (fresh)", 4, "tbsp", "Wet"),
-        ("Lemon Sugar", 44, 30, 1320, "Lemon Zest", 2, "tbsp", "Wet"),
-        ("Lemon Sugar", 44, 30, 1320, "Vanilla Extract", 8, "g", "Wet"),
-        ("Lemon Sugar", 44, 30, 1320, "Granulated Sugar", 100, "g", "Rolling"),
-        
-        # Oatmeal Raisin
-        ("Oatmeal Raisin", 24, 50, 1200, "Unsalted Butter", 226, "g", "Wet"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Brown Sugar (Light)", 200, "g", "Wet"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Granulated Sugar", 100, "g", "Wet"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Eggs (large)", 2, "each", "Wet"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Vanilla Extract", 13, "g", "Wet"),
-        ("Oatmeal Raisin", 24, 50, 1200, "All-Purpose Flour", 190, "g", "Dry"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Baking Soda", 5, "g", "Dry"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Ground Cinnamon", 4, "g", "Dry"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Salt (Kosher)", 3, "g", "Dry"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Old-Fashioned Oats", 240, "g", "Mix-in"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Raisins", 190, "g", "Mix-in"),
-        ("Oatmeal Raisin", 24, 50, 1200, "Walnuts (chopped)", 60, "g", "Mix-in"),
+    yield [
+        ("Quantity Needed:", "label"), (None, "input"), None,
+        ("Base Size (g):", "label"), (f'=IFERROR(VLOOKUP(B4,{RECIPE_COSTS},3,FALSE),"")', "cell"), None,
+        ("Total Cost:", "label"), (f'=IF(F{total_row}="","",F{total_row})', "money"),
     ]
-    
-    row = 4
-    recipe_fill_colors = {
-        "Sugar Cookie": "fff3e0",
-        "Snickerdoodle": "fce4ec",
-        "Dark Chocolate Chip": "3e2723",
-        "Chocolate Chip": "8d6e63",
-        "Lemon Sugar": "fffde7",
-        "Oatmeal Raisin": "efebe9"
-    }
-    
-    for data in recipes_data:
-        fill_color = recipe_fill_colors.get(data[0], "ffffff")
-        text_color = "FFFFFF" if data[0] == "Dark Chocolate Chip" else "000000"
-        
-        for col, val in enumerate(data, 1):
-            cell = ws_recipes.cell(row=row, column=col, value=val)
-            cell.border = thin_border
-            cell.fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
-            if text_color == "FFFFFF":
-                cell.font = Font(color=text_color)
-        row += 1
-    
-    # Set column widths
-    ws_recipes.column_dimensions['A'].width = 22
-    ws_recipes.column_dimensions['B'].width = 12
-    ws_recipes.column_dimensions['C'].width = 14
-    ws_recipes.column_dimensions['D'].width = 15
-    ws_recipes.column_dimensions['E'].width = 25
-    ws_recipes.column_dimensions['F'].width = 10
-    ws_recipes.column_dimensions['G'].width = 8
-    ws_recipes.column_dimensions['H'].width = 12
-    
-    # =========================================================================
-    # SHEET 3: BATCH CALCULATOR (FIXED!)
-    # =========================================================================
-    ws_batch = wb.create_sheet("Batch Calculator")
-    
-    cookie_types_str = '"Sugar Cookie,Snickerdoodle,Dark Chocolate Chip,Chocolate Chip,Lemon Sugar,Oatmeal Raisin"'
-    
-    # Header
-    ws_batch.merge_cells('A1:H1')
-    ws_batch['A1'] = "📊 BATCH CALCULATOR - Scale Any Recipe"
-    ws_batch['A1'].font = Font(color="FFFFFF", bold=True, size=16)
-    ws_batch['A1'].fill = header_fill
-    ws_batch['A1'].alignment = Alignment(horizontal='center')
-    
-    # Instructions
-    ws_batch.merge_cells('A2:H2')
-    ws_batch['A2'] = "Select cookie type, enter quantity & size. Ingredients scale automatically with costs!"
-    ws_batch['A2'].font = Font(italic=True, size=10)
-    ws_batch['A2'].alignment = Alignment(horizontal='center')
-    
-    # Input section
-    ws_batch['A4'] = "Cookie Type:"
-    ws_batch['A4'].font = Font(bold=True)
-    cell_type = ws_batch['B4']
-    cell_type.fill = input_fill
-    cell_type.border = thin_border
-    
-    dv_batch = DataValidation(type="list", formula1=cookie_types_str, allow_blank=True)
-    ws_batch.add_data_validation(dv_batch)
-    dv_batch.add(cell_type)
-    
-    ws_batch['A5'] = "Quantity Needed:"
-    ws_batch['A5'].font = Font(bold=True)
-    ws_batch['B5'].fill = input_fill
-    ws_batch['B5'].border = thin_border
-    
-    ws_batch['A6'] = "Cookie Size (g):"
-    ws_batch['A6'].font = Font(bold=True)
-    ws_batch['B6'].fill = input_fill
-    ws_batch['B6'].border = thin_border
-    
-    # Calculated fields
-    ws_batch['D4'] = "Base Yield:"
-    ws_batch['D4'].font = Font(bold=True)
-    ws_batch['E4'] = '=IFERROR(VLOOKUP(B4,\'Recipe Database\'!A:B,2,FALSE),"")'
-    ws_batch['E4'].border = thin_border
-    
-    ws_batch['D5'] = "Base Size (g):"
-    ws_batch['D5'].font = Font(bold=True)
-    ws_batch['E5'] = '=IFERROR(VLOOKUP(B4,\'Recipe Database\'!A:C,3,FALSE),"")'
-    ws_batch['E5'].border = thin_border
-    
-    ws_batch['D6'] = "Scale Factor:"
-    ws_batch['D6'].font = Font(bold=True)
-    ws_batch['E6'] = '=IF(OR(B5="",B6="",E4="",E5=""),"",(B5*B6)/(E4*E5))'
-    ws_batch['E6'].border = thin_border
-    ws_batch['E6'].fill = PatternFill(start_color="fff9c4", end_color="fff9c4", fill_type="solid")
-    ws_batch['E6'].number_format = '0.00'
-    ws_batch['F6'] = "x base recipe"
-    ws_batch['F6'].font = Font(italic=True, color="666666")
-    
-    # Summary
-    ws_batch['G4'] = "Total Dough:"
-    ws_batch['G4'].font = Font(bold=True)
-    ws_batch['H4'] = '=IF(OR(B5="",B6=""),"",B5*B6)'
-    ws_batch['H4'].border = thin_border
-    ws_batch['H4'].number_format = '#,##0 "g"'
-    
-    ws_batch['G5'] = "Total Cost:"
-    ws_batch['G5'].font = Font(bold=True)
-    ws_batch['H5'] = '=IF(H40="","",H40)'
-    ws_batch['H5'].border = thin_border
-    ws_batch['H5'].fill = money_fill
-    ws_batch['H5'].number_format = '$#,##0.00'
-    
-    ws_batch['G6'] = "Cost/Cookie:"
-    ws_batch['G6'].font = Font(bold=True)
-    ws_batch['H6'] = '=IF(OR(H5="",B5=""),"",H5/B5)'
-    ws_batch['H6'].border = thin_border
-    ws_batch['H6'].fill = money_fill
-    ws_batch['H6'].number_format = '$#,##0.00'
-    
-    # Ingredient breakdown headers
-    batch_headers = ["Ingredient", "Base Amount", "Unit", "Scaled Amount", "Unit Price", "Ingredient Cost", "Category"]
-    for col, header in enumerate(batch_headers, 1):
-        cell = ws_batch.cell(row=8, column=col, value=header)
-        cell.font = header_font
-        cell.fill = subheader_fill
-        cell.border = thin_border
-        cell.alignment = Alignment(horizontal='center')
-    
-    # List all possible ingredients with SUMIF formulas
-    all_ingredients = [
-        "Unsalted Butter", "Granulated Sugar", "Brown Sugar (Light)", "Brown Sugar (Dark)",
-        "Eggs (large)", "Egg Yolk", "Vanilla Extract", "Sour Cream", "Cream Cheese",
-        "All-Purpose Flour", "Cornstarch", "Dutch-Process Cocoa", "Old-Fashioned Oats",
-        "Baking Powder", "Baking Soda", "Cream of Tartar",
-        "Ground Cinnamon", "Salt (Kosher)", "Flaky Sea Salt", "Espresso Powder",
-        "Chocolate Chips", "Dark Chocolate Chunks", "Raisins", "Walnuts (chopped)",
-        "Lemon Juice (fresh)", "Lemon Zest"
+    yield [
+        ("Cookie Size (g):", "label"), (None, "input"), None,
+        ("Scale Factor:", "label"), ('=IF(OR(B5="",B6="",E4="",E5=""),"",(B5*B6)/(E4*E5))', "scale"),
+        ("x base recipe", "hint"),
+        ("Cost/Cookie:", "label"), ('=IF(OR(H5="",B5=""),"",H5/B5)', "money"),
     ]
-    
-    for i, ing in enumerate(all_ingredients):
-        row = 9 + i
-        
-        # Ingredient name
-        ws_batch.cell(row=row, column=1, value=ing).border = thin_border
-        
-        # Base amount - SUMIFS to get amount for selected cookie + this ingredient
-        base_formula = f'=IFERROR(SUMIFS(\'Recipe Database\'!F:F,\'Recipe Database\'!A:A,$B$4,\'Recipe Database\'!E:E,A{row}),0)'
-        cell_base = ws_batch.cell(row=row, column=2, value=base_formula)
-        cell_base.border = thin_border
-        cell_base.number_format = '#,##0.00'
-        
-        # Unit lookup
-        unit_formula = f'=IFERROR(VLOOKUP(A{row},\'Ingredient Prices\'!A:B,2,FALSE),"")'
-        ws_batch.cell(row=row, column=3, value=unit_formula).border = thin_border
-        
-        # Scaled amount = base * scale factor
-        scaled_formula = f'=IF(OR($E$6="",B{row}=0),"",ROUND(B{row}*$E$6,1))'
-        cell_scaled = ws_batch.cell(row=row, column=4, value=scaled_formula)
-        cell_scaled.border = thin_border
-        cell_scaled.fill = PatternFill(start_color="fff3e0", end_color="fff3e0", fill_type="solid")
-        cell_scaled.number_format = '#,##0.0'
-        
-        # Unit price lookup
-        price_formula = f'=IFERROR(VLOOKUP(A{row},\'Ingredient Prices\'!A:E,5,FALSE),0)'
-        cell_price = ws_batch.cell(row=row, column=5, value=price_formula)
-        cell_price.border = thin_border
-        cell_price.number_format = '$#,##0.0000'
-        
-        # Ingredient cost = scaled amount * unit price
-        cost_formula = f'=IF(D{row}="",0,D{row}*E{row})'
-        cell_cost = ws_batch.cell(row=row, column=6, value=cost_formula)
-        cell_cost.border = thin_border
-        cell_cost.fill = money_fill
-        cell_cost.number_format = '$#,##0.00'
-        
-        # Category lookup
-        cat_formula = f'=IFERROR(INDEX(\'Recipe Database\'!H:H,MATCH(1,(\'Recipe Database\'!A:A=$B$4)*(\'Recipe Database\'!E:E=A{row}),0)),"")'
-        ws_batch.cell(row=row, column=7, value=cat_formula).border = thin_border
-    
-    # Total row
-    total_row = 9 + len(all_ingredients) + 1
-    ws_batch.cell(row=total_row, column=5, value="TOTAL COST:").font = Font(bold=True, size=12)
-    ws_batch.cell(row=total_row, column=6, value=f"=SUM(F9:F{total_row-1})").font = Font(bold=True, size=12)
-    ws_batch.cell(row=total_row, column=6).fill = PatternFill(start_color="c8e6c9", end_color="c8e6c9", fill_type="solid")
-    ws_batch.cell(row=total_row, column=6).number_format = '$#,##0.00'
-    ws_batch.cell(row=total_row, column=6).border = thin_border
-    
-    # Update H5 to reference correct total row
-    ws_batch['H5'] = f'=IF(F{total_row}="","",F{total_row})'
-    
-    # Column widths
-    ws_batch.column_dimensions['A'].width = 25
-    ws_batch.column_dimensions['B'].width = 14
-    ws_batch.column_dimensions['C'].width = 8
-    ws_batch.column_dimensions['D'].width = 16
-    ws_batch.column_dimensions['E'].width = 14
-    ws_batch.column_dimensions['F'].width = 16
-    ws_batch.column_dimensions['G'].width = 12
-    ws_batch.column_dimensions['H'].width = 14
-    
-    # =========================================================================
-    # SHEET 4: ORDER CALCULATOR
-    # =========================================================================
-    ws_order = wb.create_sheet("Order Calculator")
-    
-    # Header
-    ws_order.merge_cells('A1:I1')
-    ws_order['A1'] = "🍪 MIDNIGHT DOUGH - ORDER CALCULATOR"
-    ws_order['A1'].font = Font(color="FFFFFF", bold=True, size=16)
-    ws_order['A1'].fill = header_fill
-    ws_order['A1'].alignment = Alignment(horizontal='center')
-    
-    # Instructions
-    ws_order.merge_cells('A2:I2')
-    ws_order['A2'] = "Add multiple orders. Each row calculates batches needed and estimated ingredient cost."
-    ws_order['A2'].font = Font(italic=True, size=10)
-    ws_order['A2'].alignment = Alignment(horizontal='center')
-    
-    # Order entry headers
-    order_headers = ["#", "Cookie Type", "Qty", "Size (g)", "Total Dough (g)", 
-                     "Scale Factor", "Est. Cost ($)", "Cost/Cookie", "Notes"]
-    for col, header in enumerate(order_headers, 1):
-        cell = ws_order.cell(row=4, column=col, value=header)
-        cell.font = header_font
-        cell.fill = subheader_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    # Create dropdown for cookie types
-    dv = DataValidation(type="list", formula1=cookie_types_str, allow_blank=True)
-    dv.error = "Please select a valid cookie type"
-    dv.errorTitle = "Invalid Cookie Type"
-    ws_order.add_data_validation(dv)
-    
-    # Add 20 order rows with formulas
-    for i in range(20):
-        row = 5 + i
-        order_num = i + 1
-        
-        # Order number
-        ws_order.cell(row=row, column=1, value=order_num).border = thin_border
-        
-        # Cookie type (dropdown)
-        cell_cookie = ws_order.cell(row=row, column=2)
-        cell_cookie.border = thin_border
-        cell_cookie.fill = input_fill
-        dv.add(cell_cookie)
-        
-        # Quantity (user input)
-        cell_qty = ws_order.cell(row=row, column=3)
-        cell_qty.border = thin_border
-        cell_qty.fill = input_fill
-        
-        # Cookie size (user input)
-        cell_size = ws_order.cell(row=row, column=4)
-        cell_size.border = thin_border
-        cell_size.fill = input_fill
-        
-        # Total dough needed formula
-        cell_dough = ws_order.cell(row=row, column=5, value=f'=IF(C{row}="","",C{row}*D{row})')
-        cell_dough.border = thin_border
-        cell_dough.number_format = '#,##0'
-        
+    yield []
+
+    batch_headers = ["Ingredient", "Base Amount", "Unit", "Scaled Amount", "Unit Price", "Ingredient Cost", "Category"]
+    yield [(header, "header") for header in batch_headers]
+
+    for row, ing in enumerate(all_ingredients, 9):
+        yield [
+            (ing, "cell"),
+            # Base amount - exact match on the Recipe|Ingredient key
+            (f'=IFERROR(INDEX({RECIPE_KEY_AMOUNT},MATCH($B$4&"|"&A{row},{RECIPE_KEY},0)),0)', "amount"),
+            # Unit lookup
+            (f'=IFERROR(VLOOKUP(A{row},{PRICE_LIST},2,FALSE),"")', "cell"),
+            # Scaled amount = base * scale factor
+            (f'=IF(OR($E$6="",B{row}=0),"",ROUND(B{row}*$E$6,1))', "scaled"),
+            # Unit price lookup
+            (f'=IFERROR(VLOOKUP(A{row},{PRICE_LIST},5,FALSE),0)', "rate"),
+            # Ingredient cost = scaled amount * unit price
+            (f'=IF(D{row}="",0,D{row}*E{row})', "money"),
+            # Category lookup on the same key
+            (f'=IFERROR(INDEX({RECIPE_KEY_CATEGORY},MATCH($B$4&"|"&A{row},{RECIPE_KEY},0)),"")', "cell"),
+        ]
+
+    yield []
+    yield [None, None, None, None, ("TOTAL COST:", "label"), (f"=SUM(F9:F{total_row-1})", "total_money")]
+
+
+# =============================================================================
+# SHEET 4: ORDER CALCULATOR
+# =============================================================================
+
+ORDER_HEADERS = ["#", "Cookie Type", "Qty", "Size (g)", "Total Dough (g)",
+                 "Scale Factor", "Est. Cost ($)", "Cost/Cookie", "Notes"]
+# Columns summed in the table's totals row
+ORDER_TOTALS = ("Qty", "Total Dough (g)", "Est. Cost ($)")
+
+
+def order_rows(sheet, catalog, order_count=DEFAULT_ORDER_ROWS, orders=None):
+    """
+    One table row per order; ``orders`` ((cookie type, qty, size) tuples,
+    e.g. from an order file) pre-fills the inputs and sets the minimum size.
+    """
+    sheet.widths({'A': 5, 'B': 22, 'C': 8, 'D': 10, 'E': 16, 'F': 12, 'G': 14, 'H': 12, 'I': 20})
+    sheet.merge('A1:I1')
+    sheet.merge('A2:I2')
+
+    orders = orders or []
+    order_count = max(order_count, len(orders), 1)
+    first_row = 5
+    last_row = first_row + order_count - 1
+    # The totals row belongs to the table, directly below the last order
+    total_row = last_row + 1
+
+    def this_row(column):
+        return table_column(ORDER_TABLE, column, this_row=True)
+
+    qty, size, cookie = this_row("Qty"), this_row("Size (g)"), this_row("Cookie Type")
+    dough, factor, cost = this_row("Total Dough (g)"), this_row("Scale Factor"), this_row("Est. Cost ($)")
+    calculated = {
+        # Total dough needed
+        "Total Dough (g)": f'IF({qty}="","",{qty}*{size})',
         # Scale factor
-        scale_formula = f'=IF(B{row}="","",E{row}/VLOOKUP(B{row},\'Recipe Database\'!A:D,4,FALSE))'
-        cell_scale = ws_order.cell(row=row, column=6, value=scale_formula)
-        cell_scale.border = thin_border
-        cell_scale.number_format = '0.00'
-        
-        # Est cost formula - calculate from recipe cost lookup
-        # First we need to know the base cost per batch, then multiply by scale factor
-        cost_formula = f'=IFERROR(IF(F{row}="","",F{row}*SUMPRODUCT((\'Recipe Database\'!A$4:A$100=B{row})*(\'Recipe Database\'!F$4:F$100)*VLOOKUP(\'Recipe Database\'!E$4:E$100,\'Ingredient Prices\'!A:E,5,FALSE))),"")'
-        cell_cost = ws_order.cell(row=row, column=7, value=cost_formula)
-        cell_cost.border = thin_border
-        cell_cost.number_format = '$#,##0.00'
-        cell_cost.fill = money_fill
-        
+        "Scale Factor": f'IF({cookie}="","",{dough}/VLOOKUP({cookie},{RECIPE_COSTS},4,FALSE))',
+        # Est cost - precomputed cost per batch (Recipe Costs) times scale factor
+        "Est. Cost ($)": f'IFERROR(IF({factor}="","",{factor}*VLOOKUP({cookie},{RECIPE_COSTS},5,FALSE)),"")',
         # Price per cookie
-        price_per = f'=IF(OR(G{row}="",C{row}=""),"",G{row}/C{row})'
-        cell_ppc = ws_order.cell(row=row, column=8, value=price_per)
-        cell_ppc.border = thin_border
-        cell_ppc.number_format = '$#,##0.00'
-        cell_ppc.fill = money_fill
-        
-        # Notes
-        ws_order.cell(row=row, column=9).border = thin_border
-    
-    # Totals row
-    total_row = 26
-    ws_order.cell(row=total_row, column=1, value="TOTALS").font = Font(bold=True)
-    ws_order.cell(row=total_row, column=3, value="=SUM(C5:C25)").font = Font(bold=True)
-    ws_order.cell(row=total_row, column=5, value="=SUM(E5:E25)").font = Font(bold=True)
-    ws_order.cell(row=total_row, column=5).number_format = '#,##0'
-    ws_order.cell(row=total_row, column=7, value="=SUM(G5:G25)").font = Font(bold=True)
-    ws_order.cell(row=total_row, column=7).number_format = '$#,##0.00'
-    ws_order.cell(row=total_row, column=7).fill = PatternFill(start_color="c8e6c9", end_color="c8e6c9", fill_type="solid")
-    
-    for col in range(1, 10):
-        ws_order.cell(row=total_row, column=col).border = thin_border
-    
-    # Set column widths
-    ws_order.column_dimensions['A'].width = 5
-    ws_order.column_dimensions['B'].width = 22
-    ws_order.column_dimensions['C'].width = 8
-    ws_order.column_dimensions['D'].width = 10
-    ws_order.column_dimensions['E'].width = 16
-    ws_order.column_dimensions['F'].width = 12
-    ws_order.column_dimensions['G'].width = 14
-    ws_order.column_dimensions['H'].width = 12
-    ws_order.column_dimensions['I'].width = 20
-    
-    # =========================================================================
-    # SHEET 5: SHOPPING LIST
-    # =========================================================================
-    ws_shopping = wb.create_sheet("Shopping List")
-    
-    # Header
-    ws_shopping.merge_cells('A1:H1')
-    ws_shopping['A1'] = "🛒 INGREDIENT SHOPPING LIST"
-    ws_shopping['A1'].font = Font(color="FFFFFF", bold=True, size=16)
-    ws_shopping['A1'].fill = header_fill
-    ws_shopping['A1'].alignment = Alignment(horizontal='center')
-    
-    ws_shopping.merge_cells('A2:H2')
-    ws_shopping['A2'] = "Enter amounts needed → see packages to buy and total cost"
-    ws_shopping['A2'].font = Font(italic=True, size=10)
-    ws_shopping['A2'].alignment = Alignment(horizontal='center')
-    
-    shop_headers = ["Ingredient", "Amount Needed", "Unit", "Pkg Size", "Pkgs to Buy", "Pkg Price", "Total Cost", "Notes"]
-    for col, header in enumerate(shop_headers, 1):
-        cell = ws_shopping.cell(row=4, column=col, value=header)
-        cell.font = header_font
-        cell.fill = subheader_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    for i, ing in enumerate(all_ingredients):
-        row = 5 + i
-        ws_shopping.cell(row=row, column=1, value=ing).border = thin_border
-        
-        # Amount needed (user enters)
-        cell_needed = ws_shopping.cell(row=row, column=2)
-        cell_needed.border = thin_border
-        cell_needed.fill = input_fill
-        
-        # Unit lookup
-        unit_formula = f"=IFERROR(VLOOKUP(A{row},'Ingredient Prices'!A:B,2,FALSE),\"\")"
-        ws_shopping.cell(row=row, column=3, value=unit_formula).border = thin_border
-        
-        # Package size lookup
-        size_formula = f"=IFERROR(VLOOKUP(A{row},'Ingredient Prices'!A:C,3,FALSE),\"\")"
-        ws_shopping.cell(row=row, column=4, value=size_formula).border = thin_border
-        
-        # Packages to buy
-        pkg_formula = f'=IF(B{row}="","",ROUNDUP(B{row}/D{row},0))'
-        ws_shopping.cell(row=row, column=5, value=pkg_formula).border = thin_border
-        
-        # Package price lookup
-        price_formula = f"=IFERROR(VLOOKUP(A{row},'Ingredient Prices'!A:D,4,FALSE),\"\")"
-        cell_price = ws_shopping.cell(row=row, column=6, value=price_formula)
-        cell_price.border = thin_border
-        cell_price.number_format = '$#,##0.00'
-        
-        # Total cost
-        total_formula = f'=IF(E{row}="","",E{row}*F{row})'
-        cell_total = ws_shopping.cell(row=row, column=7, value=total_formula)
-        cell_total.border = thin_border
-        cell_total.number_format = '$#,##0.00'
-        cell_total.fill = money_fill
-        
-        # Notes
-        ws_shopping.cell(row=row, column=8).border = thin_border
-    
-    # Grand total
+        "Cost/Cookie": f'IF(OR({cost}="",{qty}=""),"",{cost}/{qty})',
+    }
+    totals = {column: f"SUBTOTAL(109,{table_column(ORDER_TABLE, column)})" for column in ORDER_TOTALS}
+
+    table = Table(name=ORDER_TABLE, displayName=ORDER_TABLE, ref=f"A4:I{total_row}", totalsRowCount=1,
+                  autoFilter=AutoFilter(ref=f"A4:I{last_row}"),
+                  tableStyleInfo=TableStyleInfo(name="TableStyleLight1", showRowStripes=False))
+    for idx, header in enumerate(ORDER_HEADERS, 1):
+        column = TableColumn(id=idx, name=header)
+        if header in calculated:
+            column.calculatedColumnFormula = TableFormula(attr_text=calculated[header])
+        if header in totals:
+            column.totalsRowFunction = "sum"
+        table.tableColumns.append(column)
+    table.tableColumns[0].totalsRowLabel = "TOTALS"
+    sheet.table(table)
+
+    dv = cookie_type_validation(catalog)
+    dv.error = "Please select a valid cookie type"
+    dv.errorTitle = "Invalid Cookie Type"
+    sheet.validate(dv, f"B{first_row}:B{last_row}")
+
+    yield [("🍪 MIDNIGHT DOUGH - ORDER CALCULATOR", "title")]
+    yield [("Add multiple orders. Each row calculates batches needed and estimated ingredient cost.", "subtitle")]
+    yield []
+    yield [(header, "header") for header in ORDER_HEADERS]
+
+    for n in range(1, order_count + 1):
+        recipe, qty_value, size_value = orders[n - 1] if n <= len(orders) else (None, None, None)
+        yield [
+            (n, "cell"),
+            # Cookie type (dropdown), quantity and size are user inputs
+            (recipe, "input"),
+            (qty_value, "input"),
+            (size_value, "input"),
+            ("=" + calculated["Total Dough (g)"], "count"),
+            ("=" + calculated["Scale Factor"], "factor"),
+            ("=" + calculated["Est. Cost ($)"], "money"),
+            ("=" + calculated["Cost/Cookie"], "money"),
+            # Notes
+            (None, "cell"),
+        ]
+
+    yield [
+        ("TOTALS", "total"), (None, "cell"),
+        ("=" + totals["Qty"], "total"), (None, "cell"),
+        ("=" + totals["Total Dough (g)"], "total_count"), (None, "cell"),
+        ("=" + totals["Est. Cost ($)"], "total_money"), (None, "cell"), (None, "cell"),
+    ]
+
+
+# =============================================================================
+# SHEET 5: SHOPPING LIST
+# =============================================================================
+
+def shopping_rows(sheet, catalog, amounts=None):
+    """
+    ``amounts`` (ingredient id -> amount needed) pre-fills column B, e.g. from
+    orders.py. When some ingredient has several package options, the cheapest
+    mix for the pre-filled amounts (purchasing.py) is listed next to it.
+    """
+    all_ingredients = catalog.used_ingredients
     total_row = 5 + len(all_ingredients)
-    ws_shopping.cell(row=total_row, column=6, value="GRAND TOTAL:").font = Font(bold=True)
-    ws_shopping.cell(row=total_row, column=7, value=f"=SUM(G5:G{total_row-1})").font = Font(bold=True)
-    ws_shopping.cell(row=total_row, column=7).number_format = '$#,##0.00'
-    ws_shopping.cell(row=total_row, column=7).fill = PatternFill(start_color="c8e6c9", end_color="c8e6c9", fill_type="solid")
-    
-    # Column widths
-    ws_shopping.column_dimensions['A'].width = 25
-    ws_shopping.column_dimensions['B'].width = 14
-    ws_shopping.column_dimensions['C'].width = 8
-    ws_shopping.column_dimensions['D'].width = 10
-    ws_shopping.column_dimensions['E'].width = 12
-    ws_shopping.column_dimensions['F'].width = 12
-    ws_shopping.column_dimensions['G'].width = 12
-    ws_shopping.column_dimensions['H'].width = 20
-    
-    # =========================================================================
-    # SHEET 6: QUICK REFERENCE
-    # =========================================================================
-    ws_ref = wb.create_sheet("Quick Reference")
-    
-    ws_ref.merge_cells('A1:D1')
-    ws_ref['A1'] = "📋 QUICK REFERENCE - COOKIE SIZES & BAKE TIMES"
-    ws_ref['A1'].font = Font(color="FFFFFF", bold=True, size=16)
-    ws_ref['A1'].fill = header_fill
-    ws_ref['A1'].alignment = Alignment(horizontal='center')
-    
+    amounts = amounts or {}
+    plan = {}
+    if amounts and any(len(ing.packages) > 1 for ing in all_ingredients):
+        from purchasing import purchase_plan
+
+        plan = purchase_plan(catalog, {ing.id: amounts.get(ing.id) for ing in all_ingredients})
+    last_col = 'K' if plan else 'H'
+
+    widths = {'A': 25, 'B': 14, 'C': 8, 'D': 10, 'E': 12, 'F': 12, 'G': 12, 'H': 20}
+    if plan:
+        widths.update({'I': 30, 'J': 12, 'K': 12})
+    sheet.widths(widths)
+    sheet.merge(f'A1:{last_col}1')
+    sheet.merge(f'A2:{last_col}2')
+
+    yield [("🛒 INGREDIENT SHOPPING LIST", "title")]
+    if plan:
+        yield [("Amounts pre-filled from the order book → edit to adjust packages and cost; "
+                "the best package mix is for the pre-filled amounts", "subtitle")]
+    elif amounts:
+        yield [("Amounts pre-filled from the order book → edit to adjust packages and cost", "subtitle")]
+    else:
+        yield [("Enter amounts needed → see packages to buy and total cost", "subtitle")]
+    yield []
+
+    shop_headers = ["Ingredient", "Amount Needed", "Unit", "Pkg Size", "Pkgs to Buy", "Pkg Price", "Total Cost", "Notes"]
+    if plan:
+        shop_headers += ["Best Package Mix", "Mix Cost", "Savings"]
+    yield [(header, "header") for header in shop_headers]
+
+    for row, ing in enumerate(all_ingredients, 5):
+        cells = [
+            (ing.name, "cell"),
+            # Amount needed (user enters, or pre-filled from orders)
+            (amounts.get(ing.id), "input"),
+            # Unit lookup
+            (f'=IFERROR(VLOOKUP(A{row},{PRICE_LIST},2,FALSE),"")', "cell"),
+            # Package size lookup
+            (f'=IFERROR(VLOOKUP(A{row},{PRICE_LIST},3,FALSE),"")', "cell"),
+            # Packages to buy
+            (f'=IF(B{row}="","",ROUNDUP(B{row}/D{row},0))', "cell"),
+            # Package price lookup
+            (f'=IFERROR(VLOOKUP(A{row},{PRICE_LIST},4,FALSE),"")', "currency"),
+            # Total cost
+            (f'=IF(E{row}="","",E{row}*F{row})', "money"),
+            # Notes
+            (None, "cell"),
+        ]
+        if plan:
+            mix = plan.get(ing.id)
+            cells += [
+                (mix.describe(ing.unit) if mix else None, "cell"),
+                (mix.cost if mix else None, "money"),
+                # Savings against a single package size
+                (f'=IF(OR(G{row}="",J{row}=""),"",G{row}-J{row})', "money"),
+            ]
+        yield cells
+
+    total = [None, None, None, None, None, ("GRAND TOTAL:", "label"),
+             (f"=SUM(G5:G{total_row-1})", "total_money")]
+    if plan:
+        total += [None, None, (f"=SUM(J5:J{total_row-1})", "total_money"),
+                  (f"=SUM(K5:K{total_row-1})", "total_money")]
+    yield total
+
+
+# =============================================================================
+# SHEET 6: QUICK REFERENCE
+# =============================================================================
+
+def reference_rows(sheet, catalog):
+    sheet.widths({'A': 22, 'B': 25, 'C': 18, 'D': 12})
+    sheet.merge('A1:D1')
+
+    yield [("📋 QUICK REFERENCE - COOKIE SIZES & BAKE TIMES", "title")]
+    yield []
+
     ref_headers = ["Cookie", "Recommended Size (g)", "Oven Temp", "Bake Time"]
-    for col, header in enumerate(ref_headers, 1):
-        cell = ws_ref.cell(row=3, column=col, value=header)
-        cell.font = header_font
-        cell.fill = subheader_fill
-        cell.border = thin_border
-    
-    ref_data = [
-        ("Sugar Cookie", "45-50g", "350°F (175°C)", "9-11 min"),
-        ("Snickerdoodle", "40g (sm) / 70-80g (lg)", "375°F (190°C)", "10 min"),
-        ("Dark Chocolate Chip", "110-120g", "375°F (190°C)", "12-14 min"),
-        ("Chocolate Chip", "40-70g / 80-100g (lg)", "350°F (175°C)", "10-12 min"),
-        ("Lemon Sugar", "30g / 45-55g (bakery)", "350°F (175°C)", "10-12 min"),
-        ("Oatmeal Raisin", "45-55g", "350°F (175°C)", "11-13 min"),
+    yield [(header, "header") for header in ref_headers]
+
+    for rec in catalog.recipes:
+        data = (rec.name, RECOMMENDED_SIZES.get(rec.name, f"{rec.base_size}g"), rec.oven_temp, rec.bake_time)
+        yield [(val, "cell") for val in data]
+
+
+# =============================================================================
+# PRODUCTION SCHEDULE (optional)
+# =============================================================================
+# Tray-level oven plan from schedule.schedule_orders. Values only: the plan
+# comes from the order book at generation time, not from live formulas.
+
+def schedule_rows(sheet, catalog, schedule):
+    sheet.widths({'A': 10, 'B': 8, 'C': 13, 'D': 13, 'E': 11, 'F': 11, 'G': 13, 'H': 9, 'I': 22,
+                  'J': 12, 'K': 10, 'L': 12, 'M': 12})
+    sheet.merge('A1:M1')
+    sheet.merge('A2:M2')
+
+    yield [("🔥 PRODUCTION SCHEDULE - OVEN PLAN", "title")]
+    yield [(f"{schedule.ovens} ovens x {schedule.racks} trays per load, {schedule.changeover:g} min "
+            f"temperature changeover. Order # matches the Order Calculator.", "subtitle")]
+    yield []
+    yield [("Makespan:", "label"), (schedule.makespan, "count"), ("min", "hint"),
+           ("Finish:", "label"), (schedule.clock(schedule.makespan), "cell"), None,
+           ("Changeovers:", "label"), (schedule.changeovers, "count"), None,
+           ("Lower bound:", "label"), (round(schedule.lower_bound), "count"), ("min", "hint")]
+    yield []
+
+    headers = ["Oven", "Load", "Start", "End", "Temp (°F)", "Bake (min)", "Tray", "Order #",
+               "Cookie Type", "Cookies", "Size (g)", "Dough (g)", "Scale Factor"]
+    yield [(header, "header") for header in headers]
+
+    for tray in schedule.tray_rows():
+        if tray["changeover"]:
+            yield [(tray["oven"], "cell"), None, (schedule.clock(tray["start"]), "cell"),
+                   (schedule.clock(tray["end"]), "cell"), (tray["temp"], "cell"), None, None, None,
+                   (f"Changeover to {tray['temp']}°F", "hint")]
+            continue
+        yield [
+            (tray["oven"], "cell"),
+            (tray["load"], "cell"),
+            (schedule.clock(tray["start"]), "cell"),
+            (schedule.clock(tray["end"]), "cell"),
+            (tray["temp"], "cell"),
+            (tray["minutes"], "cell"),
+            (tray["rack"], "cell"),
+            (tray["order"], "cell"),
+            (tray["recipe"], recipe_style(tray["recipe"])),
+            (tray["cookies"], "count"),
+            (tray["size"], "count"),
+            (tray["dough"], "grams"),
+            (tray["scale_factor"], "factor"),
+        ]
+
+
+# =============================================================================
+# REORDER PLAN (optional)
+# =============================================================================
+# Stock projection from inventory.Projection: when each ingredient drops
+# below its minimum, and the reorders that keep it above. Packages and cost
+# look up the Ingredient Prices sheet, like the Shopping List.
+
+def reorder_rows(sheet, catalog, projection):
+    sheet.widths({'A': 14, 'B': 14, 'C': 25, 'D': 14, 'E': 8, 'F': 12, 'G': 12, 'H': 14, 'I': 24})
+    sheet.merge('A1:I1')
+    sheet.merge('A2:I2')
+
+    summary = projection.summary()
+    reorders = projection.reorder_suggestions()
+    last_day = projection.start + projection.days - 1
+
+    yield [("📦 REORDER PLAN - PROJECTED STOCK", "title")]
+    yield [(f"Orders from {projection.start} to {last_day} against current stock. "
+            f"Reorders are placed {projection.lead_days} days before they are needed.", "subtitle")]
+    yield []
+
+    yield [(header, "header") for header in
+           ["Below Min On", "Out of Stock", "Ingredient", "Current Stock", "Unit", "Min Level",
+            "Projected Use", "End Stock", "Reorders to Stay Above Min"]]
+    for row in summary:
+        yield [
+            (row["below_min"].item() if row["below_min"] is not None else None, "date"),
+            (row["stockout"].item() if row["stockout"] is not None else None, "date"),
+            (row["ingredient"], "cell"),
+            (row["current_stock"], "count"),
+            (row["unit"], "cell"),
+            (row["min_threshold"], "count"),
+            (row["projected_use"], "count"),
+            (row["end_stock"], "count"),
+            (row["deliveries"], "count"),
+        ]
+    yield []
+
+    # Header row of the reorder list
+    first_row = sheet_row = 4 + len(summary) + 2
+    yield [(header, "header") for header in
+           ["Order By", "Needed By", "Ingredient", "Reorder Qty", "Unit", "Pkgs to Buy", "Pkg Price",
+            "Est. Cost", "Notes"]]
+    for r in reorders:
+        sheet_row += 1
+        yield [
+            (r["order_by"].item(), "date"),
+            (r["needed_by"].item(), "date"),
+            (r["ingredient"], "cell"),
+            (r["quantity"], "count"),
+            (r["unit"], "cell"),
+            (f'=IFERROR(ROUNDUP(D{sheet_row}/VLOOKUP(C{sheet_row},{PRICE_LIST},3,FALSE),0),"")', "cell"),
+            (f'=IFERROR(VLOOKUP(C{sheet_row},{PRICE_LIST},4,FALSE),"")', "currency"),
+            (f'=IF(F{sheet_row}="","",F{sheet_row}*G{sheet_row})', "money"),
+            ("⚠ first drop below minimum" if r["first"] else None, "cell"),
+        ]
+    if reorders:
+        yield [None, None, None, None, None, None, ("TOTAL:", "label"),
+               (f"=SUM(H{first_row + 1}:H{sheet_row})", "total_money")]
+    else:
+        yield [("No reorders needed over this horizon", "hint")]
+
+
+# =============================================================================
+# SENSITIVITY (optional)
+# =============================================================================
+# Cost per cookie percentiles over sampled ingredient prices, from
+# sensitivity.Sensitivity. The current cost column is live (Recipe Costs
+# cost per gram x size); the bands are the sampled values.
+
+def sensitivity_rows(sheet, catalog, sensitivity):
+    from sensitivity import PERCENTILES, describe_spec
+
+    sheet.widths({'A': 25, 'B': 10, 'C': 14, 'D': 25, 'E': 12, 'F': 12, 'G': 12, 'H': 12, 'I': 12})
+    sheet.merge('A1:I1')
+    sheet.merge('A2:I2')
+
+    default = max(sensitivity.specs, key=sensitivity.specs.count) if sensitivity.specs else None
+    what_if = ", ".join(f"{name} {pct:+.0%}" for name, pct in sensitivity.shocks.items()) or "none"
+    yield [("🎲 PRICE SENSITIVITY - COST PER COOKIE", "title")]
+    yield [(f"{sensitivity.samples:,} sampled price vectors"
+            + (f", mostly {describe_spec(default)}" if default else "")
+            + f". What-if shocks: {what_if}.", "subtitle")]
+    yield []
+
+    band_headers = ["Cookie Type", "Size (g)", "Current Cost", "What-If Cost"] + [
+        "Median" if pct == 50 else f"P{pct}" for pct in PERCENTILES]
+    yield [(header, "header") for header in band_headers]
+    row = 4
+    for band in sensitivity.bands():
+        row += 1
+        yield [
+            (band["recipe"], "cell"),
+            (band["size"], "count"),
+            (f'=IFERROR(B{row}*VLOOKUP(A{row},{RECIPE_COSTS},6,FALSE),"")', "rate"),
+            (band["scenario"], "rate"),
+        ] + [(band[f"p{pct}"], "rate") for pct in PERCENTILES]
+    yield []
+
+    yield [("TOP COST VARIANCE DRIVERS", "label")]
+    yield [(header, "header") for header in
+           ["Cookie Type", "Rank", "Share of Variance", "Ingredient", "Price Distribution"]]
+    for driver in sensitivity.top_drivers():
+        yield [
+            (driver["recipe"], "cell"),
+            (driver["rank"], "count"),
+            (driver["share"], "percent"),
+            (driver["ingredient"], "cell"),
+            (describe_spec(driver["spec"]), "cell"),
+        ]
+
+
+# =============================================================================
+# SHEET 7: RECIPE COSTS (hidden helper)
+# =============================================================================
+# One live cost-per-batch formula per recipe. Each formula multiplies the
+# recipe's Recipe Database amounts by the matching Ingredient Prices unit
+# price cells directly, so order rows need a single keyed lookup instead of
+# re-deriving the batch cost with an array formula per row.
+
+def recipe_cost_rows(sheet, catalog):
+    sheet.widths({'A': 22, 'B': 12, 'C': 14, 'D': 15, 'E': 16, 'F': 16})
+    sheet.hide()
+    last_row = COSTS_FIRST_ROW + len(catalog.recipes) - 1
+    sheet.define(RECIPE_COSTS, "A", COSTS_FIRST_ROW, "F", last_row)
+    sheet.define(COOKIE_TYPES, "A", COSTS_FIRST_ROW, "A", last_row)
+
+    terms = {}
+    first_rows = {}
+    for recipe, line, row in recipe_line_rows(catalog):
+        first_rows.setdefault(recipe.id, row)
+        terms.setdefault(recipe.id, []).append(
+            f"'Recipe Database'!F{row}*'Ingredient Prices'!E{price_row(catalog, line.ingredient_id)}"
+        )
+
+    yield [(header, "header") for header in
+           ["Recipe Name", "Base Yield", "Base Size (g)", "Total Dough (g)", "Cost per Batch", "Cost per Gram"]]
+
+    for row, recipe in enumerate(catalog.recipes, COSTS_FIRST_ROW):
+        # Yield/size/dough follow the recipe's first Recipe Database line
+        src = first_rows.get(recipe.id)
+        yield [
+            (recipe.name, "cell"),
+            (f"='Recipe Database'!B{src}" if src else recipe.base_yield, "cell"),
+            (f"='Recipe Database'!C{src}" if src else recipe.base_size, "cell"),
+            (f"='Recipe Database'!D{src}" if src else recipe.total_dough, "count"),
+            ("=" + ("+".join(terms.get(recipe.id, [])) or "0"), "money"),
+            (f"=IF(D{row}=0,0,E{row}/D{row})", "rate"),
+        ]
+
+
+# =============================================================================
+# PER-RECIPE COST WORKBOOK
+# =============================================================================
+# A focused single-sheet calculator for one recipe, in the layout of the
+# hand-made per-recipe workbooks: base quantities, unit prices and a batch
+# scaling factor. Unit prices are values here (there is no price sheet).
+
+def recipe_card_rows(sheet, catalog, recipe):
+    sheet.widths({'A': 25, 'B': 14, 'C': 8, 'D': 16, 'E': 14, 'F': 14, 'G': 16, 'H': 16})
+    sheet.merge('A1:H1')
+    sheet.merge('A2:H2')
+
+    first_row = 7
+    last_row = first_row + len(recipe.lines) - 1
+    total_row = last_row + 2
+
+    yield [(f"🍪 {recipe.name.upper()} - COST CALCULATOR", "title")]
+    yield [(f"Base batch: {recipe.base_yield} cookies x {recipe.base_size}g. "
+            "Edit the scaling factor or unit prices.", "subtitle")]
+    yield []
+    yield [
+        ("Batch Scaling Factor:", "label"), (1, "input"), None,
+        ("Cookies:", "label"), (f"=B4*{recipe.base_yield}", "count"), None,
+        ("Cost/Cookie:", "label"), (f'=IF(E4=0,"",G{total_row}/E4)', "money"),
+    ]
+    yield []
+
+    card_headers = ["Ingredient", "Qty per Batch", "Unit", "Price per Unit ($)", "Total Cost ($)",
+                    "Scaled Qty", "Scaled Cost ($)", "Category"]
+    yield [(header, "header") for header in card_headers]
+
+    for row, line in enumerate(recipe.lines, first_row):
+        ing = catalog.ingredient(line.ingredient_id)
+        yield [
+            (ing.name, "cell"),
+            (line.amount, "amount"),
+            (ing.unit, "cell"),
+            (ing.unit_price, "rate"),
+            (f"=B{row}*D{row}", "money"),
+            (f"=B{row}*$B$4", "scaled"),
+            (f"=F{row}*D{row}", "money"),
+            (line.category, "cell"),
+        ]
+
+    yield []
+    yield [("TOTAL INGREDIENT COST", "total"), None, None, None,
+           (f"=SUM(E{first_row}:E{last_row})", "total_money"), None,
+           (f"=SUM(G{first_row}:G{last_row})", "total_money")]
+
+
+# =============================================================================
+# WORKBOOK
+# =============================================================================
+
+def sheet_builders(order_count=DEFAULT_ORDER_ROWS, shopping_amounts=None, orders=None, schedule=None,
+                   projection=None, sensitivity=None):
+    """(title, builder) pairs in workbook order."""
+    builders = [
+        ("Ingredient Prices", price_rows),
+        ("Recipe Database", recipe_rows),
+        ("Batch Calculator", batch_rows),
+        ("Order Calculator", partial(order_rows, order_count=order_count, orders=orders)),
+        ("Shopping List", partial(shopping_rows, amounts=shopping_amounts)),
+        ("Quick Reference", reference_rows),
+        ("Recipe Costs", recipe_cost_rows),
     ]
-    
-    for i, data in enumerate(ref_data, 4):
-        for col, val in enumerate(data, 1):
-            cell = ws_ref.cell(row=i, column=col, value=val)
-            cell.border = thin_border
-    
-    ws_ref.column_dimensions['A'].width = 22
-    ws_ref.column_dimensions['B'].width = 25
-    ws_ref.column_dimensions['C'].width = 18
-    ws_ref.column_dimensions['D'].width = 12
-    
+    # Optional sheets go after the Shopping List
+    extra = []
+    if schedule is not None:
+        extra.append(("Production Schedule", partial(schedule_rows, schedule=schedule)))
+    if projection is not None:
+        extra.append(("Reorder Plan", partial(reorder_rows, projection=projection)))
+    if sensitivity is not None:
+        extra.append(("Sensitivity", partial(sensitivity_rows, sensitivity=sensitivity)))
+    builders[5:5] = extra
+    return builders
+
+
+def _profiled_rows(rows, stage):
+    """Pass rows through while counting cells, formulas and styled cells into ``stage``."""
+    for row in rows:
+        stage["rows"] += 1
+        for spec in row:
+            if spec is None:
+                continue
+            value, style = spec if type(spec) is tuple else (spec, None)
+            if style is not None:
+                stage["styled_cells"] += 1
+            if value is None:
+                continue
+            stage["cells"] += 1
+            if isinstance(value, str) and value.startswith("="):
+                stage["formulas"] += 1
+        yield row
+
+
+def _assemble(catalog, builders, streaming, styles_catalog=None, profile=None, minimal_styles=False):
+    start = perf_counter()
+    wb = Workbook(write_only=streaming)
+    if not streaming:
+        wb.remove(wb.active)
+    sheet_cls = StreamingSheet if streaming else InMemorySheet
+    styles = StyleRegistry(wb, styles_catalog, lazy=minimal_styles)
+    if profile is not None:
+        profile["stages"] = [dict(stage="(styles)", seconds=perf_counter() - start, rows=0, cells=0,
+                                  formulas=0, styled_cells=0, styles_created=len(styles))]
+
+    for title, builder in builders:
+        start = perf_counter()
+        registered = len(styles)
+        sheet = sheet_cls(wb.create_sheet(title), styles)
+        rows = builder(sheet, catalog)
+        if profile is not None:
+            stage = dict(stage=title, seconds=0.0, rows=0, cells=0, formulas=0, styled_cells=0,
+                         styles_created=0)
+            rows = _profiled_rows(rows, stage)
+        for row in rows:
+            sheet.append(row)
+        if profile is not None:
+            stage["seconds"] = perf_counter() - start
+            stage["styles_created"] = len(styles) - registered
+            profile["stages"].append(stage)
+    return wb
+
+
+def build_workbook(catalog, streaming=False, order_count=DEFAULT_ORDER_ROWS, shopping_amounts=None,
+                   profile=None, orders=None, schedule=None, projection=None, sensitivity=None,
+                   minimal_styles=False):
+    """
+    Build the calculator workbook. With ``streaming=True`` the workbook is
+    write-only: rows go straight to the serializer and peak memory does not
+    grow with the number of rows, but the workbook can only be saved once.
+    ``shopping_amounts`` (ingredient id -> amount) pre-fills the Shopping List
+    and ``orders`` ((cookie type, qty, size) tuples) the Order Calculator,
+    which grows to fit them. A schedule.Schedule adds a Production Schedule
+    sheet, an inventory.Projection a Reorder Plan sheet and a
+    sensitivity.Sensitivity a Sensitivity sheet.
+    Pass a dict as ``profile`` to collect per-sheet stage statistics.
+    ``minimal_styles`` registers only the styles the sheets use.
+    """
+    return _assemble(catalog, sheet_builders(order_count, shopping_amounts, orders, schedule, projection,
+                                             sensitivity),
+                     streaming,
+                     styles_catalog=catalog, profile=profile, minimal_styles=minimal_styles)
+
+
+def build_recipe_workbook(catalog, recipe, streaming=False, minimal_styles=False):
+    """Single-sheet cost workbook for one recipe (id or name)."""
+    recipe = catalog.recipe(recipe)
+    # Sheet titles are limited to 31 characters
+    title = f"{recipe.name} Calculator"[:31]
+    return _assemble(catalog, [(title, partial(recipe_card_rows, recipe=recipe))], streaming,
+                     minimal_styles=minimal_styles)
+
+
+def create_cookie_calculator(catalog=None, filename=DEFAULT_FILENAME, streaming=False,
+                             order_rows=DEFAULT_ORDER_ROWS, shopping_amounts=None, verbose=True,
+                             profile=None, cached_values=True, orders=None, schedule=None,
+                             projection=None, sensitivity=None, reproducible=None):
+    """
+    Build and save the calculator. If ``profile`` is a dict it is filled
+    with per-stage statistics (see format_profile) plus save time.
+    With ``cached_values`` every formula is evaluated in Python and its
+    result stored in the file, so readers that don't recalculate see values.
+    ``reproducible`` = (compression, level), e.g. ("deflated", 6), writes
+    only the styles in use and normalizes the file (see reproducible.py).
+    """
+    if catalog is None:
+        catalog = load_catalog()
+    start = perf_counter()
+    wb = build_workbook(catalog, streaming=streaming, order_count=order_rows,
+                        shopping_amounts=shopping_amounts, profile=profile, orders=orders,
+                        schedule=schedule, projection=projection, sensitivity=sensitivity,
+                        minimal_styles=reproducible is not None)
+
     # Save the workbook
-    filename = "midnight_dough_cookie_calculator.xlsx"
+    save_start = perf_counter()
     wb.save(filename)
-    print(f"✅ Calculator created successfully: {filename}")
-    print("\n📊 SHEETS:")
-    print("  1. Ingredient Prices - Edit package prices (per-unit auto-calculates)")
-    print("  2. Recipe Database   - All 6 cookie recipes")
-    print("  3. Batch Calculator  - Select cookie, qty, size → full breakdown")
-    print("  4. Order Calculator  - Multiple orders with totals")
-    print("  5. Shopping List     - Calculate packages to buy")
-    print("  6. Quick Reference   - Sizes and bake times")
-    
+    if profile is not None:
+        profile["save_seconds"] = perf_counter() - save_start
+    if cached_values:
+        cache_start = perf_counter()
+        embed_cached_values(filename)
+        if profile is not None:
+            profile["cache_seconds"] = perf_counter() - cache_start
+    if reproducible is not None:
+        normalize_start = perf_counter()
+        normalize_workbook(filename, *reproducible)
+        if profile is not None:
+            profile["normalize_seconds"] = perf_counter() - normalize_start
+    if profile is not None:
+        profile["total_seconds"] = perf_counter() - start
+        profile["streaming"] = streaming
+    if verbose:
+        print(f"✅ Calculator created successfully: {filename}")
+        print("\n📊 SHEETS:")
+        print("  1. Ingredient Prices - Edit package prices (per-unit auto-calculates)")
+        print(f"  2. Recipe Database   - All {len(catalog.recipes)} cookie recipes")
+        print("  3. Batch Calculator  - Select cookie, qty, size → full breakdown")
+        if orders:
+            print(f"  4. Order Calculator  - {len(orders)} orders from the order book, with totals")
+        else:
+            print(f"  4. Order Calculator  - {max(order_rows, 1)} order rows with totals")
+        if shopping_amounts:
+            print("  5. Shopping List     - Packages to buy, pre-filled from the order book")
+        else:
+            print("  5. Shopping List     - Calculate packages to buy")
+        if schedule is not None:
+            print("     Production Schedule - Tray-level oven plan for the orders")
+        if projection is not None:
+            print("     Reorder Plan      - Projected stock and reorder suggestions")
+        if sensitivity is not None:
+            print("     Sensitivity       - Cost per cookie bands under price swings")
+        print("  6. Quick Reference   - Sizes and bake times")
+        print("     (hidden) Recipe Costs - Cost per batch for order lookups, cookie type list")
+
     return filename
 
+
+def format_profile(profile):
+    """Text table of a ``profile`` dict filled by create_cookie_calculator."""
+    lines = [f"{'stage':<20} {'time (ms)':>10} {'rows':>8} {'cells':>9} {'formulas':>9}"
+             f" {'styled':>9} {'new styles':>11}"]
+    for st in profile["stages"]:
+        lines.append(f"{st['stage']:<20} {st['seconds'] * 1000:>10.1f} {st['rows']:>8,} {st['cells']:>9,}"
+                     f" {st['formulas']:>9,} {st['styled_cells']:>9,} {st['styles_created']:>11,}")
+    lines.append(f"{'save':<20} {profile['save_seconds'] * 1000:>10.1f}")
+    if "cache_seconds" in profile:
+        lines.append(f"{'cached values':<20} {profile['cache_seconds'] * 1000:>10.1f}")
+    if "normalize_seconds" in profile:
+        lines.append(f"{'reproducible':<20} {profile['normalize_seconds'] * 1000:>10.1f}")
+    lines.append(f"{'total':<20} {profile['total_seconds'] * 1000:>10.1f}")
+    if profile.get("streaming"):
+        lines.append("(streaming: rows are serialised as they are written, so sheet stages include XML time)")
+    return "\n".join(lines)
+
+
+# =============================================================================
+# PER-RECIPE WORKBOOKS (parallel)
+# =============================================================================
+
+# Per-recipe files that predate the generator keep their names
+RECIPE_FILENAMES = {
+    "Lemon Sugar": "lemon_cookie_cost_calculator.xlsx",
+    "Dark Chocolate Chip": "dark_chocolate_cookie_cost_calculator.xlsx",
+    "Chocolate Chip": "cookie_cost_calculator.xlsx",
+}
+
+
+def recipe_filename(recipe):
+    if recipe.name in RECIPE_FILENAMES:
+        return RECIPE_FILENAMES[recipe.name]
+    slug = "_".join("".join(ch if ch.isalnum() else " " for ch in recipe.name.lower()).split())
+    return f"{slug}_cost_calculator.xlsx"
+
+
+_worker_catalog = None
+
+
+def _init_worker(catalog):
+    global _worker_catalog
+    _worker_catalog = catalog
+
+
+def _generate(job):
+    """Build and save one workbook in a worker process; returns its path."""
+    recipe_id, filename, streaming, order_count, cached_values, reproducible = job
+    minimal_styles = reproducible is not None
+    if recipe_id is None:
+        wb = build_workbook(_worker_catalog, streaming=streaming, order_count=order_count,
+                            minimal_styles=minimal_styles)
+    else:
+        wb = build_recipe_workbook(_worker_catalog, recipe_id, streaming=streaming, minimal_styles=minimal_styles)
+    wb.save(filename)
+    if cached_values:
+        embed_cached_values(filename)
+    if reproducible is not None:
+        normalize_workbook(filename, *reproducible)
+    return filename
+
+
+def create_all_workbooks(catalog=None, out_dir=".", filename=DEFAULT_FILENAME, streaming=False,
+                         order_rows=DEFAULT_ORDER_ROWS, jobs=None, verbose=True, cached_values=True,
+                         reproducible=None):
+    """
+    Write the combined calculator plus one cost workbook per recipe into
+    ``out_dir``. openpyxl serialisation is CPU-bound, so the workbooks are
+    built in a process pool; ``jobs=1`` builds them in this process.
+    """
+    if catalog is None:
+        catalog = load_catalog()
+    os.makedirs(out_dir, exist_ok=True)
+    jobs_list = [(None, os.path.join(out_dir, filename), streaming, order_rows, cached_values, reproducible)]
+    jobs_list += [(rec.id, os.path.join(out_dir, recipe_filename(rec)), streaming, order_rows, cached_values,
+                   reproducible)
+                  for rec in catalog.recipes]
+
+    if jobs == 1:
+        _init_worker(catalog)
+        paths = [_generate(job) for job in jobs_list]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(catalog,)) as pool:
+            paths = list(pool.map(_generate, jobs_list))
+
+    if verbose:
+        print(f"✅ {len(paths)} workbooks written to {out_dir}")
+        for path in paths:
+            print(f"  {os.path.basename(path)}")
+    return paths
+
+
+def row_count(text):
+    """argparse type for --order-rows: a whole number, 0 or more."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid row count {text!r}") from None
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"row count must not be negative, got {value}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Midnight Dough cookie calculator workbook")
+    parser.add_argument("-o", "--output", default=DEFAULT_FILENAME, help="output xlsx path")
+    parser.add_argument("--order-rows", type=row_count,
+                        help=f"number of order entry rows in the Order Calculator (default: {DEFAULT_ORDER_ROWS},"
+                             " or one per order with --orders; the table keeps at least one row)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="use a write-only workbook (flat memory for large order books)")
+    parser.add_argument("--orders", metavar="FILE",
+                        help="CSV, JSONL or JSON order book used to fill the Order Calculator and Shopping List")
+    parser.add_argument("--per-recipe", metavar="DIR",
+                        help="also write one cost workbook per recipe; all workbooks go to DIR")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="worker processes for --per-recipe (default: CPU count)")
+    parser.add_argument("--no-cached-values", dest="cached_values", action="store_false",
+                        help="skip evaluating formulas in Python (readers see empty cells until recalculated)")
+    parser.add_argument("--profile", action="store_true",
+                        help="report time, cells, formulas and styles per sheet stage plus save time")
+    parser.add_argument("--pricing", metavar="JSON",
+                        help="also write per-recipe pricing for the web app to JSON (and CSV next to it)")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="byte-for-byte repeatable output: fixed timestamps, stable zip order, shared"
+                             " strings and only the styles in use (see reproducible.py)")
+    parser.add_argument("--compression", choices=sorted(COMPRESSION),
+                        help=f"zip compression, implies --reproducible (default: {DEFAULT_COMPRESSION})")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        help=f"deflate level, implies --reproducible (default: {DEFAULT_LEVEL})")
+    args = parser.parse_args(argv)
+    if args.per_recipe and args.orders:
+        parser.error("--orders cannot be combined with --per-recipe")
+    order_rows = DEFAULT_ORDER_ROWS if args.order_rows is None else args.order_rows
+    reproducible = None
+    if args.reproducible or args.compression or args.compress_level is not None:
+        reproducible = (args.compression or DEFAULT_COMPRESSION,
+                        DEFAULT_LEVEL if args.compress_level is None else args.compress_level)
+
+    catalog = load_catalog()
+    if args.pricing:
+        from pricing_export import export_pricing
+
+        json_path, csv_path = export_pricing(catalog, args.pricing)
+        print(f"✅ Pricing written to {json_path} and {csv_path}")
+    if args.per_recipe:
+        create_all_workbooks(catalog, out_dir=args.per_recipe, filename=os.path.basename(args.output),
+                             streaming=args.streaming, order_rows=order_rows, jobs=args.jobs,
+                             cached_values=args.cached_values, reproducible=reproducible)
+        return
+
+    shopping_amounts = orders = None
+    if args.orders:
+        from costing import CostModel
+        from orders import load_order_book, order_tuples, shopping_amounts as prefill, shopping_list
+
+        model = CostModel(catalog)
+        try:
+            book = load_order_book(args.orders, model)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        shopping_amounts = prefill(shopping_list(model, book))
+        orders = order_tuples(catalog, book)
+        if args.order_rows is None:
+            order_rows = len(orders)
+    profile = {} if args.profile else None
+    create_cookie_calculator(catalog, filename=args.output, streaming=args.streaming,
+                             order_rows=order_rows, shopping_amounts=shopping_amounts,
+                             profile=profile, cached_values=args.cached_values, orders=orders,
+                             reproducible=reproducible)
+    if profile is not None:
+        print()
+        print(format_profile(profile))
+
+
 if __name__ == "__main__":
-    create_cookie_calculator()
+    main()
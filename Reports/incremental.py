@@ -0,0 +1,262 @@
+"""
+Midnight Dough Incremental Regeneration
+Rebuilds the calculator workbook only when its inputs changed
+
+Features:
+- Fingerprints every sheet from the rows and layout its builder produces
+- Manifest (<output>.manifest.json) stored next to the workbook
+- Skips the run entirely when no sheet changed
+- When only numeric values changed (e.g. package prices), patches those
+  cells in the existing sheet XML inside the xlsx instead of re-serialising,
+  then refreshes the cached formula results
+- Falls back to a full rebuild when the layout, generator code or the
+  workbook itself changed
+
+Usage:
+    python incremental.py [-o calculator.xlsx] [--order-rows N] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import zipfile
+
+import openpyxl
+from openpyxl.compat import safe_string
+from openpyxl.utils import get_column_letter
+
+import generate_cookie_calculator as generator
+from catalog import REPORTS_DIR, load_catalog
+from formula_engine import embed_cached_values, sheet_parts
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Code whose changes can alter any sheet, hashed into the workbook key
+SOURCE_FILES = ("generate_cookie_calculator.py", "calculator_styles.py", "formula_engine.py",
+                "incremental.py")
+
+# A plain numeric cell as openpyxl writes it: <c r="D5" s="5" t="n"><v>2.69</v></c>
+NUMERIC_CELL = re.compile(rb'<c r="([A-Z]+[0-9]+)"([^>]*)><v>([^<]*)</v></c>')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class RecordingSheet(generator._Sheet):
+    """
+    Runs a builder without a worksheet and fingerprints its output.
+
+    ``structure`` covers layout calls, styles, strings and formulas;
+    ``values`` covers numeric constants only, so a price edit changes the
+    latter but not the former. ``numbers`` maps coordinate -> value.
+    """
+
+    def __init__(self, title):
+        self.title = title
+        self.row = 0
+        self.numbers = {}
+        self._structure = hashlib.sha256()
+        self._values = hashlib.sha256()
+
+    def _record(self, *item):
+        self._structure.update(repr(item).encode())
+
+    def widths(self, widths):
+        self._record("widths", sorted(widths.items()))
+
+    def merge(self, ref):
+        self._record("merge", ref)
+
+    def hide(self):
+        self._record("hide")
+
+    def validate(self, dv, ref):
+        self._record("validate", dv.type, dv.formula1, dv.allow_blank, dv.error, dv.errorTitle, ref)
+
+    def table(self, table):
+        columns = [(c.name, c.totalsRowFunction, c.totalsRowLabel,
+                    c.calculatedColumnFormula and c.calculatedColumnFormula.attr_text)
+                   for c in table.tableColumns]
+        self._record("table", table.name, table.ref, table.totalsRowCount, columns)
+
+    def define(self, name, first_col, first_row, last_col, last_row):
+        self._record("define", name, first_col, first_row, last_col, max(first_row, last_row))
+
+    def append(self, row):
+        self.row += 1
+        cells = []
+        for col, spec in enumerate(row, 1):
+            value, style = spec if type(spec) is tuple else (spec, None)
+            if _is_number(value):
+                self.numbers[f"{get_column_letter(col)}{self.row}"] = value
+                self._values.update(repr(value).encode() + b";")
+                value = "#"
+            cells.append((value, style))
+        self._record("row", cells)
+
+    def fingerprint(self):
+        return {"structure": self._structure.hexdigest(), "values": self._values.hexdigest()}
+
+
+def record_sheets(catalog, order_count=generator.DEFAULT_ORDER_ROWS, shopping_amounts=None):
+    """Title -> RecordingSheet for every sheet of the calculator workbook."""
+    sheets = {}
+    for title, builder in generator.sheet_builders(order_count, shopping_amounts):
+        sheet = sheets[title] = RecordingSheet(title)
+        for row in builder(sheet, catalog):
+            sheet.append(row)
+    return sheets
+
+
+def workbook_key(titles):
+    digest = hashlib.sha256(f"{MANIFEST_VERSION}|{openpyxl.__version__}|{titles!r}".encode())
+    for name in SOURCE_FILES:
+        with open(os.path.join(REPORTS_DIR, name), "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def manifest_path(filename):
+    return filename + MANIFEST_SUFFIX
+
+
+def load_manifest(filename):
+    try:
+        with open(manifest_path(filename), encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def write_manifest(filename, key, sheets):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "workbook": key,
+        "output_sha256": file_sha256(filename),
+        "sheets": {title: sheet.fingerprint() for title, sheet in sheets.items()},
+    }
+    with open(manifest_path(filename), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+        fh.write("\n")
+
+
+# =============================================================================
+# XLSX PATCHING
+# =============================================================================
+
+def patch_numbers(xml, numbers):
+    """Rewrite the <v> of each numeric cell in ``numbers``; None if any is missing."""
+    remaining = set(numbers)
+
+    def replace(match):
+        coord = match.group(1).decode()
+        if coord not in numbers:
+            return match.group(0)
+        remaining.discard(coord)
+        value = safe_string(numbers[coord]).encode()
+        return b'<c r="%s"%s><v>%s</v></c>' % (match.group(1), match.group(2), value)
+
+    patched = NUMERIC_CELL.sub(replace, xml)
+    return None if remaining else patched
+
+
+def patch_workbook(filename, sheets):
+    """
+    Patch the numeric cells of ``sheets`` (RecordingSheets) in place.
+    Returns False, leaving the file untouched, if a cell can't be located.
+    """
+    with zipfile.ZipFile(filename) as zf:
+        parts = sheet_parts(zf)
+        replaced = {}
+        for sheet in sheets:
+            part = parts.get(sheet.title)
+            patched = part and patch_numbers(zf.read(part), sheet.numbers)
+            if not patched:
+                return False
+            replaced[part] = patched
+
+        fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(filename)))
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp, "w") as out:
+                for info in zf.infolist():
+                    out.writestr(info, replaced.get(info.filename) or zf.read(info.filename))
+        except BaseException:
+            os.remove(tmp)
+            raise
+    os.replace(tmp, filename)
+    return True
+
+
+# =============================================================================
+# REGENERATION
+# =============================================================================
+
+def regenerate(catalog=None, filename=generator.DEFAULT_FILENAME, streaming=False,
+               order_rows=generator.DEFAULT_ORDER_ROWS, shopping_amounts=None, force=False):
+    """
+    Bring ``filename`` up to date. Returns ("unchanged" | "patched" | "rebuilt",
+    titles of the sheets that changed).
+    """
+    if catalog is None:
+        catalog = load_catalog()
+    sheets = record_sheets(catalog, order_rows, shopping_amounts)
+    key = workbook_key(list(sheets))
+    manifest = None if force else load_manifest(filename)
+
+    if (manifest and manifest["workbook"] == key and os.path.exists(filename)
+            and manifest["output_sha256"] == file_sha256(filename)
+            and set(manifest["sheets"]) == set(sheets)):
+        old = manifest["sheets"]
+        changed = [title for title, sheet in sheets.items() if sheet.fingerprint() != old[title]]
+        if not changed:
+            return "unchanged", []
+        if all(sheets[t].fingerprint()["structure"] == old[t]["structure"] for t in changed):
+            if patch_workbook(filename, [sheets[t] for t in changed]):
+                # Cached formula results depend on the patched numbers
+                embed_cached_values(filename)
+                write_manifest(filename, key, sheets)
+                return "patched", changed
+    else:
+        changed = list(sheets)
+
+    generator.create_cookie_calculator(catalog, filename=filename, streaming=streaming,
+                                       order_rows=order_rows, shopping_amounts=shopping_amounts,
+                                       verbose=False)
+    write_manifest(filename, key, sheets)
+    return "rebuilt", changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate the calculator workbook only if its inputs changed")
+    parser.add_argument("-o", "--output", default=generator.DEFAULT_FILENAME, help="output xlsx path")
+    parser.add_argument("--order-rows", type=generator.row_count, default=generator.DEFAULT_ORDER_ROWS,
+                        help="number of order entry rows in the Order Calculator")
+    parser.add_argument("--streaming", action="store_true", help="use a write-only workbook for rebuilds")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and rebuild")
+    args = parser.parse_args(argv)
+
+    status, changed = regenerate(filename=args.output, streaming=args.streaming,
+                                 order_rows=args.order_rows, force=args.force)
+    if status == "unchanged":
+        print(f"✅ {args.output} is up to date")
+    else:
+        print(f"✅ {args.output} {status}: {', '.join(changed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Midnight Dough Inventory Projection
+Projects day-by-day ingredient stock from a dated order stream and
+suggests reorders
+
+Features:
+- Starts from currentStock in src/data/ingredients.json
+- Daily ingredient use for every order in one pass: per-day recipe scale
+  factors (bincount) times the recipe x ingredient matrix, then a
+  cumulative sum down the days gives the stock curve of every ingredient
+- First date each ingredient drops below minThreshold, and its stockout
+  date if nothing is reordered
+- Reorder suggestions in reorderAmount multiples, timed so stock stays at
+  or above minThreshold, ordered a configurable lead time ahead
+- add_order() folds a single new order into an existing projection, so
+  it can be re-projected on every order
+- "Reorder Plan" sheet in the calculator workbook, daily curve as CSV
+
+Usage:
+    python inventory.py dated_orders.csv [--start 2025-01-01] [--days 365] [--lead-days 3]
+        [-o stock_curve.csv] [--workbook calculator.xlsx]
+"""
+
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from catalog import load_catalog
+from costing import CostModel
+
+DEFAULT_LEAD_DAYS = 3
+
+
+class Projection:
+    """
+    Stock of every ingredient at the end of each of ``days`` days from
+    ``start``. Orders dated outside the horizon are ignored. Reorders are
+    placed ``lead_days`` before they are needed.
+    """
+
+    def __init__(self, model, start, days, lead_days=DEFAULT_LEAD_DAYS):
+        catalog = model.catalog
+        self.model = model
+        self.start = np.datetime64(start, "D")
+        self.days = int(days)
+        self.lead_days = lead_days
+        self.usage = np.zeros((self.days, len(catalog.ingredients)))
+        self.initial = np.array([ing.current_stock for ing in catalog.ingredients], dtype=float)
+        self.min_threshold = np.array([ing.min_threshold for ing in catalog.ingredients], dtype=float)
+        # Ingredients without a reorder amount are reordered by the package
+        self.reorder_amount = np.array([ing.reorder_amount or ing.package_size
+                                        for ing in catalog.ingredients], dtype=float)
+        self._stock = None
+
+    @property
+    def dates(self):
+        return self.start + np.arange(self.days)
+
+    def add_orders(self, dates, positions, qty, size):
+        """Add a batch of orders (arrays) to the daily usage."""
+        day = (np.asarray(dates, dtype="datetime64[D]") - self.start).astype(np.intp)
+        inside = (day >= 0) & (day < self.days)
+        positions = np.asarray(positions, dtype=np.intp)[inside]
+        scales = self.model.scale_factors(positions, np.asarray(qty, dtype=float)[inside],
+                                          np.asarray(size, dtype=float)[inside])
+        n_recipes = len(self.model.base_yield)
+        # Summed scale factor per (day, recipe), then one matrix product for all days
+        daily = np.bincount(day[inside] * n_recipes + positions, weights=scales,
+                            minlength=self.days * n_recipes).reshape(self.days, n_recipes)
+        self.usage += daily @ self.model.amounts
+        self._stock = None
+
+    def add_book(self, book):
+        self.add_orders(book.dates, book.positions, book.qty, book.size)
+
+    def add_order(self, date, recipe, qty, size):
+        """Add one order; costs one row update instead of a full re-projection."""
+        day = int((np.datetime64(date, "D") - self.start).astype(np.intp))
+        if not 0 <= day < self.days:
+            return
+        r = self.model.recipe_position(recipe)
+        scale = float(self.model.scale_factors([r], qty, size)[0])
+        self.usage[day] += scale * self.model.amounts[r]
+        if self._stock is not None:
+            self._stock[day:] -= scale * self.model.amounts[r]
+
+    @property
+    def stock(self):
+        """(days, ingredients) end-of-day stock without any reorders."""
+        if self._stock is None:
+            self._stock = self.initial - np.cumsum(self.usage, axis=0)
+        return self._stock
+
+    def _first_day(self, mask):
+        # First True per column, -1 where there is none
+        return np.where(mask.any(axis=0), mask.argmax(axis=0), -1)
+
+    def below_minimum(self):
+        """First day index each ingredient ends below minThreshold (-1 if never)."""
+        return self._first_day(self.stock < self.min_threshold)
+
+    def stockouts(self):
+        """First day index each ingredient runs out with no reorders (-1 if never)."""
+        return self._first_day(self.stock < 0)
+
+    def reorders_needed(self):
+        """
+        (days, ingredients) number of reorderAmount deliveries that must have
+        arrived by each day to keep stock at or above minThreshold.
+        """
+        shortfall = np.maximum(self.min_threshold - self.stock, 0)
+        return np.ceil(shortfall / self.reorder_amount - 1e-9).astype(np.int64)
+
+    def reorder_suggestions(self):
+        """
+        One dict per reorder to place, in date order: ingredient, needed_by
+        (first day it is needed) and order_by dates (datetime64[D]), number
+        of reorderAmount deliveries and quantity.
+        """
+        catalog = self.model.catalog
+        needed = self.reorders_needed()
+        # Deliveries that become necessary on each day
+        new = np.diff(needed, axis=0, prepend=0)
+        days, cols = np.nonzero(new > 0)
+        first_below = self.below_minimum()
+        merged = {}
+        for d, i in zip(days.tolist(), cols.tolist()):
+            needed_by = self.start + d
+            # Never before the start of the projection; deliveries clamped to
+            # the same day are one order
+            order_by = max(needed_by - self.lead_days, self.start)
+            row = merged.get((order_by, i))
+            if row is None:
+                ing = catalog.ingredients[i]
+                merged[order_by, i] = row = {
+                    "ingredient_id": ing.id,
+                    "ingredient": ing.name,
+                    "unit": ing.unit,
+                    "needed_by": needed_by,
+                    "order_by": order_by,
+                    "deliveries": 0,
+                    "quantity": 0.0,
+                    "first": False,
+                }
+            row["deliveries"] += int(new[d, i])
+            row["quantity"] += float(new[d, i] * self.reorder_amount[i])
+            row["first"] = row["first"] or d == first_below[i]
+        rows = list(merged.values())
+        rows.sort(key=lambda r: (r["order_by"], r["ingredient"]))
+        return rows
+
+    def summary(self):
+        """One dict per used ingredient: stock, use, first below-minimum and stockout dates."""
+        catalog = self.model.catalog
+        below, out = self.below_minimum(), self.stockouts()
+        total_use = self.usage.sum(axis=0)
+        end_stock = self.stock[-1] if self.days else self.initial
+        deliveries = self.reorders_needed()[-1] if self.days else np.zeros(len(self.initial), dtype=np.int64)
+        rows = []
+        for ing in catalog.used_ingredients:
+            i = catalog.ingredient_index[ing.id]
+            rows.append({
+                "ingredient_id": ing.id,
+                "ingredient": ing.name,
+                "unit": ing.unit,
+                "current_stock": float(self.initial[i]),
+                "min_threshold": float(self.min_threshold[i]),
+                "projected_use": float(total_use[i]),
+                "end_stock": float(end_stock[i]),
+                "below_min": self.start + int(below[i]) if below[i] >= 0 else None,
+                "stockout": self.start + int(out[i]) if out[i] >= 0 else None,
+                "deliveries": int(deliveries[i]),
+            })
+        return rows
+
+
+def project_book(model, book, start=None, days=None, lead_days=DEFAULT_LEAD_DAYS):
+    """Projection of a dated OrderBook; the horizon defaults to the book's date span."""
+    if book.dates is None:
+        raise ValueError("the order book has no dates")
+    if start is None:
+        start = book.dates.min() if len(book) else np.datetime64("today", "D")
+    start = np.datetime64(start, "D")
+    if days is None:
+        days = int((book.dates.max() - start).astype(np.intp)) + 1 if len(book) else 1
+    projection = Projection(model, start, max(int(days), 1), lead_days)
+    projection.add_book(book)
+    return projection
+
+
+def write_curve_csv(projection, path):
+    """Daily end-of-day stock, one column per used ingredient."""
+    catalog = projection.model.catalog
+    used = [catalog.ingredient_index[ing.id] for ing in catalog.used_ingredients]
+    stock = projection.stock[:, used]
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["date"] + [ing.name for ing in catalog.used_ingredients])
+        for date, row in zip(projection.dates.astype(str), stock.round(1).tolist()):
+            writer.writerow([date] + row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Project ingredient stock from a dated order stream")
+    parser.add_argument("orders", help="CSV, JSONL or JSON order file with a date column (YYYY-MM-DD)")
+    parser.add_argument("--start", help="first projected day (default: first order date)")
+    parser.add_argument("--days", type=int, help="days to project (default: through the last order)")
+    parser.add_argument("--lead-days", type=int, default=DEFAULT_LEAD_DAYS,
+                        help="days between placing a reorder and needing it")
+    parser.add_argument("-o", "--output", help="write the daily stock curve to this CSV file")
+    parser.add_argument("--workbook", help="also generate a calculator workbook with a Reorder Plan sheet")
+    args = parser.parse_args(argv)
+
+    from orders import load_order_book
+
+    catalog = load_catalog()
+    model = CostModel(catalog)
+    try:
+        book = load_order_book(args.orders, model, dated=True)
+        projection = project_book(model, book, args.start, args.days, args.lead_days)
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"inventory.py: error: {exc}\n")
+    reorders = projection.reorder_suggestions()
+
+    last = projection.start + projection.days - 1
+    print(f"📦 {len(book)} orders projected {projection.start} → {last}\n")
+    for row in projection.summary():
+        if row["below_min"] is not None:
+            out = f", out {row['stockout']}" if row["stockout"] is not None else ""
+            print(f"  ⚠ {row['ingredient']:<25} below minimum {row['below_min']}{out}")
+    print(f"\n  {len(reorders)} reorders suggested")
+    for r in reorders[:10]:
+        print(f"    order by {r['order_by']}: {r['quantity']:>10,.0f} {r['unit']:<5} {r['ingredient']}")
+    if len(reorders) > 10:
+        print(f"    ... {len(reorders) - 10} more")
+
+    if args.output:
+        write_curve_csv(projection, args.output)
+    if args.workbook:
+        from generate_cookie_calculator import create_cookie_calculator
+
+        create_cookie_calculator(catalog, filename=args.workbook, verbose=False,
+                                 projection=projection)
+        print(f"✅ Reorder Plan written to {args.workbook}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
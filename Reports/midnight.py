@@ -0,0 +1,128 @@
+"""
+Midnight Dough Command Line
+One entry point for the report tools, fast enough to call from shell loops
+
+Subcommands:
+- quote:          cost of one order (cookie type, qty, size)
+- shopping-list:  packages to buy for a set of orders
+- generate:       build the calculator workbook (same options as
+                  generate_cookie_calculator.py)
+
+quote and shopping-list only load the cached catalog (see catalog.py) and do
+the arithmetic in plain Python (quoting.py, which costing.py and orders.py
+share for their results and output), so neither openpyxl nor NumPy is imported
+(order files given with -f are read by orders.py, which does load NumPy);
+generate imports the workbook code on demand. Startup time is tracked by
+benchmarks/startup_benchmark.py.
+
+Usage:
+    python midnight.py quote "Chocolate Chip" 300 55 [--breakdown] [--json]
+    python midnight.py shopping-list "Chocolate Chip:300:55" "Lemon Sugar:120:30" [--csv]
+    python midnight.py shopping-list -f weekly_orders.csv
+    python midnight.py generate -o calculator.xlsx --order-rows 50
+"""
+
+import argparse
+import json
+import sys
+
+from catalog import load_catalog
+from quoting import amount_type, parse_order_spec, positive_finite, print_quote, print_shopping_list, quote, \
+    shopping_list
+
+
+# =============================================================================
+# COMMANDS
+# =============================================================================
+
+def cmd_quote(args, parser):
+    catalog = load_catalog()
+    if args.recipe not in catalog.recipe_ids:
+        parser.error(f"unknown cookie type {args.recipe!r} (choose from: {', '.join(catalog.recipe_ids)})")
+    q = quote(args.recipe, args.qty, args.size, catalog, breakdown=args.breakdown)
+    if args.json:
+        print(json.dumps(q))
+    else:
+        print_quote(q)
+
+
+def cmd_shopping_list(args, parser):
+    catalog = load_catalog()
+    try:
+        orders = [parse_order_spec(spec) for spec in args.orders]
+        if args.file:
+            # Order files use the same reader as orders.py
+            from orders import iter_orders
+            for line_no, recipe, qty, size in iter_orders(args.file):
+                try:
+                    orders.append((str(recipe).strip(), positive_finite(qty, "qty"), positive_finite(size, "size")))
+                except ValueError as exc:
+                    raise ValueError(f"{args.file}:{line_no}: {exc}") from None
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    if not orders:
+        parser.error("give orders as COOKIE:QTY:SIZE or with -f FILE")
+    unknown = sorted({o[0] for o in orders} - set(catalog.recipe_ids))
+    if unknown:
+        parser.error(f"unknown cookie type(s): {', '.join(map(repr, unknown))}")
+
+    rows = shopping_list(catalog, orders)
+    if args.json:
+        print(json.dumps(rows))
+    elif args.csv:
+        import csv
+
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["ingredient", "amount_needed", "unit", "package_size", "packages",
+                         "package_price", "total_cost"])
+        for r in rows:
+            writer.writerow([r["ingredient"], r["amount_needed"], r["unit"], r["package_size"],
+                             r["packages"], r["package_price"], r["total_cost"]])
+    else:
+        print_shopping_list(rows, len(orders))
+
+
+def cmd_generate(args, parser):
+    from generate_cookie_calculator import main as generate_main
+
+    generate_main(args.generator_args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="midnight.py", description="Midnight Dough cost tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("quote", help="cost of a single order")
+    p.add_argument("recipe", help="cookie type, e.g. \"Chocolate Chip\"")
+    p.add_argument("qty", type=amount_type("qty"), help="number of cookies")
+    p.add_argument("size", type=amount_type("size"), help="cookie size in grams")
+    p.add_argument("--breakdown", action="store_true", help="show the Batch Calculator ingredient breakdown")
+    p.add_argument("--json", action="store_true", help="print the quote as JSON")
+    p.set_defaults(func=cmd_quote)
+
+    p = sub.add_parser("shopping-list", help="packages to buy for a set of orders")
+    p.add_argument("orders", nargs="*", metavar="COOKIE:QTY:SIZE")
+    p.add_argument("-f", "--file", help="CSV, JSONL or JSON order file (cookie type, qty, size)")
+    fmt = p.add_mutually_exclusive_group()
+    fmt.add_argument("--csv", action="store_true", help="print CSV")
+    fmt.add_argument("--json", action="store_true", help="print JSON")
+    p.set_defaults(func=cmd_shopping_list)
+
+    # Options after "generate" are passed through to generate_cookie_calculator.py
+    p = sub.add_parser("generate", help="build the calculator workbook", add_help=False)
+    p.set_defaults(func=cmd_generate)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "generate":
+        args.generator_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.func(args, parser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Midnight Dough Order Book Ingestion
+Streams wholesale orders from CSV or JSONL and aggregates total ingredient
+demand into a shopping list
+
+Features:
+- CSV (header row), JSONL or JSON array input with cookie type, qty and
+  size per order, plus an ISO date (YYYY-MM-DD) per order for dated order
+  streams
+- Bad orders (missing fields, non-positive or non-numeric qty and size,
+  invalid JSON) are reported with the file name and line number
+- Orders are parsed in chunks into columnar NumPy arrays
+- Demand for every ingredient in one vectorised pass (see CostModel.ingredient_demand)
+- Packages to buy with the Shopping List's ROUNDUP(needed/pkg_size,0) logic
+- Standalone CSV report, or a calculator workbook with the orders and
+  Shopping List filled in
+
+Usage:
+    python orders.py weekly_orders.csv [-o shopping_list.csv] [--workbook calculator.xlsx]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+from catalog import load_catalog
+from costing import CostModel, excel_round
+from quoting import positive_finite, print_shopping_list, shopping_row
+
+# Accepted column / key names for each order field (case-insensitive)
+FIELD_ALIASES = {
+    "recipe": ("cookie type", "cookie_type", "cookie", "recipe", "type"),
+    "qty": ("qty", "quantity", "count"),
+    "size": ("size", "size (g)", "size_g", "cookie size", "cookie_size"),
+}
+
+# Order date, read only for dated order streams (see inventory.py)
+DATE_ALIASES = ("date", "order date", "order_date", "due date", "due_date", "bake date", "delivery date")
+
+CHUNK_SIZE = 65536
+
+JSON_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+
+class OrderBook:
+    """Columnar order book: matrix row, quantity, size and optionally date per order."""
+
+    __slots__ = ("positions", "qty", "size", "dates")
+
+    def __init__(self, positions, qty, size, dates=None):
+        self.positions = positions
+        self.qty = qty
+        self.size = size
+        # datetime64[D] array for dated order streams, else None
+        self.dates = dates
+
+    def __len__(self):
+        return len(self.positions)
+
+
+def _resolve_fields(keys, source, dated=False):
+    lookup = {k.strip().lower(): k for k in keys}
+    fields = {}
+    wanted = dict(FIELD_ALIASES, date=DATE_ALIASES) if dated else FIELD_ALIASES
+    for field, aliases in wanted.items():
+        for alias in aliases:
+            if alias in lookup:
+                fields[field] = lookup[alias]
+                break
+        else:
+            raise ValueError(f"{source}: no {field!r} column (expected one of {', '.join(aliases)})")
+    return fields
+
+
+def _record_fields(record, fields, dated):
+    values = (record[fields["recipe"]], record[fields["qty"]], record[fields["size"]])
+    return values + (record[fields["date"]],) if dated else values
+
+
+def _iter_csv(fh, source, dated=False):
+    reader = csv.DictReader(fh)
+    if reader.fieldnames is None:
+        return
+    fields = _resolve_fields(reader.fieldnames, source, dated)
+    for line_no, record in enumerate(reader, 2):
+        if not any((v or "").strip() for v in record.values()):
+            continue
+        yield (line_no,) + _record_fields(record, fields, dated)
+
+
+def _json_record(record, fields, where, dated):
+    """(fields, values) of one JSON order object; ``fields`` is reused while its keys are present."""
+    if not isinstance(record, dict):
+        raise ValueError(f"{where}: expected an order object, got {type(record).__name__}")
+    if fields is None or any(key not in record for key in fields.values()):
+        fields = _resolve_fields(record.keys(), where, dated)
+    return fields, _record_fields(record, fields, dated)
+
+
+def _iter_jsonl(fh, source, dated=False):
+    fields = None
+    for line_no, line in enumerate(fh, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"{source}:{line_no}: invalid JSON ({exc})") from None
+        fields, values = _json_record(record, fields, f"{source}:{line_no}", dated)
+        yield (line_no,) + values
+
+
+def _iter_json(fh, source, dated=False):
+    """A JSON array of order objects; each order's line is where its object starts."""
+    text = fh.read()
+    decoder = json.JSONDecoder()
+    pos = JSON_WHITESPACE.match(text).end()
+    if not text.startswith("[", pos):
+        raise ValueError(f"{source}: expected a JSON array of orders")
+    pos = JSON_WHITESPACE.match(text, pos + 1).end()
+    if text.startswith("]", pos):
+        return
+    fields = None
+    line_no, counted = 1, 0
+    while True:
+        line_no += text.count("\n", counted, pos)
+        counted = pos
+        try:
+            record, pos = decoder.raw_decode(text, pos)
+        except ValueError as exc:
+            raise ValueError(f"{source}:{getattr(exc, 'lineno', line_no)}: invalid JSON ({exc})") from None
+        fields, values = _json_record(record, fields, f"{source}:{line_no}", dated)
+        yield (line_no,) + values
+        pos = JSON_WHITESPACE.match(text, pos).end()
+        if text.startswith(",", pos):
+            pos = JSON_WHITESPACE.match(text, pos + 1).end()
+        elif text.startswith("]", pos) and not text[pos + 1:].strip():
+            return
+        else:
+            line_no += text.count("\n", counted, pos)
+            raise ValueError(f"{source}:{line_no}: expected ',' or ']' after an order")
+
+
+def iter_orders(path, dated=False):
+    """
+    Yield (line_no, cookie_type, qty, size) from a CSV, JSONL (.jsonl,
+    .ndjson) or JSON array (.json) order file; with ``dated``,
+    (line_no, cookie_type, qty, size, date).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    reader = _iter_jsonl if ext in (".jsonl", ".ndjson") else _iter_json if ext == ".json" else _iter_csv
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        yield from reader(fh, path, dated)
+
+
+def load_order_book(path, model, dated=False):
+    """
+    Read an order file into an OrderBook against ``model``'s recipe rows.
+    With ``dated`` every order also needs an ISO date (book.dates).
+    """
+    positions, qty, size, dates = [], [], [], []
+    chunks = []
+
+    def flush():
+        if positions:
+            chunks.append((np.array(positions, dtype=np.intp), np.array(qty, dtype=float),
+                           np.array(size, dtype=float), np.array(dates, dtype="datetime64[D]")))
+            for column in (positions, qty, size, dates):
+                column.clear()
+
+    recipe_positions = model.recipe_positions
+    for line_no, recipe, q, s, *date in iter_orders(path, dated):
+        recipe = str(recipe).strip()
+        if recipe not in recipe_positions:
+            raise ValueError(f"{path}:{line_no}: unknown cookie type {recipe!r}")
+        try:
+            q, s = positive_finite(q, "qty"), positive_finite(s, "size")
+        except ValueError as exc:
+            raise ValueError(f"{path}:{line_no}: {exc}") from None
+        if dated:
+            try:
+                # Date part of an ISO date or timestamp
+                day = np.datetime64(str(date[0] or "").strip()[:10], "D")
+            except ValueError:
+                day = np.datetime64("NaT")
+            if np.isnat(day):
+                raise ValueError(f"{path}:{line_no}: date must be YYYY-MM-DD, got {date[0]!r}")
+            dates.append(day)
+        positions.append(recipe_positions[recipe])
+        qty.append(q)
+        size.append(s)
+        if len(positions) >= CHUNK_SIZE:
+            flush()
+    flush()
+
+    if not chunks:
+        empty = np.zeros(0)
+        return OrderBook(empty.astype(np.intp), empty, empty,
+                         np.zeros(0, dtype="datetime64[D]") if dated else None)
+    positions, qty, size, dates = (np.concatenate(parts) for parts in zip(*chunks))
+    return OrderBook(positions, qty, size, dates if dated else None)
+
+
+def shopping_list(model, book):
+    """
+    Aggregate ``book`` into shopping list rows for every ingredient used by
+    a recipe: amount needed (rounded to 0.1 as the sheet shows it), packages
+    to buy and total cost; same rows as quoting.shopping_list().
+    """
+    catalog = model.catalog
+    demand = excel_round(model.ingredient_demand(book.positions, book.qty, book.size), 1)
+    rows = []
+    for ing in catalog.used_ingredients:
+        rows.append(shopping_row(ing, float(demand[catalog.ingredient_index[ing.id]])))
+    return rows
+
+
+def order_tuples(catalog, book):
+    """(cookie type, qty, size) per order of ``book``, e.g. to fill the Order Calculator."""
+    names = [rec.name for rec in catalog.recipes]
+    return [(names[p], qty, size)
+            for p, qty, size in zip(book.positions.tolist(), book.qty.tolist(), book.size.tolist())]
+
+
+def shopping_amounts(rows):
+    """Ingredient id -> amount needed, for pre-filling the workbook's Shopping List."""
+    return {r["ingredient_id"]: r["amount_needed"] for r in rows if r["amount_needed"]}
+
+
+def write_shopping_csv(rows, path):
+    columns = ["ingredient", "amount_needed", "unit", "package_size", "packages", "package_price", "total_cost"]
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate an order book into a shopping list")
+    parser.add_argument("orders", help="CSV, JSONL or JSON order file (cookie type, qty, size)")
+    parser.add_argument("-o", "--output", help="write the shopping list to this CSV file")
+    parser.add_argument("--workbook", help="also generate a calculator workbook filled with these orders")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog()
+    model = CostModel(catalog)
+    try:
+        book = load_order_book(args.orders, model)
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"orders.py: error: {exc}\n")
+    rows = shopping_list(model, book)
+
+    if args.output:
+        write_shopping_csv(rows, args.output)
+    else:
+        print_shopping_list(rows, len(book))
+
+    if args.workbook:
+        from generate_cookie_calculator import create_cookie_calculator
+        create_cookie_calculator(catalog, filename=args.workbook, shopping_amounts=shopping_amounts(rows),
+                                 verbose=False, order_rows=len(book), orders=order_tuples(catalog, book))
+        print(f"✅ Orders and Shopping List written to {args.workbook}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Midnight Dough Pricing Export
+Writes the precomputed pricing model as JSON and CSV for the web app
+
+Features:
+- Per recipe: cost per batch, cost per gram of dough and cost per cookie at
+  the base size and at STANDARD_SIZES
+- Computed in one pass from the same CostModel as the calculator workbook
+  (batch costs as on the Recipe Costs sheet, per-cookie costs as the Order
+  Calculator's scale x batch cost), so the two never disagree
+- Content hash of the source JSON, so a reader can tell a stale artifact
+- Also written by generate_cookie_calculator.py --pricing in the same run
+
+Usage:
+    python pricing_export.py [-o ../src/data/pricing.json] [--sizes 30 45 55 85]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from catalog import DATA_DIR, load_catalog, source_paths
+from costing import CostModel
+
+DEFAULT_OUTPUT = os.path.join(DATA_DIR, "pricing.json")
+
+# Cookie sizes (g) the storefront sells; the base size of each recipe is always included
+STANDARD_SIZES = (30, 40, 50, 55, 70, 85, 100, 115)
+
+# Bump when the artifact layout changes
+FORMAT_VERSION = 1
+
+
+def source_hash(data_dir=DATA_DIR):
+    """Short SHA-256 over the ingredient and recipe JSON the prices come from."""
+    digest = hashlib.sha256()
+    for path in source_paths(data_dir):
+        with open(path, "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()[:16]
+
+
+def pricing_table(model, sizes=STANDARD_SIZES):
+    """
+    Arrays for every recipe: batch cost, cost per gram, cost per cookie at
+    the base size and a (recipes, sizes) cost-per-cookie matrix.
+    """
+    catalog = model.catalog
+    sizes = np.asarray(sizes, dtype=float)
+    total_dough = np.array([rec.total_dough for rec in catalog.recipes], dtype=float)
+    batch = model.batch_costs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Recipe Costs: cost per batch / total dough. The Order Calculator's
+        # (qty*size)/total dough x batch cost is this per gram of cookie.
+        per_gram = np.where(total_dough > 0, batch / total_dough, 0.0)
+    return {
+        "batch_cost": batch,
+        "cost_per_gram": per_gram,
+        "cost_per_base_cookie": per_gram * model.base_size,
+        "cost_per_cookie": per_gram[:, None] * sizes[None, :],
+        "sizes": sizes,
+    }
+
+
+def _size_key(size):
+    return f"{size:g}"
+
+
+def pricing_artifact(model, sizes=STANDARD_SIZES, data_dir=DATA_DIR):
+    """JSON-ready dict with one entry per recipe."""
+    table = pricing_table(model, sizes)
+    size_keys = [_size_key(s) for s in table["sizes"].tolist()]
+    recipes = []
+    for r, rec in enumerate(model.catalog.recipes):
+        recipes.append({
+            "id": rec.id,
+            "name": rec.name,
+            "baseYield": rec.base_yield,
+            "baseCookieSize": rec.base_size,
+            "totalDough": rec.total_dough,
+            "batchCost": round(float(table["batch_cost"][r]), 4),
+            "costPerGram": round(float(table["cost_per_gram"][r]), 6),
+            "costPerBaseCookie": round(float(table["cost_per_base_cookie"][r]), 4),
+            "costPerCookie": dict(zip(size_keys, np.round(table["cost_per_cookie"][r], 4).tolist())),
+        })
+    return {
+        "version": FORMAT_VERSION,
+        "sourceHash": source_hash(data_dir),
+        "sizes": table["sizes"].tolist(),
+        "recipes": recipes,
+    }
+
+
+def write_pricing(artifact, json_path, csv_path=None):
+    """Write the artifact as compact JSON and, one row per recipe, as CSV."""
+    if csv_path is None:
+        csv_path = os.path.splitext(json_path)[0] + ".csv"
+    with open(json_path, "w", encoding="utf-8") as fh:
+        json.dump(artifact, fh, separators=(",", ":"))
+        fh.write("\n")
+
+    size_keys = [_size_key(s) for s in artifact["sizes"]]
+    with open(csv_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["recipe_id", "recipe", "base_yield", "base_size", "total_dough", "batch_cost",
+                         "cost_per_gram", "cost_per_base_cookie"]
+                        + [f"cost_per_cookie_{key}g" for key in size_keys])
+        for rec in artifact["recipes"]:
+            writer.writerow([rec["id"], rec["name"], rec["baseYield"], rec["baseCookieSize"],
+                             rec["totalDough"], rec["batchCost"], rec["costPerGram"],
+                             rec["costPerBaseCookie"]]
+                            + [rec["costPerCookie"][key] for key in size_keys])
+    return json_path, csv_path
+
+
+def export_pricing(catalog, json_path=DEFAULT_OUTPUT, csv_path=None, sizes=STANDARD_SIZES):
+    """Compute and write the pricing artifact for ``catalog``; returns both paths."""
+    return write_pricing(pricing_artifact(CostModel(catalog), sizes), json_path, csv_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export per-recipe pricing as JSON and CSV")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT,
+                        help="JSON output path; the CSV is written next to it (default: src/data/pricing.json)")
+    parser.add_argument("--csv", help="CSV output path (default: the JSON path with .csv)")
+    parser.add_argument("--sizes", type=float, nargs="+", default=STANDARD_SIZES, metavar="GRAMS",
+                        help="cookie sizes to price")
+    args = parser.parse_args(argv)
+    if any(s <= 0 for s in args.sizes):
+        parser.error("sizes must be positive")
+
+    json_path, csv_path = export_pricing(load_catalog(), args.output, args.csv, args.sizes)
+    print(f"✅ Pricing written to {json_path} and {csv_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Midnight Dough Pricing Service
+Small asyncio HTTP service on localhost that answers cost questions for the
+admin Calculator and Checkout pages
+
+Endpoints (JSON responses, CORS open for the local web app):
+- GET  /quote?recipe=Chocolate+Chip&qty=300&size=55[&breakdown=1]
+- GET  /shopping-list?order=Chocolate+Chip:300:55&order=Lemon+Sugar:120:30
+- POST /shopping-list  with {"orders": [["Chocolate Chip", 300, 55], ...]}
+- GET  /stats          cache hits, misses and size
+
+Features:
+- Standard library only; quotes and shopping lists come from quoting.py,
+  so no NumPy or openpyxl is loaded
+- HTTP/1.1 keep-alive, one coroutine per connection
+- 400 for unknown cookie types and for qty or size that are not finite
+  positive numbers
+- Quotes are kept in an LRU cache keyed by (recipe, qty, size); the cache is
+  dropped as soon as ingredients.json or recipes.json changes (the catalog
+  is re-checked by file stat on every request, see catalog.load_catalog)
+
+Load testing: benchmarks/service_benchmark.py
+
+Usage:
+    python pricing_service.py [--host 127.0.0.1] [--port 8765] [--cache-size 4096]
+"""
+
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from catalog import load_catalog
+from quoting import parse_order_spec, positive_finite, quote, shopping_list
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 4096
+MAX_BODY = 1 << 20
+
+
+class QuoteCache:
+    """LRU of quote results keyed by (recipe, qty, size, breakdown)."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.invalidations = 0
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self.entries[key] = result
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.invalidations += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries),
+                "maxsize": self.maxsize, "invalidations": self.invalidations}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PricingService:
+    """Request handling on top of the cached catalog; independent of the transport."""
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, catalog_loader=load_catalog):
+        self.load_catalog = catalog_loader
+        self.catalog = catalog_loader()
+        self.cache = QuoteCache(cache_size)
+
+    def current_catalog(self):
+        # load_catalog() hands back the same object until a source file changes
+        catalog = self.load_catalog()
+        if catalog is not self.catalog:
+            self.catalog = catalog
+            self.cache.clear()
+        return catalog
+
+    def _recipe(self, catalog, name):
+        if name not in catalog.recipe_ids:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"unknown cookie type {name!r}")
+        return name
+
+    def quote(self, params):
+        catalog = self.current_catalog()
+        try:
+            recipe = params["recipe"][0].strip()
+            qty = positive_finite(params["qty"][0], "qty")
+            size = positive_finite(params["size"][0], "size")
+        except KeyError as exc:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"missing parameter {exc.args[0]!r}") from None
+        except ValueError as exc:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(exc)) from None
+        breakdown = params.get("breakdown", ["0"])[0].lower() in ("1", "true", "yes")
+        key = (recipe, qty, size, breakdown)
+        result = self.cache.get(key)
+        if result is None:
+            result = quote(self._recipe(catalog, recipe), qty, size, catalog, breakdown=breakdown)
+            self.cache.put(key, result)
+        return result
+
+    def shopping_list(self, params, body=None):
+        catalog = self.current_catalog()
+        try:
+            if body is not None:
+                orders = [(str(recipe).strip(), positive_finite(qty, "qty"), positive_finite(size, "size"))
+                          for recipe, qty, size in json.loads(body)["orders"]]
+            else:
+                orders = [parse_order_spec(spec) for spec in params.get("order", [])]
+        except (KeyError, TypeError, ValueError) as exc:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"bad orders: {exc}") from None
+        if not orders:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "no orders given")
+        for recipe, _, _ in orders:
+            self._recipe(catalog, recipe)
+        rows = shopping_list(catalog, orders)
+        return {"orders": len(orders), "rows": rows,
+                "total_cost": sum(r["total_cost"] for r in rows)}
+
+    def handle(self, method, target, body=None):
+        """(status, payload) for one request."""
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        try:
+            if method == "OPTIONS":
+                # CORS preflight from the web app
+                return HTTPStatus.NO_CONTENT, None
+            if url.path == "/quote" and method == "GET":
+                return HTTPStatus.OK, self.quote(params)
+            if url.path == "/shopping-list" and method in ("GET", "POST"):
+                return HTTPStatus.OK, self.shopping_list(params, body if method == "POST" else None)
+            if url.path == "/stats" and method == "GET":
+                self.current_catalog()
+                return HTTPStatus.OK, self.cache.stats()
+            if url.path in ("/quote", "/shopping-list", "/stats"):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {url.path}")
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no such endpoint {url.path}")
+        except HTTPError as exc:
+            return exc.status, {"error": str(exc)}
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def _read_request(reader):
+    """(method, target, headers, body), or None when the client hung up."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "request headers too large") from None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    headers[":version"] = version
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "bad Content-Length") from None
+    if length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+    body = await reader.readexactly(length) if length else None
+    return method, target, headers, body
+
+
+def make_handler(service):
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as exc:
+                    writer.write(_response(exc.status, {"error": str(exc)}, False))
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (headers[":version"] == "HTTP/1.1"
+                                                        or connection == "keep-alive")
+                status, payload = service.handle(method, target, body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE, ready=None):
+    service = PricingService(cache_size)
+    server = await asyncio.start_server(make_handler(service), host, port)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve quotes and shopping lists over HTTP on localhost")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"interface to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="quotes kept in the LRU cache")
+    args = parser.parse_args(argv)
+
+    def ready(server):
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"🍪 Pricing service on http://{host}:{port} (cache {args.cache_size} quotes)", flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.cache_size, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
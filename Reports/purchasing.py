@@ -0,0 +1,166 @@
+"""
+Midnight Dough Package Mix Optimizer
+Cheapest combination of package sizes that covers an ingredient's demand
+
+Features:
+- Every ingredient has its packageSize/packagePrice plus any extra
+  "packages" options from ingredients.json (e.g. a 16 kg butter case)
+- Exact covering knapsack per ingredient: cheapest total price with at
+  least the amount needed, ties broken by the smallest leftover
+- Two exchange bounds keep the search small and exact: swapping an lcm's
+  worth of any package for best-value packages never costs more, and
+  replacing more than price_best / (next best unit price - best unit
+  price) of other packages with best-value ones is always cheaper; the bulk
+  of a large demand is covered with the best-value package and only the
+  remainder is searched
+- The remainder search enumerates the other package counts as one NumPy
+  grid, so a whole aggregated order is solved in milliseconds
+
+Usage:
+    python purchasing.py orders.csv
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+# Grid cells searched per ingredient; past this each count range is thinned
+MAX_COMBINATIONS = 1_000_000
+# Package sizes are compared on this grid (units of 1/1000) for the gcd bound
+SIZE_RESOLUTION = 1000
+
+
+class PackageMix:
+    """Packages to buy for one ingredient: count per option, cost and leftover."""
+
+    __slots__ = ("options", "counts", "cost", "leftover")
+
+    def __init__(self, options, counts, cost, leftover):
+        self.options = options
+        self.counts = counts
+        self.cost = cost
+        self.leftover = leftover
+
+    @property
+    def amount(self):
+        return sum(n * size for n, (size, _) in zip(self.counts, self.options))
+
+    def describe(self, unit=""):
+        """e.g. "1 x 16,329 g + 2 x 454 g"."""
+        parts = [f"{n} x {size:,.6g} {unit}".rstrip() for n, (size, _) in zip(self.counts, self.options) if n]
+        return " + ".join(parts) or "-"
+
+
+def _exchange_bound(size, best_size):
+    # Copies of ``size`` that add up to lcm(size, best_size)
+    a, b = round(size * SIZE_RESOLUTION), round(best_size * SIZE_RESOLUTION)
+    return b // math.gcd(a, b) if a and b else 1
+
+
+def cheapest_mix(needed, options):
+    """
+    Cheapest PackageMix of ``options`` ((size, price) pairs) holding at
+    least ``needed``; among equally cheap mixes, the one with least left over.
+    """
+    options = tuple((float(size), float(price)) for size, price in options)
+    counts = [0] * len(options)
+    if needed <= 0 or not options:
+        return PackageMix(options, tuple(counts), 0.0, 0.0)
+
+    best = min(range(len(options)), key=lambda k: (options[k][1] / options[k][0], -options[k][0]))
+    best_size, best_price = options[best]
+    others = [k for k in range(len(options)) if k != best]
+
+    # Amount of other packages beyond which buying best-value ones instead is cheaper
+    best_rate = best_price / best_size
+    gap = min((options[k][1] / options[k][0] - best_rate for k in others), default=0.0)
+    other_cap = best_price / gap if gap > 1e-12 else math.inf
+    # Upper bound on each other package's count in some optimal mix
+    bounds = [min(_exchange_bound(options[k][0], best_size) - 1, other_cap // options[k][0])
+              for k in others]
+    other_total = min(sum(n * options[k][0] for n, k in zip(bounds, others)), other_cap)
+    # ...so at least this many best-value packages are always bought
+    prefill = max(0, math.ceil((needed - other_total) / best_size - 1e-9))
+    remainder = needed - prefill * best_size
+
+    ranges = [int(max(0, min(bound, math.ceil(remainder / options[k][0] - 1e-9)))) + 1
+              for bound, k in zip(bounds, others)]
+    cells = math.prod(ranges) if ranges else 1
+    if cells > MAX_COMBINATIONS:
+        # Very many options: thin every range evenly (no longer guaranteed optimal)
+        step = math.ceil((cells / MAX_COMBINATIONS) ** (1 / len(ranges)))
+        grids = [np.arange(0, n, step) for n in ranges]
+    else:
+        grids = [np.arange(n) for n in ranges]
+
+    if grids:
+        mesh = [g.ravel() for g in np.meshgrid(*grids, indexing="ij")]
+        sizes = np.array([options[k][0] for k in others])
+        prices = np.array([options[k][1] for k in others])
+        stacked = np.stack(mesh)
+        other_amount = sizes @ stacked
+        other_cost = prices @ stacked
+    else:
+        stacked = np.zeros((0, 1), dtype=np.int64)
+        other_amount = other_cost = np.zeros(1)
+    best_count = np.ceil(np.maximum(remainder - other_amount, 0) / best_size - 1e-9)
+    cost = other_cost + best_count * best_price
+    leftover = other_amount + best_count * best_size - remainder
+    # Cheapest first (to the cent fraction), then least leftover
+    pick = np.lexsort((leftover, np.round(cost, 6)))[0]
+
+    for row, k in enumerate(others):
+        counts[k] = int(stacked[row, pick])
+    counts[best] = prefill + int(best_count[pick])
+    total = sum(n * price for n, (_, price) in zip(counts, options))
+    amount = sum(n * size for n, (size, _) in zip(counts, options))
+    return PackageMix(options, tuple(counts), total, amount - needed)
+
+
+def purchase_plan(catalog, amounts):
+    """{ingredient id: PackageMix} for every ingredient with a positive amount in ``amounts``."""
+    plan = {}
+    for ing_id, needed in amounts.items():
+        if needed and needed > 0:
+            plan[ing_id] = cheapest_mix(needed, catalog.ingredient(ing_id).packages)
+    return plan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cheapest package mix for every ingredient of an order book")
+    parser.add_argument("orders", help="CSV, JSONL or JSON order file (cookie type, qty, size)")
+    args = parser.parse_args(argv)
+
+    from time import perf_counter
+
+    from catalog import load_catalog
+    from costing import CostModel
+    from orders import load_order_book, shopping_amounts, shopping_list
+
+    catalog = load_catalog()
+    model = CostModel(catalog)
+    try:
+        book = load_order_book(args.orders, model)
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"purchasing.py: error: {exc}\n")
+    rows = shopping_list(model, book)
+    start = perf_counter()
+    plan = purchase_plan(catalog, shopping_amounts(rows))
+    seconds = perf_counter() - start
+
+    print(f"📦 Package mix for {len(book)} orders ({len(plan)} ingredients in {seconds * 1000:.1f} ms)\n")
+    single = mixed = 0.0
+    for r in rows:
+        mix = plan.get(r["ingredient_id"])
+        if mix is None:
+            continue
+        single += r["total_cost"]
+        mixed += mix.cost
+        print(f"  {r['ingredient']:<25} {mix.describe(r['unit']):<32} ${mix.cost:>10,.2f}"
+              f"  (single size ${r['total_cost']:,.2f})")
+    print(f"\n  {'TOTAL:':<58} ${mixed:>10,.2f}  (single size ${single:,.2f})")
+
+
+if __name__ == "__main__":
+    main()
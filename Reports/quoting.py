@@ -0,0 +1,184 @@
+"""
+Midnight Dough Quotes
+Order quotes and shopping lists in plain Python, plus the result rows and
+text output shared with the NumPy versions in costing.py and orders.py
+
+Features:
+- quote(recipe, qty, size, catalog=None, breakdown=False): same signature
+  and result as costing.quote()
+- shopping_list(catalog, orders): same rows as orders.shopping_list()
+- quote_result / shopping_row build the dicts both implementations return,
+  print_quote / print_shopping_list print them, so the CLIs agree line for
+  line
+- positive_finite: the one rule for order quantities and sizes (finite and
+  > 0), shared by the CLIs, orders.py and pricing_service.py
+- Order Calculator scale (qty*size)/total dough, Batch Calculator scale
+  (qty*size)/(base_yield*base_size), as costing.CostModel
+- Imports neither openpyxl nor NumPy, so midnight.py and pricing_service.py
+  start fast
+"""
+
+import argparse
+import math
+
+from catalog import load_catalog
+
+
+def excel_round(x, digits=0):
+    """ROUND() for one value; same rule as costing.excel_round."""
+    factor = 10.0 ** digits
+    return math.copysign(math.floor(abs(x) * factor + 0.5) / factor, x)
+
+
+def order_scale(recipe, qty, size):
+    """Order Calculator Scale Factor: (qty*size)/total dough."""
+    return (qty * size) / recipe.total_dough
+
+
+def batch_scale(recipe, qty, size):
+    """Batch Calculator Scale Factor: (qty*size)/(base_yield*base_size)."""
+    return (qty * size) / (recipe.base_yield * recipe.base_size)
+
+
+def positive_finite(value, field):
+    """``value`` as a float; ValueError unless it is a finite number above zero."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number, got {value!r}") from None
+    # float() also accepts "nan", "inf" and negative numbers
+    if not (math.isfinite(number) and number > 0):
+        raise ValueError(f"{field} must be a positive number, got {number:g}")
+    return number
+
+
+def amount_type(field):
+    """argparse ``type`` that applies positive_finite to ``field``."""
+
+    def parse(text):
+        try:
+            return positive_finite(text, field)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(str(exc)) from None
+
+    return parse
+
+
+def _recipe_position(catalog, name):
+    if name not in catalog.recipe_ids:
+        raise KeyError(f"Unknown cookie type: {name!r}")
+    return catalog.recipe_index[catalog.recipe_ids[name]]
+
+
+def parse_order_spec(spec):
+    """"Chocolate Chip:300:55" -> ("Chocolate Chip", 300.0, 55.0)."""
+    recipe, sep, rest = spec.rpartition(":")
+    name, sep2, qty = recipe.rpartition(":")
+    if not (sep and sep2 and name):
+        raise ValueError(f"expected COOKIE:QTY:SIZE, got {spec!r}")
+    return name.strip(), positive_finite(qty, "qty"), positive_finite(rest, "size")
+
+
+# =============================================================================
+# RESULT ROWS
+# =============================================================================
+
+def quote_result(recipe_name, qty, size, scale, cost):
+    """The dict a quote returns."""
+    return {
+        "recipe": recipe_name,
+        "qty": qty,
+        "size": size,
+        "total_dough": qty * size,
+        "scale_factor": scale,
+        "cost": cost,
+        "cost_per_cookie": cost / qty if qty else 0.0,
+    }
+
+
+def shopping_row(ing, needed):
+    """Shopping list row for ``needed`` (already rounded to 0.1) of ``ing``."""
+    # ROUNDUP(needed/pkg_size,0)
+    packages = math.ceil(needed / ing.package_size) if needed > 0 else 0
+    return {
+        "ingredient_id": ing.id,
+        "ingredient": ing.name,
+        "amount_needed": needed,
+        "unit": ing.unit,
+        "package_size": ing.package_size,
+        "packages": packages,
+        "package_price": ing.package_price,
+        "total_cost": packages * ing.package_price,
+    }
+
+
+# =============================================================================
+# PLAIN PYTHON
+# =============================================================================
+
+def quote(recipe, qty, size, catalog=None, breakdown=False):
+    """
+    Order Calculator style quote for a single order. With ``breakdown`` the
+    result also has the Batch Calculator rows ("breakdown") and their total
+    ("batch_cost").
+    """
+    qty, size = positive_finite(qty, "qty"), positive_finite(size, "size")
+    catalog = catalog if catalog is not None else load_catalog()
+    r = _recipe_position(catalog, recipe)
+    rec = catalog.recipes[r]
+    amounts = catalog.amounts[r]
+    prices = [ing.unit_price for ing in catalog.ingredients]
+    scale = order_scale(rec, qty, size)
+    result = quote_result(rec.name, qty, size, scale,
+                          scale * math.fsum(a * p for a, p in zip(amounts, prices)))
+    if breakdown:
+        scale = batch_scale(rec, qty, size)
+        rows = []
+        for ing, amount, price in zip(catalog.ingredients, amounts, prices):
+            if amount:
+                scaled = excel_round(amount * scale, 1)
+                rows.append({"ingredient": ing.name, "unit": ing.unit, "base_amount": amount,
+                             "scaled_amount": scaled, "unit_price": price, "cost": scaled * price})
+        result["breakdown"] = rows
+        result["batch_cost"] = math.fsum(row["cost"] for row in rows)
+    return result
+
+
+def shopping_list(catalog, orders):
+    """Packages to buy for ``orders`` ((cookie type, qty, size) tuples)."""
+    scales = [0.0] * len(catalog.recipes)
+    for recipe, qty, size in orders:
+        r = _recipe_position(catalog, recipe)
+        scales[r] += order_scale(catalog.recipes[r], positive_finite(qty, "qty"), positive_finite(size, "size"))
+
+    rows = []
+    for ing in catalog.used_ingredients:
+        i = catalog.ingredient_index[ing.id]
+        needed = excel_round(math.fsum(s * amounts[i] for s, amounts in zip(scales, catalog.amounts) if s), 1)
+        rows.append(shopping_row(ing, needed))
+    return rows
+
+
+# =============================================================================
+# TEXT OUTPUT
+# =============================================================================
+
+def print_quote(q):
+    print(f"{q['recipe']}: {q['qty']:g} x {q['size']:g} g  (scale {q['scale_factor']:.2f}x base recipe)")
+    print(f"  Est. cost:   ${q['cost']:,.2f}")
+    print(f"  Cost/cookie: ${q['cost_per_cookie']:,.2f}")
+    if "breakdown" in q:
+        print()
+        for row in q["breakdown"]:
+            print(f"  {row['ingredient']:<25} {row['scaled_amount']:>10,.1f} {row['unit']:<5}"
+                  f" ${row['cost']:>8,.2f}")
+        print(f"  {'TOTAL COST:':<25} {'':>16} ${q['batch_cost']:>8,.2f}")
+
+
+def print_shopping_list(rows, n_orders):
+    print(f"🛒 Shopping list for {n_orders} orders\n")
+    for r in rows:
+        if r["packages"]:
+            print(f"  {r['ingredient']:<25} {r['amount_needed']:>12,.1f} {r['unit']:<5}"
+                  f" {r['packages']:>5} x {r['package_size']:<6g} ${r['total_cost']:>10,.2f}")
+    print(f"\n  {'GRAND TOTAL:':<58} ${sum(r['total_cost'] for r in rows):>10,.2f}")
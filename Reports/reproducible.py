@@ -0,0 +1,150 @@
+"""
+Midnight Dough Reproducible Workbooks
+Rewrites a saved xlsx so the same inputs always give the same bytes, which
+lets artifact storage dedupe generated workbooks and keeps their diffs
+readable
+
+Features:
+- Fixed zip entry timestamps and attributes, and fixed workbook
+  created/modified dates (SOURCE_DATE_EPOCH if set, otherwise 1980-01-01)
+- Zip entries in a stable order: [Content_Types].xml first, then by name
+- Configurable compression: deflated at level 0-9 (6 by default), or stored
+- openpyxl writes every string inline; they are moved into one shared
+  string table numbered in first-use order (sheet by sheet, row by row),
+  so repeated names and units are stored once
+- With StyleRegistry(lazy=True) styles.xml only lists the styles the sheets
+  use (generate_cookie_calculator.py --reproducible does both)
+
+Compare two generated workbooks with workbook_dump.py.
+
+Usage:
+    python reproducible.py calculator.xlsx [--compression deflated|stored] [--level 6]
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import zipfile
+from datetime import datetime, timezone
+
+from formula_engine import sheet_parts
+
+COMPRESSION = {"deflated": zipfile.ZIP_DEFLATED, "stored": zipfile.ZIP_STORED}
+DEFAULT_COMPRESSION = "deflated"
+# zlib's default; 9 saves about a tenth more at several times the time
+DEFAULT_LEVEL = 6
+
+CONTENT_TYPES = "[Content_Types].xml"
+CORE_PROPS = "docProps/core.xml"
+WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+SHARED_STRINGS = "xl/sharedStrings.xml"
+SHARED_STRINGS_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+SHARED_STRINGS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+# Zip timestamps start in 1980
+EARLIEST = datetime(1980, 1, 1, tzinfo=timezone.utc)
+
+# An inline string cell as openpyxl writes it: <c r="A1" s="1" t="inlineStr"><is><t>text</t></is></c>
+INLINE_STRING = re.compile(
+    rb'<c r="([A-Z]+[0-9]+)"((?: s="[0-9]+")?) t="inlineStr"><is><t(?: xml:space="preserve")?>([^<]*)</t></is></c>')
+CORE_DATE = re.compile(rb"(<dcterms:(created|modified)[^>]*>)[^<]*(</dcterms:\2>)")
+REL_ID = re.compile(rb'Id="rId([0-9]+)"')
+
+
+def build_timestamp():
+    """SOURCE_DATE_EPOCH (the reproducible-builds convention) as a UTC datetime, or 1980-01-01."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not epoch:
+        return EARLIEST
+    return max(datetime.fromtimestamp(int(epoch), timezone.utc), EARLIEST)
+
+
+def _share_strings(parts, sheets):
+    """Move inline strings on ``sheets`` into a shared string table added to ``parts``."""
+    index = {}
+
+    def replace(match):
+        text = match.group(3)
+        i = index.setdefault(text, len(index))
+        return b'<c r="%s"%s t="s"><v>%d</v></c>' % (match.group(1), match.group(2), i)
+
+    count = 0
+    for part in sheets:
+        parts[part], n = INLINE_STRING.subn(replace, parts[part])
+        count += n
+    if not index:
+        return 0
+
+    items = [b'<si><t xml:space="preserve">%s</t></si>' % text if text != text.strip() else
+             b"<si><t>%s</t></si>" % text for text in index]
+    parts[SHARED_STRINGS] = b'<sst xmlns="%s" count="%d" uniqueCount="%d">%s</sst>' % (
+        NS_MAIN.encode(), count, len(index), b"".join(items))
+    parts[CONTENT_TYPES] = parts[CONTENT_TYPES].replace(
+        b"</Types>", b'<Override PartName="/%s" ContentType="%s" /></Types>' % (
+            SHARED_STRINGS.encode(), SHARED_STRINGS_TYPE.encode()))
+    rel_id = 1 + max((int(n) for n in REL_ID.findall(parts[WORKBOOK_RELS])), default=0)
+    parts[WORKBOOK_RELS] = parts[WORKBOOK_RELS].replace(
+        b"</Relationships>", b'<Relationship Id="rId%d" Target="sharedStrings.xml" Type="%s" /></Relationships>' % (
+            rel_id, SHARED_STRINGS_REL.encode()))
+    return len(index)
+
+
+def normalize_workbook(filename, compression=DEFAULT_COMPRESSION, level=DEFAULT_LEVEL, timestamp=None):
+    """
+    Rewrite ``filename`` in place as a reproducible xlsx (see the module
+    docstring). ``timestamp`` defaults to build_timestamp(). Returns the
+    new file size in bytes.
+    """
+    if compression not in COMPRESSION:
+        raise ValueError(f"unknown compression {compression!r} (expected one of {', '.join(COMPRESSION)})")
+    timestamp = timestamp or build_timestamp()
+    with zipfile.ZipFile(filename) as zf:
+        parts = {info.filename: zf.read(info) for info in zf.infolist()}
+        sheets = list(sheet_parts(zf).values())
+
+    if SHARED_STRINGS not in parts:
+        _share_strings(parts, sheets)
+    if CORE_PROPS in parts:
+        stamp = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ").encode()
+        parts[CORE_PROPS] = CORE_DATE.sub(lambda m: m.group(1) + stamp + m.group(3), parts[CORE_PROPS])
+
+    date_time = timestamp.timetuple()[:6]
+    fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(filename)))
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp, "w") as out:
+            for name in sorted(parts, key=lambda name: (name != CONTENT_TYPES, name)):
+                info = zipfile.ZipInfo(name, date_time=date_time)
+                info.compress_type = COMPRESSION[compression]
+                # Same entry header on every OS
+                info.create_system = 0
+                info.external_attr = 0
+                out.writestr(info, parts[name], compresslevel=level)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, filename)
+    return os.path.getsize(filename)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rewrite xlsx files in place as reproducible workbooks")
+    parser.add_argument("workbooks", nargs="+", help="xlsx files to normalize")
+    parser.add_argument("--compression", choices=sorted(COMPRESSION), default=DEFAULT_COMPRESSION)
+    parser.add_argument("--level", type=int, choices=range(10), default=DEFAULT_LEVEL, metavar="0-9",
+                        help=f"deflate level (default: {DEFAULT_LEVEL})")
+    args = parser.parse_args(argv)
+
+    for filename in args.workbooks:
+        before = os.path.getsize(filename)
+        try:
+            after = normalize_workbook(filename, args.compression, args.level)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as exc:
+            parser.exit(2, f"reproducible.py: error: {filename}: {exc}\n")
+        print(f"✅ {filename}: {before:,} -> {after:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Midnight Dough Production Scheduler
+Plans a bake day: which tray goes into which oven, and when
+
+Features:
+- Oven temperature and bake time per recipe, read from the catalog
+  (the same values as the Quick Reference sheet)
+- Orders split into trays; cookies per tray shrink as cookie size grows
+- Trays batched into oven loads of one temperature and bake time
+- Loads spread over the ovens to minimise the makespan (time until the
+  last tray is out) and the number of temperature changeovers
+- Tray-level schedule as a "Production Schedule" sheet in the calculator
+
+Oven assignment tries three kinds of plan and keeps the best one (shorter
+makespan, then fewer changeovers): ovens dedicated to one temperature each;
+the temperature-ordered loads cut into one run per oven at the shortest
+feasible makespan, so only ovens on a temperature boundary change over; and
+longest-load-first list scheduling that charges the changeover time
+whenever an oven would have to switch temperature. Each oven bakes its
+loads coolest temperature first.
+
+Usage:
+    python schedule.py weekly_orders.csv [--ovens 2] [--racks 2] [--tray-capacity 12]
+        [--changeover 15] [--start 06:00] [--workbook calculator.xlsx]
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import re
+
+from catalog import load_catalog
+
+DEFAULT_OVENS = 2
+DEFAULT_RACKS = 2               # trays baked together in one oven load
+DEFAULT_TRAY_CAPACITY = 12      # cookies per tray at REFERENCE_SIZE
+REFERENCE_SIZE = 50             # grams
+DEFAULT_CHANGEOVER = 15         # minutes to bring an oven to a new temperature
+DEFAULT_START = "06:00"
+
+TEMPERATURE = re.compile(r"(\d+)\s*°?\s*F")
+MINUTES = re.compile(r"\d+")
+
+
+def bake_profile(recipe):
+    """(oven temperature in °F, bake minutes) for a recipe, e.g. (350, 12) for "10-12 min"."""
+    temp = TEMPERATURE.search(recipe.oven_temp or "")
+    minutes = MINUTES.findall(recipe.bake_time or "")
+    if not temp or not minutes:
+        raise ValueError(f"{recipe.name}: no oven temperature/bake time "
+                         f"({recipe.oven_temp!r}, {recipe.bake_time!r})")
+    # Plan for the top of the bake-time range
+    return int(temp.group(1)), max(int(m) for m in minutes)
+
+
+def cookies_per_tray(size, tray_capacity=DEFAULT_TRAY_CAPACITY, reference_size=REFERENCE_SIZE):
+    """Cookies of ``size`` grams that fit on a tray holding ``tray_capacity`` reference cookies."""
+    # Spread footprint grows with diameter squared, i.e. with mass^(2/3)
+    return max(1, math.floor(tray_capacity * (reference_size / size) ** (2 / 3) + 1e-9))
+
+
+class Load:
+    """Trays baked together: one temperature and bake time, up to ``racks`` trays."""
+
+    __slots__ = ("temp", "minutes", "trays", "oven", "start")
+
+    def __init__(self, temp, minutes, trays):
+        self.temp = temp
+        self.minutes = minutes
+        # (order number, cookies) per tray
+        self.trays = trays
+        self.oven = None
+        self.start = None
+
+
+class Schedule:
+    """Result of schedule_orders; ``loads`` are in (oven, start) order."""
+
+    def __init__(self, loads, ovens, racks, changeover, start, orders, scale_factors):
+        self.loads = loads
+        self.ovens = ovens
+        self.racks = racks
+        self.changeover = changeover
+        self.start = start
+        self.orders = orders
+        self.scale_factors = scale_factors
+        self.makespan = max((load.start + load.minutes for load in loads), default=0)
+        self.changeovers = sum(
+            1 for prev, load in zip(loads, loads[1:]) if prev.oven == load.oven and prev.temp != load.temp
+        )
+        # Even split of the bake time, ignoring changeovers
+        self.lower_bound = max(math.fsum(load.minutes for load in loads) / ovens,
+                               max((load.minutes for load in loads), default=0))
+
+    def clock(self, minutes):
+        """HH:MM of ``minutes`` after the start of the day ("Day 2 07:30" past midnight)."""
+        hours, mins = divmod(self.start + int(round(minutes)), 60)
+        day, hours = divmod(hours, 24)
+        return f"Day {day + 1} {hours:02d}:{mins:02d}" if day else f"{hours:02d}:{mins:02d}"
+
+    def tray_rows(self):
+        """One dict per tray, plus a row per changeover, in oven/time order."""
+        rows = []
+        prev = None
+        for n, load in enumerate(self.loads, 1):
+            if prev is not None and prev.oven == load.oven and prev.temp != load.temp:
+                rows.append({"oven": load.oven, "changeover": True, "temp": load.temp,
+                             "start": load.start - self.changeover, "end": load.start})
+            for rack, (order, cookies) in enumerate(load.trays, 1):
+                recipe, qty, size = self.orders[order - 1]
+                rows.append({
+                    "oven": load.oven,
+                    "changeover": False,
+                    "load": n,
+                    "start": load.start,
+                    "end": load.start + load.minutes,
+                    "temp": load.temp,
+                    "minutes": load.minutes,
+                    "rack": rack,
+                    "order": order,
+                    "recipe": recipe,
+                    "cookies": cookies,
+                    "size": size,
+                    "dough": cookies * size,
+                    # This tray's share of the order's scale factor
+                    "scale_factor": self.scale_factors[order - 1] * cookies / qty,
+                })
+            prev = load
+        return rows
+
+
+# =============================================================================
+# PLANNING
+# =============================================================================
+
+def plan_loads(catalog, orders, racks=DEFAULT_RACKS, tray_capacity=DEFAULT_TRAY_CAPACITY,
+               reference_size=REFERENCE_SIZE):
+    """Split (cookie type, qty, size) orders into trays and group them into Loads."""
+    profiles = {}
+    classes = {}
+    for order, (recipe_name, qty, size) in enumerate(orders, 1):
+        if qty <= 0 or size <= 0:
+            continue
+        if recipe_name not in profiles:
+            profiles[recipe_name] = bake_profile(catalog.recipe(recipe_name))
+        per_tray = cookies_per_tray(size, tray_capacity, reference_size)
+        full, rest = divmod(math.ceil(qty), per_tray)
+        trays = classes.setdefault(profiles[recipe_name], [])
+        trays.extend([(order, per_tray)] * full)
+        if rest:
+            trays.append((order, rest))
+
+    loads = []
+    for (temp, minutes), trays in sorted(classes.items()):
+        for k in range(0, len(trays), racks):
+            loads.append(Load(temp, minutes, trays[k:k + racks]))
+    return loads
+
+
+def _lpt(loads, ovens):
+    """Longest-first onto the least loaded oven, without changeovers; oven -> loads."""
+    heap = [(0, o) for o in ovens]
+    plan = {o: [] for o in ovens}
+    for load in sorted(loads, key=lambda l: -l.minutes):
+        finish, o = heapq.heappop(heap)
+        plan[o].append(load)
+        heapq.heappush(heap, (finish + load.minutes, o))
+    return plan
+
+
+def _dedicated_plans(loads, ovens):
+    """Every way of giving each temperature its own ovens (needs ovens >= temperatures)."""
+    by_temp = {}
+    for load in loads:
+        by_temp.setdefault(load.temp, []).append(load)
+    temps = sorted(by_temp)
+    if not temps or len(temps) > ovens:
+        return
+    # Compositions of ``ovens`` into len(temps) positive parts
+    for cuts in itertools.combinations(range(1, ovens), len(temps) - 1):
+        bounds = (0,) + cuts + (ovens,)
+        plan = {}
+        for temp, lo, hi in zip(temps, bounds, bounds[1:]):
+            plan.update(_lpt(by_temp[temp], range(lo, hi)))
+        yield plan
+
+
+def _mixed_plan(loads, ovens, changeover):
+    """Longest-first list scheduling that charges ``changeover`` for a new temperature."""
+    finish = [0] * ovens
+    temps = [set() for _ in range(ovens)]
+    plan = {o: [] for o in range(ovens)}
+    for load in sorted(loads, key=lambda l: (-l.minutes, l.temp)):
+        def cost(o):
+            switch = bool(temps[o]) and load.temp not in temps[o]
+            return finish[o] + load.minutes + (changeover if switch else 0), switch, o
+        o = min(range(ovens), key=cost)
+        finish[o] = cost(o)[0]
+        temps[o].add(load.temp)
+        plan[o].append(load)
+    return plan
+
+
+def _fill(loads, ovens, changeover, limit):
+    """Fill ovens one after another with temperature-ordered loads; None if ``limit`` is too short."""
+    plan = {o: [] for o in range(ovens)}
+    oven, clock, temp = 0, 0, None
+    for load in loads:
+        extra = load.minutes + (changeover if temp is not None and load.temp != temp else 0)
+        if clock + extra > limit:
+            oven, clock, temp, extra = oven + 1, 0, None, load.minutes
+            if oven == ovens or extra > limit:
+                return None
+        plan[oven].append(load)
+        clock, temp = clock + extra, load.temp
+    return plan
+
+
+def _contiguous_plan(loads, ovens, changeover):
+    """
+    Temperature-ordered loads cut into one run per oven, with the shortest
+    feasible makespan (binary search). At most one changeover per
+    temperature boundary in the whole plan.
+    """
+    ordered = sorted(loads, key=lambda l: (l.temp, -l.minutes))
+    lo = max((load.minutes for load in loads), default=0)
+    hi = sum(load.minutes for load in loads) + changeover * len(loads)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _fill(ordered, ovens, changeover, mid) is None:
+            lo = mid + 1
+        else:
+            hi = mid
+    return _fill(ordered, ovens, changeover, lo)
+
+
+def _sequence(plan, changeover):
+    """Order each oven's loads coolest first and set start times; (makespan, changeovers, loads)."""
+    ordered = []
+    makespan = changeovers = 0
+    for oven in sorted(plan):
+        clock, temp = 0, None
+        for load in sorted(plan[oven], key=lambda l: (l.temp, -l.minutes)):
+            if temp is not None and load.temp != temp:
+                clock += changeover
+                changeovers += 1
+            load.oven, load.start, temp = oven + 1, clock, load.temp
+            clock += load.minutes
+            ordered.append(load)
+        makespan = max(makespan, clock)
+    return makespan, changeovers, ordered
+
+
+def _parse_clock(text):
+    hours, _, minutes = text.partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def schedule_orders(model, orders, ovens=DEFAULT_OVENS, racks=DEFAULT_RACKS,
+                    tray_capacity=DEFAULT_TRAY_CAPACITY, changeover=DEFAULT_CHANGEOVER,
+                    start=DEFAULT_START, reference_size=REFERENCE_SIZE):
+    """
+    Tray-level bake schedule for ``orders`` ((cookie type, qty, size) tuples)
+    using the recipes of ``model`` (a costing.CostModel).
+    """
+    if ovens < 1 or racks < 1 or tray_capacity < 1:
+        raise ValueError("ovens, racks and tray capacity must be at least 1")
+    orders = list(orders)
+    scale_factors = model.scale_factors(model.recipe_positions_for([o[0] for o in orders]),
+                                        [o[1] for o in orders], [o[2] for o in orders]).tolist()
+    loads = plan_loads(model.catalog, orders, racks, tray_capacity, reference_size)
+
+    best = None
+    candidates = itertools.chain(_dedicated_plans(loads, ovens),
+                                 [_contiguous_plan(loads, ovens, changeover), _mixed_plan(loads, ovens, changeover)])
+    for plan in candidates:
+        makespan, changeovers, ordered = _sequence(plan, changeover)
+        if best is None or (makespan, changeovers) < best[:2]:
+            best = makespan, changeovers, [(load, load.oven, load.start) for load in ordered]
+    # Loads are shared between candidate plans; restore the winner's placement
+    for load, oven, load_start in best[2]:
+        load.oven, load.start = oven, load_start
+    return Schedule([load for load, _, _ in best[2]], ovens, racks, changeover,
+                    _parse_clock(start), orders, scale_factors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan oven loads for an order book")
+    parser.add_argument("orders", help="CSV, JSONL or JSON order file (cookie type, qty, size)")
+    parser.add_argument("--ovens", type=int, default=DEFAULT_OVENS, help="ovens available")
+    parser.add_argument("--racks", type=int, default=DEFAULT_RACKS, help="trays per oven load")
+    parser.add_argument("--tray-capacity", type=int, default=DEFAULT_TRAY_CAPACITY,
+                        help=f"cookies per tray at {REFERENCE_SIZE} g (scaled for other sizes)")
+    parser.add_argument("--changeover", type=float, default=DEFAULT_CHANGEOVER,
+                        help="minutes to change an oven's temperature")
+    parser.add_argument("--start", default=DEFAULT_START, help="start of the bake day (HH:MM)")
+    parser.add_argument("--workbook", help="also generate a calculator workbook with a Production Schedule sheet")
+    args = parser.parse_args(argv)
+
+    from costing import CostModel
+    from orders import load_order_book, order_tuples
+
+    catalog = load_catalog()
+    model = CostModel(catalog)
+    try:
+        orders = order_tuples(catalog, load_order_book(args.orders, model))
+        schedule = schedule_orders(model, orders, ovens=args.ovens, racks=args.racks,
+                                   tray_capacity=args.tray_capacity, changeover=args.changeover,
+                                   start=args.start)
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"schedule.py: error: {exc}\n")
+
+    trays = sum(len(load.trays) for load in schedule.loads)
+    print(f"🔥 {len(orders)} orders → {trays} trays in {len(schedule.loads)} loads on {args.ovens} ovens")
+    print(f"  Makespan:    {schedule.makespan:g} min ({schedule.clock(0)}-{schedule.clock(schedule.makespan)}),"
+          f" lower bound {schedule.lower_bound:.0f} min")
+    print(f"  Changeovers: {schedule.changeovers}")
+
+    if args.workbook:
+        from generate_cookie_calculator import create_cookie_calculator
+
+        create_cookie_calculator(catalog, filename=args.workbook, order_rows=len(orders), orders=orders,
+                                 schedule=schedule, verbose=False)
+        print(f"✅ Production Schedule written to {args.workbook}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Midnight Dough Price Sensitivity
+Monte Carlo and what-if analysis of cost per cookie under ingredient price
+changes
+
+Features:
+- Per-ingredient price distributions (lognormal, normal, uniform or
+  triangular, as relative changes) with a default volatility for the rest
+- What-if shocks (e.g. butter +25%) that shift prices before sampling and
+  give a deterministic scenario cost
+- 100k price vectors evaluated in one matrix product per block of recipes:
+  samples x ingredients multipliers times the recipe x ingredient cost
+  matrix, so memory stays bounded however many recipes there are
+- Cost per cookie is linear in size, so percentile bands for every
+  standard size come from one set of per-gram percentiles
+- Variance drivers: each ingredient's share of a recipe's cost variance
+  (covariance with the total, so the shares add up to 100%)
+- "Sensitivity" sheet in the calculator workbook, bands as CSV
+
+Spec file (JSON, changes are relative: 0.25 = +25%; shocks must stay above
+-100%, so every price stays positive):
+    {"default": {"dist": "lognormal", "sigma": 0.1},
+     "ingredients": {"Unsalted Butter": {"dist": "lognormal", "sigma": 0.3},
+                     "Dark Chocolate Chunks": {"dist": "uniform", "low": -0.1, "high": 0.4}},
+     "shocks": {"Unsalted Butter": 0.25}}
+
+Usage:
+    python sensitivity.py [--spec spec.json] [--volatility 0.1] [--shock "Unsalted Butter=+25%"]
+        [--samples 100000] [--seed 0] [-o bands.csv] [--workbook calculator.xlsx]
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from catalog import load_catalog
+from costing import CostModel
+from pricing_export import STANDARD_SIZES
+
+DEFAULT_SAMPLES = 100_000
+DEFAULT_VOLATILITY = 0.10
+PERCENTILES = (5, 25, 50, 75, 95)
+TOP_DRIVERS = 3
+# Recipes evaluated per matrix product; bounds memory at samples x block floats
+RECIPE_BLOCK = 64
+
+DISTRIBUTIONS = ("lognormal", "normal", "uniform", "triangular")
+
+
+def _check_dist(name, spec):
+    dist = spec.get("dist", "lognormal")
+    if dist not in DISTRIBUTIONS:
+        raise ValueError(f"{name}: unknown distribution {dist!r} (expected one of {', '.join(DISTRIBUTIONS)})")
+    required = {"lognormal": ("sigma",), "normal": ("sd",), "uniform": ("low", "high"),
+                "triangular": ("low", "mode", "high")}[dist]
+    missing = [key for key in required if key not in spec]
+    if missing:
+        raise ValueError(f"{name}: {dist} needs {', '.join(missing)}")
+    return dict(spec, dist=dist)
+
+
+def sample_multipliers(specs, n, rng):
+    """
+    (n, len(specs)) price multipliers, one column per ingredient spec.
+    Lognormal draws have mean 1; the others are 1 + the relative change,
+    floored at zero.
+    """
+    out = np.empty((n, len(specs)))
+    for i, spec in enumerate(specs):
+        dist = spec["dist"]
+        if dist == "lognormal":
+            sigma = float(spec["sigma"])
+            out[:, i] = np.exp(sigma * rng.standard_normal(n) - sigma * sigma / 2)
+            continue
+        if dist == "normal":
+            change = float(spec["sd"]) * rng.standard_normal(n)
+        elif dist == "uniform":
+            change = rng.uniform(float(spec["low"]), float(spec["high"]), n)
+        else:
+            change = rng.triangular(float(spec["low"]), float(spec["mode"]), float(spec["high"]), n)
+        out[:, i] = np.maximum(1.0 + change, 0.0)
+    return out
+
+
+class Sensitivity:
+    """
+    Monte Carlo result for every recipe. Per-gram arrays are cost of one
+    gram of dough (Recipe Costs "Cost per Gram"); multiply by a size for
+    cost per cookie.
+    """
+
+    def __init__(self, model, specs, shocks=None, samples=DEFAULT_SAMPLES, seed=0, sizes=STANDARD_SIZES):
+        catalog = model.catalog
+        self.model = model
+        self.samples = int(samples)
+        self.sizes = tuple(sizes)
+        self.specs = specs
+        self.shocks = {name: shock_change(name, pct) for name, pct in (shocks or {}).items()}
+
+        shock = np.ones(len(catalog.ingredients))
+        for name, pct in self.shocks.items():
+            shock[catalog.ingredient_index[catalog.ingredient_ids[name]]] = 1.0 + pct
+        prices = model.unit_prices * shock
+        total_dough = np.array([rec.total_dough for rec in catalog.recipes], dtype=float)
+        per_gram = np.divide(1.0, total_dough, out=np.zeros_like(total_dough), where=total_dough > 0)
+
+        self.base_per_gram = model.batch_costs * per_gram
+        self.scenario_per_gram = (model.amounts @ prices) * per_gram
+
+        rng = np.random.default_rng(seed)
+        start = perf_counter()
+        multipliers = sample_multipliers(specs, self.samples, rng)
+        centered = multipliers - multipliers.mean(axis=0)
+        n_recipes = len(catalog.recipes)
+        self.percentiles = np.empty((n_recipes, len(PERCENTILES)))
+        self.mean_per_gram = np.empty(n_recipes)
+        # shares[i, r]: ingredient i's share of recipe r's cost variance
+        self.shares = np.zeros((len(catalog.ingredients), n_recipes))
+        for lo in range(0, n_recipes, RECIPE_BLOCK):
+            hi = min(lo + RECIPE_BLOCK, n_recipes)
+            # (ingredients, block) cost per gram contributed by each ingredient at shocked prices
+            weights = (model.amounts[lo:hi] * prices).T * per_gram[lo:hi]
+            costs = multipliers @ weights
+            self.percentiles[lo:hi] = np.percentile(costs, PERCENTILES, axis=0).T
+            self.mean_per_gram[lo:hi] = costs.mean(axis=0)
+            costs -= costs.mean(axis=0)
+            variance = np.einsum("ij,ij->j", costs, costs)
+            covariance = centered.T @ costs
+            self.shares[:, lo:hi] = np.divide(weights * covariance, variance,
+                                              out=np.zeros_like(covariance), where=variance > 0)
+        self.seconds = perf_counter() - start
+
+    def bands(self):
+        """One dict per (recipe, size): base, scenario, mean and percentile costs per cookie."""
+        rows = []
+        for r, rec in enumerate(self.model.catalog.recipes):
+            for size in self.sizes:
+                row = {
+                    "recipe": rec.name,
+                    "size": size,
+                    "base": float(self.base_per_gram[r] * size),
+                    "scenario": float(self.scenario_per_gram[r] * size),
+                    "mean": float(self.mean_per_gram[r] * size),
+                }
+                for pct, value in zip(PERCENTILES, self.percentiles[r]):
+                    row[f"p{pct}"] = float(value * size)
+                rows.append(row)
+        return rows
+
+    def top_drivers(self, k=TOP_DRIVERS):
+        """Per recipe, the ``k`` ingredients with the largest share of cost variance."""
+        catalog = self.model.catalog
+        rows = []
+        for r, rec in enumerate(catalog.recipes):
+            order = np.argsort(-self.shares[:, r])[:k]
+            for rank, i in enumerate(order.tolist(), 1):
+                if self.shares[i, r] <= 0:
+                    break
+                rows.append({"recipe": rec.name, "rank": rank, "ingredient": catalog.ingredients[i].name,
+                             "share": float(self.shares[i, r]), "spec": self.specs[i]})
+        return rows
+
+
+def describe_spec(spec):
+    """Short label for a price distribution, e.g. "lognormal σ 10%"."""
+    dist = spec["dist"]
+    if dist == "lognormal":
+        return f"lognormal σ {spec['sigma']:.0%}"
+    if dist == "normal":
+        return f"normal sd {spec['sd']:.0%}"
+    if dist == "uniform":
+        return f"uniform {spec['low']:+.0%} to {spec['high']:+.0%}"
+    return f"triangular {spec['low']:+.0%} / {spec['mode']:+.0%} / {spec['high']:+.0%}"
+
+
+def ingredient_specs(catalog, spec=None, volatility=DEFAULT_VOLATILITY):
+    """One distribution per catalog ingredient from a spec dict (see module docstring)."""
+    spec = spec or {}
+    default = _check_dist("default", spec.get("default", {"dist": "lognormal", "sigma": volatility}))
+    overrides = spec.get("ingredients", {})
+    unknown = sorted(set(overrides) - set(catalog.ingredient_ids))
+    if unknown:
+        raise ValueError(f"unknown ingredient(s) in spec: {', '.join(map(repr, unknown))}")
+    return [_check_dist(ing.name, overrides[ing.name]) if ing.name in overrides else default
+            for ing in catalog.ingredients]
+
+
+def shock_change(name, value):
+    """``value`` as a float; ValueError unless it is a finite change above -100%."""
+    try:
+        change = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}: shock must be a number, got {value!r}") from None
+    if not (math.isfinite(change) and change > -1):
+        raise ValueError(f"{name}: shock must be a finite change above -100%, got {change:+.0%}")
+    return change
+
+
+def parse_shock(text):
+    """"Unsalted Butter=+25%" -> ("Unsalted Butter", 0.25)."""
+    name, sep, value = text.rpartition("=")
+    name, value = name.strip(), value.strip()
+    if not sep or not name:
+        raise ValueError(f"expected INGREDIENT=CHANGE, got {text!r}")
+    try:
+        pct = float(value[:-1]) / 100 if value.endswith("%") else float(value)
+    except ValueError:
+        raise ValueError(f"{name}: shock must be a number or percentage, got {value!r}") from None
+    return name, shock_change(name, pct)
+
+
+def spec_shocks(spec):
+    """Validated {ingredient: change} from a spec dict's "shocks"."""
+    shocks = spec.get("shocks", {})
+    if not isinstance(shocks, dict):
+        raise ValueError('"shocks" must map ingredient names to changes')
+    return {name: shock_change(name, pct) for name, pct in shocks.items()}
+
+
+def write_bands_csv(analysis, path):
+    columns = ["recipe", "size", "base", "scenario", "mean"] + [f"p{pct}" for pct in PERCENTILES]
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=columns)
+        writer.writeheader()
+        for row in analysis.bands():
+            writer.writerow({key: round(value, 6) if isinstance(value, float) else value
+                             for key, value in row.items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo cost-per-cookie sensitivity to ingredient prices")
+    parser.add_argument("--spec", help="JSON file with price distributions and shocks")
+    parser.add_argument("--volatility", type=float, default=DEFAULT_VOLATILITY,
+                        help="lognormal sigma for ingredients without a distribution")
+    parser.add_argument("--shock", action="append", default=[], metavar="INGREDIENT=CHANGE",
+                        help='what-if price change, e.g. "Unsalted Butter=+25%%" (repeatable)')
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="price vectors to sample")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the percentile bands to this CSV file")
+    parser.add_argument("--workbook", help="also generate a calculator workbook with a Sensitivity sheet")
+    args = parser.parse_args(argv)
+    if args.samples < 2:
+        parser.error("--samples must be at least 2")
+
+    catalog = load_catalog()
+    try:
+        spec = {}
+        if args.spec:
+            with open(args.spec, encoding="utf-8") as fh:
+                spec = json.load(fh)
+            if not isinstance(spec, dict):
+                raise ValueError(f"{args.spec}: expected a JSON object")
+        specs = ingredient_specs(catalog, spec, args.volatility)
+        shocks = spec_shocks(spec)
+        shocks.update(parse_shock(text) for text in args.shock)
+        unknown = sorted(set(shocks) - set(catalog.ingredient_ids))
+        if unknown:
+            raise ValueError(f"unknown ingredient(s) in shocks: {', '.join(map(repr, unknown))}")
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"sensitivity.py: error: {exc}\n")
+
+    analysis = Sensitivity(CostModel(catalog), specs, shocks, args.samples, args.seed)
+    print(f"🎲 {analysis.samples:,} price vectors x {len(catalog.recipes)} recipes in {analysis.seconds:.2f} s\n")
+    size = 55 if 55 in analysis.sizes else analysis.sizes[0]
+    print(f"  Cost per {size:g} g cookie{'':<14} {'base':>7} {'p5':>7} {'p50':>7} {'p95':>7}")
+    for row in analysis.bands():
+        if row["size"] == size:
+            print(f"  {row['recipe']:<30} ${row['base']:>6.3f} ${row['p5']:>6.3f} ${row['p50']:>6.3f}"
+                  f" ${row['p95']:>6.3f}")
+    print("\n  Top variance drivers")
+    for row in analysis.top_drivers(1):
+        print(f"  {row['recipe']:<30} {row['ingredient']:<25} {row['share']:>6.1%}")
+
+    if args.output:
+        write_bands_csv(analysis, args.output)
+    if args.workbook:
+        from generate_cookie_calculator import create_cookie_calculator
+
+        create_cookie_calculator(catalog, filename=args.workbook, verbose=False, sensitivity=analysis)
+        print(f"✅ Sensitivity sheet written to {args.workbook}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Shared fixtures. The report modules are flat scripts in Reports/, so the
+folder goes on sys.path the same way the benchmarks do it.
+"""
+
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+REPORTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPORTS_DIR)
+
+from catalog import DATA_DIR, INGREDIENTS_FILE, RECIPES_FILE, load_catalog  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def catalog(tmp_path_factory):
+    """Catalog of the shipped src/data, cached outside the repo."""
+    return load_catalog(cache_dir=str(tmp_path_factory.mktemp("catalog_cache")))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Editable copy of the ingredients and recipes JSON files."""
+    path = tmp_path / "data"
+    path.mkdir()
+    for name in (INGREDIENTS_FILE, RECIPES_FILE):
+        shutil.copy(os.path.join(DATA_DIR, name), path / name)
+    return path
+
+
+@pytest.fixture
+def edit_data(data_dir):
+    """edit_data(file name, fn): apply ``fn`` to the parsed JSON in data_dir and write it back."""
+
+    def edit(name, fn):
+        path = data_dir / name
+        data = json.loads(path.read_text(encoding="utf-8"))
+        fn(data)
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    return edit
+
+
+def _odd_dough(data):
+    # Total dough that differs from yield x size, e.g. after weighing a batch
+    recipe = data["recipes"][0]
+    recipe["totalDough"] = round(recipe["baseYield"] * recipe["baseCookieSize"] * 1.15, 1)
+
+
+@pytest.fixture(params=["shipped", "odd_dough"])
+def any_catalog(request, catalog, data_dir, edit_data):
+    """The shipped catalog, and one whose first recipe's total dough isn't yield x size."""
+    if request.param == "shipped":
+        return catalog
+    edit_data(RECIPES_FILE, _odd_dough)
+    return load_catalog(str(data_dir), use_cache=False)
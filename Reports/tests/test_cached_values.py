@@ -0,0 +1,61 @@
+"""embed_cached_values stores results that agree with CostModel for every recipe."""
+
+import openpyxl
+import pytest
+
+from costing import CostModel
+from formula_engine import check_against_cost_model, embed_cached_values
+from generate_cookie_calculator import build_workbook
+from orders import OrderBook, shopping_amounts, shopping_list
+
+SIZES = (40, 48, 55, 75, 110)
+
+
+def _build(catalog, path, batch_recipe):
+    model = CostModel(catalog)
+    names = [rec.name for rec in catalog.recipes]
+    # Three orders per recipe, cycling through sizes
+    orders = [(names[i % len(names)], 12 + 7 * i, SIZES[i % len(SIZES)]) for i in range(3 * len(names))]
+    book = OrderBook(model.recipe_positions_for([o[0] for o in orders]),
+                     [o[1] for o in orders], [o[2] for o in orders])
+    wb = build_workbook(catalog, order_count=len(orders), orders=orders,
+                        shopping_amounts=shopping_amounts(shopping_list(model, book)))
+    ws = wb["Batch Calculator"]
+    ws["B4"], ws["B5"], ws["B6"] = batch_recipe, 300, 55
+    wb.save(path)
+    return embed_cached_values(str(path))
+
+
+def test_cached_values_match_cost_model(catalog, tmp_path):
+    for rec in catalog.recipes:
+        path = tmp_path / f"{rec.name}.xlsx"
+        assert _build(catalog, path, rec.name) > 0
+        assert check_against_cost_model(str(path), catalog) == [], rec.name
+
+
+def test_cached_costs_per_recipe(catalog, tmp_path):
+    model = CostModel(catalog)
+    path = tmp_path / "calculator.xlsx"
+    _build(catalog, path, catalog.recipes[0].name)
+    wb = openpyxl.load_workbook(path, data_only=True, read_only=True)
+    rows = wb["Recipe Costs"].iter_rows(min_row=2, max_row=1 + len(catalog.recipes), values_only=True)
+    for r, (rec, row) in enumerate(zip(catalog.recipes, rows)):
+        assert row[0] == rec.name
+        assert row[3] == pytest.approx(rec.total_dough)
+        assert row[4] == pytest.approx(model.batch_costs[r], rel=1e-12)
+    costed = {row[1] for row in wb["Order Calculator"].iter_rows(min_row=5, values_only=True)
+              if len(row) >= 7 and isinstance(row[0], int) and row[1] and isinstance(row[6], float)}
+    assert costed == {rec.name for rec in catalog.recipes}
+    wb.close()
+
+
+def test_check_reports_wrong_cached_value(catalog, tmp_path):
+    path = tmp_path / "calculator.xlsx"
+    _build(catalog, path, catalog.recipes[0].name)
+    wb = openpyxl.load_workbook(path)
+    # A constant where a cost formula was: the check must notice the bad number
+    wb["Recipe Costs"].cell(row=2, column=5).value = 1e6
+    wb.save(path)
+    embed_cached_values(str(path))
+    problems = check_against_cost_model(str(path), catalog)
+    assert any(catalog.recipes[0].name in problem and "cost per batch" in problem for problem in problems)
@@ -0,0 +1,43 @@
+"""The catalog cache is rebuilt when the data or the unit tables change."""
+
+import shutil
+
+import pytest
+
+import catalog as catalog_module
+from catalog import load_catalog
+
+
+@pytest.fixture
+def units_copy(tmp_path, monkeypatch):
+    path = tmp_path / "units.py"
+    shutil.copy(catalog_module.UNITS_FILE, path)
+    monkeypatch.setattr(catalog_module, "UNITS_FILE", str(path))
+    return path
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """List that gets one entry per parse_catalog call."""
+    calls = []
+    parse = catalog_module.parse_catalog
+    monkeypatch.setattr(catalog_module, "parse_catalog", lambda *contents: calls.append(1) or parse(*contents))
+    return calls
+
+
+def test_cache_reused_while_sources_unchanged(data_dir, tmp_path, units_copy, parses):
+    cache = str(tmp_path / "cache")
+    first = load_catalog(str(data_dir), cache)
+    assert load_catalog(str(data_dir), cache) is first
+    # Touched but identical content: the pickled model is reused
+    units_copy.write_bytes(units_copy.read_bytes())
+    load_catalog(str(data_dir), cache)
+    assert len(parses) == 1
+
+
+def test_units_change_invalidates_cache(data_dir, tmp_path, units_copy, parses):
+    cache = str(tmp_path / "cache")
+    load_catalog(str(data_dir), cache)
+    units_copy.write_text(units_copy.read_text(encoding="utf-8") + "\n# edited\n", encoding="utf-8")
+    load_catalog(str(data_dir), cache)
+    assert len(parses) == 2
@@ -0,0 +1,68 @@
+"""CostModel agrees with the workbook formulas, evaluated by formula_engine, for every recipe."""
+
+import zipfile
+
+import pytest
+
+from costing import CostModel, quote
+from costing import main as costing_main
+from formula_engine import load_book
+from generate_cookie_calculator import build_workbook
+
+SIZES = (30, 55, 85)
+
+
+def _evaluate(wb, path):
+    wb.save(path)
+    with zipfile.ZipFile(path) as zf:
+        return load_book(zf)
+
+
+def test_order_calculator_matches_model(any_catalog, tmp_path):
+    model = CostModel(any_catalog)
+    orders = [(rec.name, 12 + 30 * i, SIZES[i % len(SIZES)]) for i, rec in enumerate(any_catalog.recipes)]
+    book = _evaluate(build_workbook(any_catalog, order_count=len(orders), orders=orders), tmp_path / "orders.xlsx")
+
+    positions = model.recipe_positions_for([o[0] for o in orders])
+    scales = model.scale_factors(positions, [o[1] for o in orders], [o[2] for o in orders])
+    costs = model.order_costs(positions, [o[1] for o in orders], [o[2] for o in orders])
+    for row, (name, qty, size) in enumerate(orders, 5):
+        assert book.value("Order Calculator", row, 6) == pytest.approx(scales[row - 5], rel=1e-12), name
+        assert book.value("Order Calculator", row, 7) == pytest.approx(costs[row - 5], rel=1e-12), name
+        assert quote(name, qty, size, any_catalog)["cost"] == pytest.approx(costs[row - 5], rel=1e-12)
+
+
+def test_recipe_costs_match_model(any_catalog, tmp_path):
+    model = CostModel(any_catalog)
+    book = _evaluate(build_workbook(any_catalog), tmp_path / "costs.xlsx")
+    for r, rec in enumerate(any_catalog.recipes):
+        assert book.value("Recipe Costs", 2 + r, 4) == pytest.approx(rec.total_dough), rec.name
+        assert book.value("Recipe Costs", 2 + r, 5) == pytest.approx(model.batch_costs[r], rel=1e-12), rec.name
+
+
+def test_batch_calculator_matches_model(any_catalog, tmp_path):
+    model = CostModel(any_catalog)
+    total_row = 10 + len(any_catalog.used_ingredients)
+    for rec in any_catalog.recipes:
+        wb = build_workbook(any_catalog)
+        ws = wb["Batch Calculator"]
+        ws["B4"], ws["B5"], ws["B6"] = rec.name, 300, 55
+        book = _evaluate(wb, tmp_path / "batch.xlsx")
+        assert book.value("Batch Calculator", 6, 5) == pytest.approx(
+            model.batch_scale_factor(rec.name, 300, 55), rel=1e-12), rec.name
+        assert book.value("Batch Calculator", total_row, 6) == pytest.approx(
+            model.batch_cost(rec.name, 300, 55), rel=1e-12), rec.name
+
+
+@pytest.mark.parametrize("qty, size", [(0, 55), (-3, 55), (float("nan"), 55), (300, float("inf"))])
+def test_quote_rejects_bad_amounts(catalog, qty, size):
+    with pytest.raises(ValueError, match="must be a positive number"):
+        quote(catalog.recipes[0].name, qty, size, catalog)
+
+
+@pytest.mark.parametrize("args", [["nan", "55"], ["0", "55"], ["--", "-3", "55"], ["--", "300", "-inf"]])
+def test_cli_rejects_bad_amounts(catalog, capsys, args):
+    with pytest.raises(SystemExit) as info:
+        costing_main([catalog.recipes[0].name] + args)
+    assert info.value.code == 2
+    assert "must be a positive number" in capsys.readouterr().err
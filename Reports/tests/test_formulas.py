@@ -0,0 +1,87 @@
+"""Formulas only use bounded ranges: no whole-column or whole-row references."""
+
+import re
+
+import numpy as np
+import openpyxl
+import pytest
+
+from costing import CostModel
+from generate_cookie_calculator import build_workbook
+from inventory import project_book
+from orders import OrderBook, shopping_amounts, shopping_list
+from schedule import schedule_orders
+from sensitivity import Sensitivity, ingredient_specs
+
+STRING = re.compile(r'"(?:[^"]|"")*"')
+QUOTED_SHEET = re.compile(r"'(?:[^']|'')*'!")
+STRUCTURED = re.compile(r"\[[^\[\]]*\]")
+WHOLE_COLUMN = re.compile(r"(?<![A-Za-z0-9_.$])\$?[A-Z]{1,3}:\$?[A-Z]{1,3}(?![A-Za-z0-9_(\[])")
+WHOLE_ROW = re.compile(r"(?<![A-Za-z0-9_.$])\$?[0-9]+:\$?[0-9]+(?![A-Za-z0-9_])")
+
+
+def unbounded_references(formula):
+    """Whole-column (A:A) and whole-row (1:1) references in ``formula``."""
+    text = QUOTED_SHEET.sub("Sheet!", STRING.sub('""', formula))
+    while STRUCTURED.search(text):
+        text = STRUCTURED.sub("", text)
+    return WHOLE_COLUMN.findall(text) + WHOLE_ROW.findall(text)
+
+
+@pytest.mark.parametrize("formula, found", [
+    ("=VLOOKUP(A5,'Ingredient Prices'!A:F,2,FALSE)", ["A:F"]),
+    ("=SUM($G:$G)", ["$G:$G"]),
+    ("=SUM(5:5)", ["5:5"]),
+    ("=VLOOKUP(A5,PriceList,2,FALSE)", []),
+    ("=SUM('Ingredient Prices'!$A$5:$F$29)", []),
+    ('=IF(B4="A:B","",Orders[[#This Row],[Qty]])', []),
+])
+def test_unbounded_reference_detection(formula, found):
+    assert unbounded_references(formula) == found
+
+
+@pytest.fixture(scope="module")
+def full_workbook(catalog, tmp_path_factory):
+    """Calculator with every optional sheet, saved and reloaded with formulas."""
+    model = CostModel(catalog)
+    names = [rec.name for rec in catalog.recipes]
+    orders = [(names[i % len(names)], 24 + 6 * i, (30, 55, 85)[i % 3]) for i in range(12)]
+    positions = model.recipe_positions_for([o[0] for o in orders])
+    dates = np.datetime64("2026-01-05") + np.arange(len(orders)).astype("timedelta64[D]")
+    book = OrderBook(positions, np.array([o[1] for o in orders], dtype=float),
+                     np.array([o[2] for o in orders], dtype=float), dates)
+    wb = build_workbook(
+        catalog, order_count=len(orders), orders=orders,
+        shopping_amounts=shopping_amounts(shopping_list(model, book)),
+        schedule=schedule_orders(model, orders), projection=project_book(model, book),
+        sensitivity=Sensitivity(model, ingredient_specs(catalog), samples=200))
+    path = tmp_path_factory.mktemp("formulas") / "calculator.xlsx"
+    wb.save(path)
+    return openpyxl.load_workbook(path)
+
+
+def _formulas(wb):
+    for ws in wb.worksheets:
+        for row in ws.iter_rows():
+            for cell in row:
+                if isinstance(cell.value, str) and cell.value.startswith("="):
+                    yield f"{ws.title}!{cell.coordinate}", cell.value
+        for table in ws.tables.values():
+            for column in table.tableColumns:
+                if column.calculatedColumnFormula is not None:
+                    yield f"{table.name}[{column.name}]", column.calculatedColumnFormula.attr_text
+
+
+def test_workbook_has_no_unbounded_references(full_workbook):
+    assert {"Production Schedule", "Reorder Plan", "Sensitivity"} <= set(full_workbook.sheetnames)
+    formulas = list(_formulas(full_workbook))
+    assert len(formulas) > 100
+    offenders = {where: refs for where, formula in formulas if (refs := unbounded_references(formula))}
+    assert offenders == {}
+
+
+def test_defined_names_are_bounded(full_workbook):
+    names = dict(full_workbook.defined_names.items())
+    assert names
+    for name, defined in names.items():
+        assert re.search(r"\$[A-Z]+\$[0-9]+:\$[A-Z]+\$[0-9]+$", defined.attr_text), (name, defined.attr_text)
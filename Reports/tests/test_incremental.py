@@ -0,0 +1,61 @@
+"""incremental.regenerate: full build, skip when nothing changed, patch a price edit in place."""
+
+from catalog import INGREDIENTS_FILE, load_catalog
+from formula_engine import check_against_cost_model, embed_cached_values
+from generate_cookie_calculator import create_cookie_calculator
+from incremental import load_manifest, regenerate
+from workbook_dump import dump_lines
+
+
+def _raise_butter(data):
+    data["ingredients"][0]["packagePrice"] = round(data["ingredients"][0]["packagePrice"] + 0.5, 2)
+
+
+def test_regenerate_rebuilds_skips_then_patches(data_dir, edit_data, tmp_path):
+    path = str(tmp_path / "calculator.xlsx")
+
+    def run():
+        return regenerate(load_catalog(str(data_dir), use_cache=False), filename=path, order_rows=5)
+
+    status, changed = run()
+    assert status == "rebuilt" and "Ingredient Prices" in changed
+    assert load_manifest(path) is not None
+
+    assert run() == ("unchanged", [])
+
+    edit_data(INGREDIENTS_FILE, _raise_butter)
+    status, changed = run()
+    assert status == "patched"
+    assert changed == ["Ingredient Prices"]
+
+    # Cached results were refreshed for the new price
+    catalog = load_catalog(str(data_dir), use_cache=False)
+    assert check_against_cost_model(path, catalog) == []
+
+    # Same content as building from scratch
+    fresh = str(tmp_path / "fresh.xlsx")
+    create_cookie_calculator(catalog, filename=fresh, order_rows=5, verbose=False)
+    embed_cached_values(fresh)
+    assert list(dump_lines(path)) == list(dump_lines(fresh))
+
+    assert run() == ("unchanged", [])
+
+
+def test_layout_change_rebuilds(data_dir, edit_data, tmp_path):
+    path = str(tmp_path / "calculator.xlsx")
+    regenerate(load_catalog(str(data_dir), use_cache=False), filename=path, order_rows=5)
+
+    def rename(data):
+        data["ingredients"][0]["name"] = "Salted Butter"
+
+    edit_data(INGREDIENTS_FILE, rename)
+    status, _ = regenerate(load_catalog(str(data_dir), use_cache=False), filename=path, order_rows=5)
+    assert status == "rebuilt"
+
+
+def test_edited_output_rebuilds(data_dir, tmp_path):
+    path = tmp_path / "calculator.xlsx"
+    catalog = load_catalog(str(data_dir), use_cache=False)
+    regenerate(catalog, filename=str(path), order_rows=5)
+    path.write_bytes(path.read_bytes() + b"\0")
+    assert regenerate(catalog, filename=str(path), order_rows=5)[0] == "rebuilt"
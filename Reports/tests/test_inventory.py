@@ -0,0 +1,107 @@
+"""Projection, reorder_suggestions and add_order against a hand-computed dated order stream."""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from catalog import INGREDIENTS_FILE, load_catalog
+from costing import CostModel
+from generate_cookie_calculator import build_workbook
+from inventory import Projection, project_book
+from orders import load_order_book
+
+BUTTER = 1
+START = np.datetime64("2025-03-01")
+
+# One Sugar Cookie order of 24 x 48 g is exactly one base batch: 170 g of butter.
+# Butter starts at 1000 g, minimum 400 g, reordered 500 g at a time.
+#   03-02  2 orders  660 g
+#   03-04  1 order   490 g
+#   03-05  1 order   320 g  below minimum; 1 delivery needed, order by 03-02
+#   03-08  3 orders -190 g  out of stock; 2 deliveries needed, order by 03-05
+#   03-12  outside the 10 day horizon
+STREAM = ["2025-03-02", "2025-03-02", "2025-03-04", "2025-03-05",
+          "2025-03-08", "2025-03-08", "2025-03-08", "2025-03-12"]
+STOCK = [1000, 660, 660, 490, 320, 320, 320, -190, -190, -190]
+
+
+def _small_butter(data):
+    butter = next(ing for ing in data["ingredients"] if ing["id"] == BUTTER)
+    butter.update(currentStock=1000, minThreshold=400, reorderAmount=500)
+
+
+@pytest.fixture
+def model(data_dir, edit_data):
+    edit_data(INGREDIENTS_FILE, _small_butter)
+    return CostModel(load_catalog(str(data_dir), use_cache=False))
+
+
+def _projection(model, dates=STREAM):
+    projection = Projection(model, START, 10, lead_days=3)
+    r = model.recipe_position("Sugar Cookie")
+    projection.add_orders(dates, [r] * len(dates), [24] * len(dates), [48] * len(dates))
+    return projection
+
+
+def _butter(model):
+    return model.catalog.ingredient_index[BUTTER]
+
+
+def test_stock_curve_and_dates(model):
+    projection = _projection(model)
+    b = _butter(model)
+    assert projection.stock[:, b] == pytest.approx(STOCK)
+    assert projection.below_minimum()[b] == 4
+    assert projection.stockouts()[b] == 7
+
+    row = next(r for r in projection.summary() if r["ingredient_id"] == BUTTER)
+    assert row["below_min"] == np.datetime64("2025-03-05")
+    assert row["stockout"] == np.datetime64("2025-03-08")
+    assert row["projected_use"] == pytest.approx(1190)
+    assert row["deliveries"] == 2
+
+
+def test_reorder_suggestions(model):
+    rows = [r for r in _projection(model).reorder_suggestions() if r["ingredient_id"] == BUTTER]
+    assert [(str(r["order_by"]), str(r["needed_by"]), r["deliveries"], r["quantity"], r["first"])
+            for r in rows] == [("2025-03-02", "2025-03-05", 1, 500.0, True),
+                               ("2025-03-05", "2025-03-08", 1, 500.0, False)]
+
+
+def test_reorder_never_before_start(model):
+    projection = _projection(model)
+    projection.lead_days = 30
+    rows = [r for r in projection.reorder_suggestions() if r["ingredient_id"] == BUTTER]
+    # Both deliveries clamp to the first day and become one order
+    assert [(str(r["order_by"]), r["deliveries"], r["first"]) for r in rows] == [("2025-03-01", 2, True)]
+
+
+def test_add_order_matches_full_projection(model):
+    projection = _projection(model, STREAM[:4])
+    projection.stock  # computed before the new orders arrive
+    for date in STREAM[4:]:
+        projection.add_order(date, "Sugar Cookie", 24, 48)
+    full = _projection(model)
+    assert projection.usage == pytest.approx(full.usage)
+    assert projection.stock == pytest.approx(full.stock)
+    assert projection.stock[:, _butter(model)] == pytest.approx(STOCK)
+
+
+def test_dated_order_file(model, tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text("date,cookie type,qty,size\n" + "".join(f"{d},Sugar Cookie,24,48\n" for d in STREAM))
+    book = load_order_book(str(path), model, dated=True)
+    projection = project_book(model, book, start="2025-03-01", days=10, lead_days=3)
+    assert projection.stock[:, _butter(model)] == pytest.approx(STOCK)
+
+
+def test_reorder_plan_sheet(model):
+    projection = _projection(model)
+    ws = build_workbook(model.catalog, projection=projection)["Reorder Plan"]
+    # Summary rows sit under the header in row 4, the reorder list follows
+    summary = ws.iter_rows(min_row=5, max_row=4 + len(projection.summary()), values_only=True)
+    rows = {row[2]: row for row in summary}
+    assert rows["Unsalted Butter"][:2] == (datetime.date(2025, 3, 5), datetime.date(2025, 3, 8))
+    # Never below minimum: both date cells stay empty
+    assert rows["Granulated Sugar"][:2] == (None, None)
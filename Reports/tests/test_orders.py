@@ -0,0 +1,65 @@
+"""Order files: CSV, JSONL and JSON arrays, with bad orders reported by file and line."""
+
+import json
+
+import pytest
+
+from costing import CostModel
+from orders import iter_orders, load_order_book
+
+
+@pytest.fixture
+def model(catalog):
+    return CostModel(catalog)
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_formats_agree(tmp_path, model, catalog):
+    names = [rec.name for rec in catalog.recipes[:3]]
+    orders = [{"recipe": name, "qty": 10 * (i + 1), "size": 55} for i, name in enumerate(names)]
+    csv_path = _write(tmp_path, "orders.csv", "recipe,qty,size\n"
+                      + "".join(f"{o['recipe']},{o['qty']},{o['size']}\n" for o in orders))
+    jsonl_path = _write(tmp_path, "orders.jsonl", "".join(json.dumps(o) + "\n" for o in orders))
+    json_path = _write(tmp_path, "orders.json", json.dumps(orders, indent=2))
+
+    books = [load_order_book(path, model) for path in (csv_path, jsonl_path, json_path)]
+    for book in books[1:]:
+        assert book.positions.tolist() == books[0].positions.tolist()
+        assert book.qty.tolist() == books[0].qty.tolist()
+        assert book.size.tolist() == books[0].size.tolist()
+
+
+def test_json_array_line_numbers(tmp_path, catalog):
+    name = catalog.recipes[0].name
+    path = _write(tmp_path, "orders.json", json.dumps(
+        [{"recipe": name, "qty": 1, "size": 55}, {"recipe": name, "qty": 2, "size": 55}], indent=2))
+    assert [line_no for line_no, *_ in iter_orders(path)] == [2, 7]
+    assert list(iter_orders(_write(tmp_path, "empty.json", " [ ]\n"))) == []
+
+
+@pytest.mark.parametrize("name, text, message", [
+    ("orders.jsonl", '{"recipe": "{r}", "qty": 1, "size": 55}\n{"recipe": "{r}", "size": 55}\n',
+     "orders.jsonl:2: no 'qty'"),
+    ("orders.jsonl", '{"recipe": "{r}", "qty": 1, "size": 55}\n{"recipe": \n', "orders.jsonl:2: invalid JSON"),
+    ("orders.jsonl", '["{r}", 1, 55]\n', "orders.jsonl:1: expected an order object"),
+    ("orders.jsonl", '{"recipe": "{r}", "qty": 0, "size": 55}\n', "orders.jsonl:1: qty must be a positive"),
+    ("orders.csv", "recipe,qty,size\n{r},5,55\n{r},-3,55\n", "orders.csv:3: qty must be a positive"),
+    ("orders.csv", "recipe,qty,size\n{r},5,0\n", "orders.csv:2: size must be a positive"),
+    ("orders.csv", "recipe,qty,size\n{r},nan,55\n", "orders.csv:2: qty must be a positive"),
+    ("orders.json", '[\n {"recipe": "{r}", "qty": 1, "size": 55},\n {"recipe": "{r}", "qty": 1}\n]',
+     "orders.json:3: no 'size'"),
+    ("orders.json", '[\n {"recipe": "{r}", "qty": 1, "size": 55}\n {"recipe": "{r}"}\n]',
+     "orders.json:3: expected ',' or ']'"),
+    ("orders.json", '{"recipe": "{r}", "qty": 1, "size": 55}', "orders.json: expected a JSON array"),
+])
+def test_bad_orders_name_file_and_line(tmp_path, model, catalog, name, text, message):
+    path = _write(tmp_path, name, text.replace("{r}", catalog.recipes[0].name))
+    with pytest.raises(ValueError) as info:
+        load_order_book(path, model)
+    assert str(info.value).startswith(str(tmp_path / message.split(":", 1)[0]))
+    assert message.split(":", 1)[1] in str(info.value)
@@ -0,0 +1,50 @@
+"""PricingService request handling, without a socket."""
+
+import json
+from http import HTTPStatus
+
+import pytest
+
+from pricing_service import PricingService
+from quoting import quote
+
+
+@pytest.fixture
+def service(catalog):
+    return PricingService(catalog_loader=lambda: catalog)
+
+
+def test_quote(service, catalog):
+    name = catalog.recipes[0].name
+    status, payload = service.handle("GET", f"/quote?recipe={name}&qty=300&size=55")
+    assert status == HTTPStatus.OK
+    assert payload == quote(name, 300.0, 55.0, catalog)
+
+
+@pytest.mark.parametrize("qty, size", [("0", "55"), ("-5", "55"), ("300", "0"), ("nan", "55"),
+                                       ("inf", "55"), ("300", "-inf"), ("300", "NaN")])
+def test_quote_rejects_non_positive_amounts(service, catalog, qty, size):
+    status, payload = service.handle("GET", f"/quote?recipe={catalog.recipes[0].name}&qty={qty}&size={size}")
+    assert status == HTTPStatus.BAD_REQUEST
+    assert "must be a positive number" in payload["error"]
+    assert service.cache.stats()["size"] == 0
+
+
+@pytest.mark.parametrize("order", [[300, 0], [-1, 55], ["nan", 55], [300, "inf"]])
+def test_shopping_list_rejects_non_positive_amounts(service, catalog, order):
+    name = catalog.recipes[0].name
+    body = json.dumps({"orders": [[name, 10, 55], [name] + order]}).encode()
+    status, payload = service.handle("POST", "/shopping-list", body)
+    assert status == HTTPStatus.BAD_REQUEST
+    assert "must be a positive number" in payload["error"]
+
+    spec = f"{name}:{order[0]}:{order[1]}"
+    status, payload = service.handle("GET", f"/shopping-list?order={spec}")
+    assert status == HTTPStatus.BAD_REQUEST
+
+
+def test_shopping_list(service, catalog):
+    name = catalog.recipes[0].name
+    status, payload = service.handle("GET", f"/shopping-list?order={name}:300:55")
+    assert status == HTTPStatus.OK
+    assert payload["orders"] == 1 and payload["total_cost"] > 0
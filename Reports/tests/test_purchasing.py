@@ -0,0 +1,100 @@
+"""cheapest_mix against brute force, and the package mix columns of the Shopping List."""
+
+import itertools
+import math
+import random
+
+import pytest
+
+from catalog import INGREDIENTS_FILE, load_catalog
+from generate_cookie_calculator import build_workbook
+from purchasing import cheapest_mix, purchase_plan
+
+BUTTER = 1
+# 454 g block and a case of four blocks at 20% off
+BUTTER_OPTIONS = [(454, 2.69), (1816, round(4 * 2.69 * 0.8, 3))]
+
+
+def brute_force(needed, options):
+    """(cost, leftover) of the cheapest mix covering ``needed``, least leftover first among ties."""
+    # No optimal mix has more than ceil(needed/size) of one package: one fewer would still cover it
+    ranges = [range(math.ceil(needed / size) + 1) for size, _ in options]
+    best = None
+    for counts in itertools.product(*ranges):
+        amount = sum(n * size for n, (size, _) in zip(counts, options))
+        if amount >= needed:
+            key = (round(sum(n * price for n, (_, price) in zip(counts, options)), 6), amount - needed)
+            best = key if best is None or key < best else best
+    return best
+
+
+def _random_options(rng):
+    options = []
+    for _ in range(rng.randint(1, 3)):
+        size = rng.choice([rng.randint(2, 25), round(rng.uniform(2, 25), 1)])
+        options.append((size, round(size * rng.uniform(0.5, 1.5), 2)))
+    return options
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    options = _random_options(rng)
+    for needed in (rng.randint(1, 60), round(rng.uniform(0.1, 80), 1)):
+        mix = cheapest_mix(needed, options)
+        assert mix.amount >= needed
+        assert mix.cost == pytest.approx(sum(n * price for n, (_, price) in zip(mix.counts, options)))
+        cost, leftover = brute_force(needed, options)
+        assert mix.cost == pytest.approx(cost, abs=1e-6), (needed, options)
+        assert mix.leftover == pytest.approx(leftover, abs=1e-6), (needed, options)
+
+
+def test_butter_case():
+    mix = cheapest_mix(17025, BUTTER_OPTIONS)
+    assert mix.counts == (2, 9)
+    assert round(mix.cost, 2) == 82.85
+    assert mix.leftover == pytest.approx(227)
+    assert (round(mix.cost, 6), mix.leftover) == brute_force(17025, BUTTER_OPTIONS)
+    assert mix.describe("g") == "2 x 454 g + 9 x 1,816 g"
+
+
+def test_nothing_needed():
+    mix = cheapest_mix(0, BUTTER_OPTIONS)
+    assert mix.counts == (0, 0) and mix.cost == 0 and mix.describe() == "-"
+
+
+@pytest.fixture
+def butter_cases(data_dir, edit_data):
+    def add_case(data):
+        butter = next(item for item in data["ingredients"] if item["id"] == BUTTER)
+        butter["packages"] = [{"size": size, "price": price} for size, price in BUTTER_OPTIONS[1:]]
+
+    edit_data(INGREDIENTS_FILE, add_case)
+    return load_catalog(str(data_dir), use_cache=False)
+
+
+def test_purchase_plan(butter_cases):
+    assert butter_cases.ingredient(BUTTER).packages == tuple(BUTTER_OPTIONS)
+    plan = purchase_plan(butter_cases, {BUTTER: 17025, 3: 0, 7: None})
+    assert list(plan) == [BUTTER]
+    assert plan[BUTTER].counts == (2, 9)
+
+
+def test_shopping_list_mix_columns(butter_cases):
+    ws = build_workbook(butter_cases, shopping_amounts={BUTTER: 17025, 7: 30000})["Shopping List"]
+    assert [cell.value for cell in ws[4]][8:] == ["Best Package Mix", "Mix Cost", "Savings"]
+    rows = {row[0].value: row for row in ws.iter_rows(min_row=5) if row[0].value}
+    butter = rows["Unsalted Butter"]
+    assert butter[1].value == 17025
+    assert butter[8].value == "2 x 454 g + 9 x 1,816 g"
+    assert butter[9].value == pytest.approx(2 * 2.69 + 9 * BUTTER_OPTIONS[1][1])
+    r = butter[0].row
+    assert butter[10].value == f'=IF(OR(G{r}="",J{r}=""),"",G{r}-J{r})'
+    # Single-package ingredients get their (one size) mix, those without an amount none
+    assert rows["All-Purpose Flour"][8].value == "2 x 22,679 g"
+    assert rows["Granulated Sugar"][8].value is None
+
+
+def test_no_mix_columns_with_single_packages(catalog):
+    ws = build_workbook(catalog, shopping_amounts={BUTTER: 17025})["Shopping List"]
+    assert [cell.value for cell in ws[4]][-1] == "Notes"
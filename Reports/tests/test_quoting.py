@@ -0,0 +1,91 @@
+"""quoting.py (plain Python) and costing.py/orders.py (NumPy) give the same quotes and shopping lists."""
+
+import pytest
+
+import costing
+import midnight
+import quoting
+from orders import OrderBook, shopping_list
+
+SIZES = (30, 55, 85)
+
+
+@pytest.mark.parametrize("breakdown", [False, True])
+def test_quotes_agree(any_catalog, breakdown):
+    for i, rec in enumerate(any_catalog.recipes):
+        qty, size = 12 + 30 * i, SIZES[i % len(SIZES)]
+        plain = quoting.quote(rec.name, qty, size, any_catalog, breakdown=breakdown)
+        numpy = costing.quote(rec.name, qty, size, any_catalog, breakdown=breakdown)
+        assert plain.keys() == numpy.keys()
+        for key, value in numpy.items():
+            if key == "breakdown":
+                assert len(plain[key]) == len(value)
+                for got, want in zip(plain[key], value):
+                    assert got == pytest.approx(want, rel=1e-12), rec.name
+            else:
+                assert plain[key] == pytest.approx(value, rel=1e-12), (rec.name, key)
+
+
+def test_shopping_lists_agree(any_catalog):
+    model = costing.CostModel(any_catalog)
+    orders = [(rec.name, 12 + 30 * i, SIZES[i % len(SIZES)]) for i, rec in enumerate(any_catalog.recipes * 3)]
+    book = OrderBook(model.recipe_positions_for([o[0] for o in orders]),
+                     [o[1] for o in orders], [o[2] for o in orders])
+    plain = quoting.shopping_list(any_catalog, orders)
+    numpy = shopping_list(model, book)
+    assert plain == [pytest.approx(row) for row in numpy]
+
+
+def test_printed_output_agrees(catalog, capsys):
+    name = catalog.recipes[0].name
+    quoting.print_quote(quoting.quote(name, 300, 55, catalog, breakdown=True))
+    plain = capsys.readouterr().out
+    costing.main([name, "300", "55", "--breakdown"])
+    assert capsys.readouterr().out == plain
+
+
+def test_unknown_recipe(catalog):
+    with pytest.raises(KeyError, match="Unknown cookie type"):
+        quoting.quote("No Such Cookie", 1, 55, catalog)
+
+
+BAD_AMOUNTS = [0, -3, float("nan"), float("inf"), "-inf", "abc", None]
+
+
+@pytest.mark.parametrize("value", BAD_AMOUNTS)
+def test_positive_finite_rejects(value):
+    with pytest.raises(ValueError, match="qty must be a"):
+        quoting.positive_finite(value, "qty")
+
+
+@pytest.mark.parametrize("value", BAD_AMOUNTS)
+def test_quote_and_shopping_list_reject_bad_amounts(catalog, value):
+    name = catalog.recipes[0].name
+    with pytest.raises(ValueError, match="qty must be a"):
+        quoting.quote(name, value, 55, catalog)
+    with pytest.raises(ValueError, match="size must be a"):
+        quoting.quote(name, 300, value, catalog)
+    with pytest.raises(ValueError, match="qty must be a"):
+        quoting.shopping_list(catalog, [(name, 300, 55), (name, value, 55)])
+
+
+@pytest.mark.parametrize("spec", ["Chocolate Chip:0:55", "Chocolate Chip:nan:55", "Chocolate Chip:300:-2"])
+def test_order_spec_rejects_bad_amounts(spec):
+    with pytest.raises(ValueError, match="must be a positive number"):
+        quoting.parse_order_spec(spec)
+
+
+@pytest.mark.parametrize("args", [["0", "55"], ["nan", "55"], ["--", "-3", "55"], ["300", "inf"]])
+def test_midnight_quote_rejects_bad_amounts(catalog, capsys, args):
+    with pytest.raises(SystemExit) as info:
+        midnight.main(["quote", catalog.recipes[0].name] + args)
+    assert info.value.code == 2
+    assert "must be a positive number" in capsys.readouterr().err
+
+
+def test_midnight_order_file_rejects_bad_amounts(catalog, tmp_path, capsys):
+    path = tmp_path / "orders.csv"
+    path.write_text(f"recipe,qty,size\n{catalog.recipes[0].name},-5,55\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        midnight.main(["shopping-list", "-f", str(path)])
+    assert f"{path}:2: qty must be a positive number" in capsys.readouterr().err
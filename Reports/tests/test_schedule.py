@@ -0,0 +1,102 @@
+"""schedule_orders: every tray baked once, no overlaps, changeovers only at temperature switches."""
+
+import math
+from collections import Counter
+
+import pytest
+
+from costing import CostModel
+from generate_cookie_calculator import build_workbook
+from schedule import bake_profile, cookies_per_tray, schedule_orders
+
+SIZES = (30, 50, 75, 110)
+
+
+@pytest.fixture(scope="module")
+def model(catalog):
+    return CostModel(catalog)
+
+
+@pytest.fixture(scope="module")
+def orders(catalog):
+    # Every recipe (both oven temperatures in the shipped data), odd quantities
+    return [(rec.name, 13 + 17 * i, SIZES[i % len(SIZES)]) for i, rec in enumerate(catalog.recipes * 3)]
+
+
+def _by_oven(schedule):
+    ovens = {}
+    for load in schedule.loads:
+        ovens.setdefault(load.oven, []).append(load)
+    return {oven: sorted(loads, key=lambda load: load.start) for oven, loads in ovens.items()}
+
+
+def test_empty_book(model):
+    schedule = schedule_orders(model, [])
+    assert schedule.loads == []
+    assert (schedule.makespan, schedule.changeovers, schedule.lower_bound) == (0, 0, 0)
+    assert schedule.tray_rows() == []
+
+
+@pytest.mark.parametrize("ovens, racks", [(1, 2), (2, 2), (3, 1), (4, 3)])
+def test_every_tray_scheduled_once(model, catalog, orders, ovens, racks):
+    schedule = schedule_orders(model, orders, ovens=ovens, racks=racks)
+    expected = Counter()
+    for n, (name, qty, size) in enumerate(orders, 1):
+        per_tray = cookies_per_tray(size)
+        full, rest = divmod(math.ceil(qty), per_tray)
+        expected[(n, per_tray)] += full
+        if rest:
+            expected[(n, rest)] += 1
+    assert Counter(tray for load in schedule.loads for tray in load.trays) == expected
+
+    for load in schedule.loads:
+        assert 1 <= len(load.trays) <= racks
+        assert 1 <= load.oven <= ovens
+        # One temperature and bake time per load, matching each tray's recipe
+        profiles = {bake_profile(catalog.recipe(orders[n - 1][0])) for n, _ in load.trays}
+        assert profiles == {(load.temp, load.minutes)}
+
+
+@pytest.mark.parametrize("ovens", [1, 2, 3, 5])
+@pytest.mark.parametrize("changeover", [0, 15, 60])
+def test_makespan_and_changeovers(model, orders, ovens, changeover):
+    schedule = schedule_orders(model, orders, ovens=ovens, changeover=changeover)
+    assert schedule.makespan >= schedule.lower_bound
+
+    switches = 0
+    for loads in _by_oven(schedule).values():
+        for prev, load in zip(loads, loads[1:]):
+            switch = prev.temp != load.temp
+            switches += switch
+            # Loads never overlap; a changeover sits between them only at a switch
+            assert load.start >= prev.start + prev.minutes + (changeover if switch else 0)
+        assert loads[-1].start + loads[-1].minutes <= schedule.makespan
+    assert schedule.changeovers == switches
+    assert sum(row["changeover"] for row in schedule.tray_rows()) == switches
+
+
+def test_one_oven_by_hand(model):
+    # Sugar Cookie: 350 °F, 11 min, 2 trays of 12 -> one load; Snickerdoodle: 375 °F, 10 min, 1 tray
+    schedule = schedule_orders(model, [("Snickerdoodle", 12, 50), ("Sugar Cookie", 24, 50)],
+                               ovens=1, racks=2, changeover=15)
+    assert [(load.temp, load.start, load.trays) for load in schedule.loads] == [
+        (350, 0, [(2, 12), (2, 12)]), (375, 26, [(1, 12)])]
+    assert (schedule.makespan, schedule.changeovers, schedule.lower_bound) == (36, 1, 21)
+
+
+def test_single_temperature_has_no_changeovers(model, catalog):
+    cool = [rec.name for rec in catalog.recipes if bake_profile(rec)[0] == 350]
+    schedule = schedule_orders(model, [(name, 100, 50) for name in cool], ovens=2, changeover=60)
+    assert schedule.changeovers == 0
+
+
+def test_production_schedule_sheet(model, catalog, orders):
+    schedule = schedule_orders(model, orders)
+    ws = build_workbook(catalog, schedule=schedule)["Production Schedule"]
+    assert ws["B4"].value == schedule.makespan
+    assert ws["H4"].value == schedule.changeovers
+    rows = list(ws.iter_rows(min_row=7, values_only=True))
+    trays = [row for row in rows if row[1] is not None]
+    assert len(trays) == sum(len(load.trays) for load in schedule.loads)
+    assert len(rows) - len(trays) == schedule.changeovers
+    assert sum(row[9] for row in trays) == sum(math.ceil(qty) for _, qty, _ in orders)
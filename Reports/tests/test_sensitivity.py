@@ -0,0 +1,90 @@
+"""Sensitivity: shocked scenario costs against CostModel, ordered bands, shock validation."""
+
+import json
+
+import numpy as np
+import pytest
+
+from catalog import INGREDIENTS_FILE, load_catalog
+from costing import CostModel
+from sensitivity import PERCENTILES, Sensitivity, ingredient_specs, main, parse_shock
+
+BUTTER = "Unsalted Butter"
+
+
+def _analysis(catalog, shocks=None, seed=7):
+    return Sensitivity(CostModel(catalog), ingredient_specs(catalog, volatility=0.2), shocks,
+                       samples=4000, seed=seed, sizes=(30, 55))
+
+
+def test_shocked_scenario_matches_cost_model(catalog, data_dir, edit_data):
+    def raise_butter(data):
+        butter = next(ing for ing in data["ingredients"] if ing["name"] == BUTTER)
+        butter["packagePrice"] *= 1.25
+
+    edit_data(INGREDIENTS_FILE, raise_butter)
+    shocked = CostModel(load_catalog(str(data_dir), use_cache=False))
+    base = CostModel(catalog)
+    rows = _analysis(catalog, {BUTTER: 0.25}).bands()
+
+    positions = [base.recipe_position(row["recipe"]) for row in rows]
+    ones = np.ones(len(rows))
+    sizes = [row["size"] for row in rows]
+    # One cookie of each (recipe, size): cost per cookie
+    assert [row["scenario"] for row in rows] == pytest.approx(shocked.order_costs(positions, ones, sizes))
+    assert [row["base"] for row in rows] == pytest.approx(base.order_costs(positions, ones, sizes))
+    assert all(row["scenario"] > row["base"] for row in rows)
+
+
+def test_bands_are_ordered(catalog):
+    analysis = _analysis(catalog, {BUTTER: 0.25, "Dark Chocolate Chunks": -0.1})
+    for row in analysis.bands():
+        band = [row[f"p{pct}"] for pct in PERCENTILES]
+        assert band == sorted(band), row["recipe"]
+        assert band[0] <= row["mean"] <= band[-1]
+    # Variance shares of each recipe add up to 100%
+    assert analysis.shares.sum(axis=0) == pytest.approx(1)
+
+
+def test_seed_repeats(catalog):
+    assert _analysis(catalog, seed=3).bands() == _analysis(catalog, seed=3).bands()
+    assert _analysis(catalog, seed=3).bands() != _analysis(catalog, seed=4).bands()
+
+
+@pytest.mark.parametrize("text, expected", [(f"{BUTTER}=+25%", 0.25), (f"{BUTTER} = -0.5", -0.5),
+                                            ("Salt = Pepper=10%", 0.1)])
+def test_parse_shock(text, expected):
+    name, pct = parse_shock(text)
+    assert pct == pytest.approx(expected)
+    assert name == text.rpartition("=")[0].strip()
+
+
+@pytest.mark.parametrize("text", [f"{BUTTER}=lots", f"{BUTTER}=-100%", f"{BUTTER}=-1.5", f"{BUTTER}=nan",
+                                  f"{BUTTER}=inf%", "=25%", BUTTER])
+def test_parse_shock_rejects(text):
+    with pytest.raises(ValueError):
+        parse_shock(text)
+
+
+@pytest.mark.parametrize("argv", [["--shock", f"{BUTTER}=lots"], ["--shock", f"{BUTTER}=-100%"],
+                                  ["--shock", "Unobtainium=+10%"]])
+def test_cli_rejects_bad_shocks(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(argv)
+    assert exc.value.code == 2
+    assert "sensitivity.py: error:" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("shocks", [{BUTTER: "lots"}, {BUTTER: -2}, {BUTTER: None}, [BUTTER, 0.25]])
+def test_cli_rejects_bad_spec_shocks(shocks, tmp_path, capsys):
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps({"shocks": shocks}))
+    with pytest.raises(SystemExit) as exc:
+        main(["--spec", str(path)])
+    assert exc.value.code == 2
+    assert "sensitivity.py: error:" in capsys.readouterr().err
+
+
+def test_rejects_bad_shocks_in_code(catalog):
+    with pytest.raises(ValueError, match="above -100%"):
+        _analysis(catalog, {BUTTER: -1})
@@ -0,0 +1,45 @@
+"""Shared NamedStyles: the number of styles must not grow with the row count."""
+
+import re
+import zipfile
+
+import pytest
+
+from calculator_styles import BASE_STYLES
+from generate_cookie_calculator import build_workbook
+
+
+def _style_counts(path):
+    with zipfile.ZipFile(path) as zf:
+        xml = zf.read("xl/styles.xml").decode("utf-8")
+    counts = {}
+    for section in ("cellXfs", "cellStyleXfs", "cellStyles", "fonts", "fills", "borders"):
+        match = re.search(rf'<{section} count="(\d+)"', xml)
+        counts[section] = int(match.group(1)) if match else 0
+    return counts
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_style_count_independent_of_rows(catalog, tmp_path, streaming):
+    counts = []
+    for rows in (5, 500, 5000):
+        path = tmp_path / f"rows_{rows}.xlsx"
+        build_workbook(catalog, streaming=streaming, order_count=rows).save(path)
+        counts.append(_style_counts(path))
+    assert counts[0] == counts[1] == counts[2]
+
+
+def test_every_style_is_a_registered_named_style(catalog, tmp_path):
+    path = tmp_path / "calculator.xlsx"
+    build_workbook(catalog, order_count=50).save(path)
+    counts = _style_counts(path)
+    # Normal plus one NamedStyle per base style and per recipe fill
+    assert counts["cellStyles"] == 1 + len(BASE_STYLES) + len(catalog.recipes)
+    assert counts["cellXfs"] <= counts["cellStyles"]
+
+
+def test_minimal_styles_only_registers_used_styles(catalog, tmp_path):
+    full, minimal = tmp_path / "full.xlsx", tmp_path / "minimal.xlsx"
+    build_workbook(catalog).save(full)
+    build_workbook(catalog, minimal_styles=True).save(minimal)
+    assert _style_counts(minimal)["cellStyles"] < _style_counts(full)["cellStyles"]
@@ -0,0 +1,33 @@
+"""workbook_dump gives the same text for workbooks a reader can't tell apart."""
+
+import pytest
+
+from formula_engine import embed_cached_values
+from generate_cookie_calculator import create_cookie_calculator
+from workbook_dump import dump_lines, workbook_digest
+
+
+@pytest.fixture
+def build(catalog, tmp_path):
+    def build(name, **options):
+        path = str(tmp_path / name)
+        create_cookie_calculator(catalog, filename=path, verbose=False, order_rows=5, **options)
+        return path
+
+    return build
+
+
+def test_same_digest_across_writers(build):
+    paths = [build("default.xlsx"), build("streaming.xlsx", streaming=True),
+             build("reproducible.xlsx", reproducible=("stored", 0))]
+    assert len({workbook_digest(path) for path in paths}) == 1
+
+
+def test_dump_resolves_tables_and_cached_values(build):
+    path = build("calculator.xlsx")
+    embed_cached_values(path)
+    lines = list(dump_lines(path))
+    assert any(line.startswith("  table Orders A4:I10 ") for line in lines)
+    # Recipe Costs cost per batch: formula with its cached number
+    assert any(line.startswith("  E2 ") and "-> " in line for line in lines)
+    assert any('"Est. Cost ($)"' in line for line in lines)
@@ -0,0 +1,124 @@
+"""workbook_sync: an untouched workbook syncs to no changes; edits map back onto the JSON as written."""
+
+import json
+
+import openpyxl
+import pytest
+
+from catalog import INGREDIENTS_FILE, RECIPES_FILE, load_catalog
+from generate_cookie_calculator import build_workbook
+from workbook_sync import PRICE_FIRST_ROW, PRICE_SHEET, RECIPE_FIRST_ROW, RECIPE_SHEET, apply_changes, \
+    diff_workbook, main, patch_text
+
+
+def _in_pounds(data):
+    # First ingredient priced per gram but sold as a 1 lb package, with a second option
+    item = next(item for item in data["ingredients"] if item["unit"] == "g")
+    item["packageSize"], item["packageUnit"] = 1, "lb"
+    item["packages"] = [{"size": 2, "unit": "lb", "price": item["packagePrice"] * 1.8}]
+
+
+def _no_total_dough(data):
+    for recipe in data["recipes"]:
+        recipe.pop("totalDough", None)
+
+
+@pytest.fixture
+def workbook(data_dir, tmp_path):
+    """workbook(edit=None): calculator built from data_dir, optionally edited with openpyxl; returns its path."""
+
+    def build(edit=None):
+        wb = build_workbook(load_catalog(str(data_dir), use_cache=False))
+        if edit:
+            edit(wb)
+        path = tmp_path / "calculator.xlsx"
+        wb.save(path)
+        return str(path)
+
+    return build
+
+
+@pytest.mark.parametrize("edits", [[], [(INGREDIENTS_FILE, _in_pounds)], [(RECIPES_FILE, _no_total_dough)]],
+                         ids=["shipped", "package_unit", "no_total_dough"])
+def test_unchanged_workbook_has_no_changes(data_dir, edit_data, workbook, edits):
+    for name, fn in edits:
+        edit_data(name, fn)
+    changes, notes = diff_workbook(workbook(), str(data_dir))
+    assert [(c.path, c.old, c.new) for c in changes] == []
+    assert notes == []
+
+
+def test_package_size_converted_back_to_package_unit(data_dir, edit_data, workbook):
+    edit_data(INGREDIENTS_FILE, _in_pounds)
+    data = json.loads((data_dir / INGREDIENTS_FILE).read_text(encoding="utf-8"))
+    k = next(k for k, item in enumerate(data["ingredients"]) if item.get("packageUnit"))
+
+    def two_pounds(wb):
+        wb[PRICE_SHEET].cell(row=PRICE_FIRST_ROW + k, column=3).value = 907.184
+
+    changes, notes = diff_workbook(workbook(two_pounds), str(data_dir))
+    assert [(c.path, c.old, c.new) for c in changes] == [(("ingredients", k, "packageSize"), 1, 2)]
+    # The extra package option is not on the sheet and is left alone
+    assert len(notes) == 1 and "other package options" in notes[0]
+
+
+def test_unit_change_with_unitless_package_options_is_refused(data_dir, edit_data, workbook):
+    def options(data):
+        data["ingredients"][0]["packages"] = [{"size": 1000, "price": 5}]
+
+    edit_data(INGREDIENTS_FILE, options)
+
+    def kilograms(wb):
+        ws = wb[PRICE_SHEET]
+        ws.cell(row=PRICE_FIRST_ROW, column=2).value = "kg"
+        ws.cell(row=PRICE_FIRST_ROW, column=3).value = 0.454
+
+    changes, notes = diff_workbook(workbook(kilograms), str(data_dir))
+    assert changes == []
+    assert len(notes) == 1 and "not changed to 'kg'" in notes[0]
+
+
+def test_missing_total_dough_is_noted_not_replaced(data_dir, edit_data, workbook, capsys):
+    edit_data(RECIPES_FILE, _no_total_dough)
+
+    def more_dough(wb):
+        cell = wb[RECIPE_SHEET].cell(row=RECIPE_FIRST_ROW, column=4)
+        cell.value = cell.value + 100
+
+    path = workbook(more_dough)
+    changes, notes = diff_workbook(path, str(data_dir))
+    assert changes == []
+    assert len(notes) == 1 and "has no 'totalDough'" in notes[0]
+    main([path, "--apply", "--data-dir", str(data_dir)])
+    assert "Updated" not in capsys.readouterr().out
+
+
+def test_apply_edits_only_the_changed_value(data_dir, workbook):
+    before = (data_dir / INGREDIENTS_FILE).read_text(encoding="utf-8")
+
+    def new_price(wb):
+        wb[PRICE_SHEET].cell(row=PRICE_FIRST_ROW, column=4).value = 3.19
+
+    changes, _ = diff_workbook(workbook(new_price), str(data_dir))
+    apply_changes(changes, str(data_dir))
+    after = (data_dir / INGREDIENTS_FILE).read_text(encoding="utf-8")
+    assert json.loads(after)["ingredients"][0]["packagePrice"] == 3.19
+    assert len(after.splitlines()) == len(before.splitlines())
+    assert sum(a != b for a, b in zip(after.splitlines(), before.splitlines())) == 1
+
+
+def test_patch_text_missing_path():
+    with pytest.raises(ValueError, match="/recipes/0/totalDough"):
+        patch_text('{"recipes": [{"baseYield": 24}]}', {("recipes", 0, "totalDough"): 1200})
+
+
+def test_notes_column_round_trips(data_dir, workbook, catalog):
+    def relabel(wb):
+        ws = wb[PRICE_SHEET]
+        assert ws.cell(row=PRICE_FIRST_ROW - 1, column=7).value == "Notes"
+        assert ws.cell(row=PRICE_FIRST_ROW, column=7).value == catalog.ingredients[0].notes != ""
+        ws.cell(row=PRICE_FIRST_ROW, column=7).value = "Standard 1lb block, salted on request"
+
+    changes, notes = diff_workbook(workbook(relabel), str(data_dir))
+    assert [(c.path, c.new) for c in changes] == [(("ingredients", 0, "notes"), "Standard 1lb block, salted on request")]
+    assert notes == []
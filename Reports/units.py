@@ -0,0 +1,159 @@
+"""
+Midnight Dough Unit Conversions
+Python side of src/lib/conversions.ts, used to normalize recipes and
+package sizes into each ingredient's price unit
+
+Features:
+- Same unit table as the web app (weight -> grams, volume -> ml, count)
+- Weight <-> volume through a per-ingredient density (g/ml)
+- Each <-> weight/volume through a per-ingredient weight of one item
+  (conversions.ts does not convert count units and returns the amount
+  unchanged; here it is converted, or a ValueError says the weight is missing)
+- Conversion factors are memoized, so normalizing a whole catalog costs a
+  few dictionary lookups per recipe line
+
+Densities and item weights come from the ingredient's "density" and
+"gramsEach" fields in src/data/ingredients.json, falling back to the tables
+below and then to DEFAULT_DENSITY (water, as in conversions.ts).
+
+Usage:
+    python units.py 2 cup g --ingredient "All-Purpose Flour"
+"""
+
+import argparse
+from functools import lru_cache
+
+# unit -> (category, size in the category's base unit: grams, ml or items)
+UNITS = {
+    # Weight (base: grams)
+    "g": ("weight", 1.0),
+    "kg": ("weight", 1000.0),
+    "oz": ("weight", 28.3495),
+    "lb": ("weight", 453.592),
+    # Volume (base: ml)
+    "ml": ("volume", 1.0),
+    "l": ("volume", 1000.0),
+    "cup": ("volume", 236.588),
+    "tbsp": ("volume", 14.787),
+    "tsp": ("volume", 4.929),
+    "fl_oz": ("volume", 29.5735),
+    # Count
+    "each": ("count", 1.0),
+}
+
+# Spellings accepted in the JSON data
+UNIT_ALIASES = {"ea": "each", "fl oz": "fl_oz", "L": "l", "tablespoon": "tbsp", "teaspoon": "tsp"}
+
+DEFAULT_DENSITY = 1.0
+
+# g/ml for ingredients measured by volume in common recipes
+DENSITIES = {
+    "Unsalted Butter": 0.911,
+    "Granulated Sugar": 0.845,
+    "Brown Sugar (Light)": 0.93,
+    "Brown Sugar (Dark)": 0.93,
+    "All-Purpose Flour": 0.507,
+    "Cornstarch": 0.541,
+    "Dutch-Process Cocoa": 0.359,
+    "Old-Fashioned Oats": 0.38,
+    "Baking Powder": 0.913,
+    "Baking Soda": 0.913,
+    "Cream of Tartar": 0.761,
+    "Sour Cream": 1.01,
+    "Vanilla Extract": 0.879,
+    "Lemon Juice (fresh)": 1.03,
+    "Lemon Zest": 0.406,
+    "Espresso Powder": 0.406,
+    "Ground Cinnamon": 0.528,
+    "Salt (Kosher)": 0.609,
+    "Flaky Sea Salt": 0.507,
+}
+
+# Grams per item for ingredients counted by the each
+GRAMS_EACH = {
+    "Eggs (large)": 50.0,
+    "Egg Yolk": 18.0,
+}
+
+
+def canonical_unit(unit):
+    """Unit key for ``unit`` as spelled in the data; ValueError if unknown."""
+    unit = UNIT_ALIASES.get(unit, unit)
+    if unit not in UNITS:
+        unit = UNIT_ALIASES.get(str(unit).strip().lower(), str(unit).strip().lower())
+    if unit not in UNITS:
+        raise ValueError(f"unknown unit {unit!r} (expected one of {', '.join(UNITS)})")
+    return unit
+
+
+def _to_grams(category, density, grams_each):
+    # Grams per base unit of ``category`` (1 g, 1 ml or 1 item)
+    if category == "weight":
+        return 1.0
+    if category == "volume":
+        return density
+    if grams_each is None:
+        raise ValueError("no weight per item to convert 'each' to weight or volume")
+    return grams_each
+
+
+@lru_cache(maxsize=None)
+def conversion_factor(from_unit, to_unit, density=DEFAULT_DENSITY, grams_each=None):
+    """Multiplier taking an amount in ``from_unit`` to ``to_unit``."""
+    from_unit, to_unit = canonical_unit(from_unit), canonical_unit(to_unit)
+    if from_unit == to_unit:
+        return 1.0
+    from_category, from_base = UNITS[from_unit]
+    to_category, to_base = UNITS[to_unit]
+    if from_category == to_category:
+        return from_base / to_base
+    # Cross-category: through grams
+    grams = from_base * _to_grams(from_category, density, grams_each)
+    return grams / (to_base * _to_grams(to_category, density, grams_each))
+
+
+def convert(amount, from_unit, to_unit, density=DEFAULT_DENSITY, grams_each=None):
+    """
+    Convert between any two units. Weight and volume give the same results
+    as convert() in conversions.ts; "each" is converted through
+    ``grams_each`` (ValueError without it), where conversions.ts returns the
+    amount unchanged.
+    """
+    if amount == 0:
+        return 0
+    return amount * conversion_factor(from_unit, to_unit, density, grams_each)
+
+
+def ingredient_density(name, density=None):
+    """g/ml for an ingredient: its own field, else DENSITIES, else DEFAULT_DENSITY."""
+    if density:
+        return float(density)
+    return DENSITIES.get(name, DEFAULT_DENSITY)
+
+
+def ingredient_grams_each(name, grams_each=None):
+    """Grams per item for an ingredient, or None if unknown."""
+    if grams_each:
+        return float(grams_each)
+    return GRAMS_EACH.get(name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert an amount between baking units")
+    parser.add_argument("amount", type=float)
+    parser.add_argument("from_unit")
+    parser.add_argument("to_unit")
+    parser.add_argument("--ingredient", help="ingredient name, for its density / weight per item")
+    args = parser.parse_args(argv)
+
+    name = args.ingredient or ""
+    try:
+        result = convert(args.amount, args.from_unit, args.to_unit,
+                         ingredient_density(name), ingredient_grams_each(name))
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(f"{args.amount:g} {args.from_unit} = {result:,.4g} {args.to_unit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Midnight Dough Workbook Dump
+Canonical text form of an xlsx: what a reader sees, without the zip and
+XML details that change from run to run
+
+Features:
+- Per sheet: state, column widths, merges, tables, data validations, then
+  every cell in row order with its value, formula and cached result, and
+  style
+- Strings resolved whether inline or shared, numbers in one spelling, so
+  the dump does not depend on shared-string order, zip timestamps,
+  compression or in-memory vs streaming output
+- Styles named after their NamedStyle and listed once at the end with their
+  number format, font, fill, border and alignment; style ids and unused
+  styles don't show
+- Sheets are streamed with iterparse, so large order books dump in flat
+  memory
+- --digest prints a SHA-256 of the dump: equal digests mean the workbooks
+  are equivalent and the upload can be skipped
+- --compare shows a unified diff of two workbooks' dumps (exit status 1 if
+  they differ)
+
+Usage:
+    python workbook_dump.py calculator.xlsx [-o calculator.txt]
+    python workbook_dump.py --digest calculator.xlsx [more.xlsx ...]
+    python workbook_dump.py --compare old.xlsx new.xlsx
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS
+from openpyxl.utils import get_column_letter
+
+from formula_engine import NS_MAIN, ExcelError, cell_value, shared_strings, sheet_parts, table_parts
+
+# Cells with these tags are reported; the rest of a sheet's XML is layout
+SHEET_TAGS = ("c", "col", "mergeCell", "dataValidation", "tablePart")
+MAX_DIFF_LINES = 200
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _canonical(el):
+    """Element as tag(attr=value ... child(...)) with sorted attributes, no namespaces."""
+    parts = [f"{_local(key)}={value}" for key, value in sorted(el.attrib.items())]
+    parts += [_canonical(child) for child in el]
+    if el.text and el.text.strip():
+        parts.append(json.dumps(el.text, ensure_ascii=False))
+    return f"{_local(el.tag)}({' '.join(parts)})"
+
+
+def _text(value):
+    """A cell value (formula_engine.cell_value) in one spelling: JSON strings, TRUE/FALSE, shortest numbers."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, ExcelError):
+        return value.code
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+class _Styles:
+    """Cell format index -> readable label, with a description per label."""
+
+    def __init__(self, zf):
+        try:
+            root = ET.fromstring(zf.read("xl/styles.xml"))
+        except KeyError:
+            root = ET.Element("styleSheet")
+        formats = {int(fmt.get("numFmtId")): fmt.get("formatCode") for fmt in root.iter(f"{NS_MAIN}numFmt")}
+
+        def items(section, tag):
+            node = root.find(f"{NS_MAIN}{section}")
+            return [] if node is None else node.findall(f"{NS_MAIN}{tag}")
+
+        fonts, fills, borders = items("fonts", "font"), items("fills", "fill"), items("borders", "border")
+        names = {int(style.get("xfId", 0)): style.get("name") for style in items("cellStyles", "cellStyle")}
+
+        def pick(elements, index):
+            return _canonical(elements[int(index)]) if index is not None and int(index) < len(elements) else "-"
+
+        self.xfs = []
+        for xf in items("cellXfs", "xf"):
+            fmt_id = int(xf.get("numFmtId", 0))
+            described = [f"numFmt={formats.get(fmt_id, BUILTIN_FORMATS.get(fmt_id, fmt_id))}",
+                         pick(fonts, xf.get("fontId")), pick(fills, xf.get("fillId")),
+                         pick(borders, xf.get("borderId"))]
+            described += [_canonical(child) for child in xf]
+            self.xfs.append((names.get(int(xf.get("xfId", 0)), "Normal"), " ".join(described)))
+        # description -> label, label -> description, in first-use order
+        self.labels = {}
+        self.used = {}
+
+    def label(self, index):
+        name, description = self.xfs[index] if index < len(self.xfs) else ("?", f"missing format {index}")
+        label = self.labels.get(description)
+        if label is None:
+            label = name
+            n = 1
+            while label in self.used:
+                n += 1
+                label = f"{name}~{n}"
+            self.labels[description] = label
+            self.used[label] = description
+        return label
+
+
+def _cell_line(el, strings, styles):
+    f = el.find(f"{NS_MAIN}f")
+    value = _text(cell_value(el, strings))
+    parts = [el.get("r")]
+    style = int(el.get("s", 0))
+    if style:
+        parts.append("@" + styles.label(style))
+    if f is not None:
+        formula = "=" + (f.text or "")
+        if f.get("t") in ("array", "shared"):
+            formula += f" [{f.get('t')} {f.get('ref') or f.get('si')}]"
+        parts.append(formula)
+        if value is not None:
+            parts.append("-> " + value)
+    elif value is not None:
+        parts.append(value)
+    return " ".join(parts)
+
+
+def _table_lines(zf, part):
+    lines = []
+    for path in table_parts(zf, part):
+        table = ET.fromstring(zf.read(path))
+        lines.append(f"  table {table.get('displayName')} {table.get('ref')} "
+                     + " ".join(_canonical(child) for child in table))
+    return lines
+
+
+def dump_lines(filename):
+    """Yield the canonical text of ``filename`` line by line."""
+    with zipfile.ZipFile(filename) as zf:
+        strings = shared_strings(zf)
+        styles = _Styles(zf)
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+        for dn in workbook.iter(f"{NS_MAIN}definedName"):
+            scope = f" (sheet {dn.get('localSheetId')})" if dn.get("localSheetId") is not None else ""
+            yield f"name {dn.get('name')}{scope} = {dn.text}"
+        states = {sheet.get("name"): sheet.get("state", "visible") for sheet in workbook.iter(f"{NS_MAIN}sheet")}
+
+        for title, part in sheet_parts(zf).items():
+            yield f"sheet {json.dumps(title, ensure_ascii=False)}"
+            if states.get(title, "visible") != "visible":
+                yield f"  state {states[title]}"
+            layout, merges = [], []
+            cells = []
+            with zf.open(part) as fh:
+                for _, el in ET.iterparse(fh):
+                    tag = _local(el.tag)
+                    if tag not in SHEET_TAGS:
+                        if tag == "row":
+                            # Flush the row's cells and drop them from the tree
+                            yield from cells
+                            cells.clear()
+                            el.clear()
+                        continue
+                    if tag == "c":
+                        line = _cell_line(el, strings, styles)
+                        if " " in line:
+                            cells.append("  " + line)
+                    elif tag == "col":
+                        first, last = int(el.get("min")), int(el.get("max"))
+                        span = get_column_letter(first) + (f":{get_column_letter(last)}" if last != first else "")
+                        attrs = " ".join(f"{key}={el.get(key)}" for key in ("width", "hidden", "style")
+                                         if el.get(key) is not None)
+                        layout.append(f"  col {span} {attrs}")
+                    elif tag == "mergeCell":
+                        merges.append(el.get("ref"))
+                    elif tag == "dataValidation":
+                        layout.append(f"  validation {el.get('sqref')} {_canonical(el)}")
+            yield from cells
+            yield from layout
+            for ref in sorted(merges):
+                yield f"  merge {ref}"
+            yield from _table_lines(zf, part)
+
+    for label, description in styles.used.items():
+        yield f"style {label}: {description}"
+
+
+def dump_text(filename):
+    return "\n".join(dump_lines(filename)) + "\n"
+
+
+def workbook_digest(filename):
+    """SHA-256 of the canonical dump; equal for workbooks a reader can't tell apart."""
+    digest = hashlib.sha256()
+    for line in dump_lines(filename):
+        digest.update(line.encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dump xlsx workbooks to a canonical text form")
+    parser.add_argument("workbooks", nargs="+", help="xlsx files")
+    parser.add_argument("-o", "--output", help="write the dump here instead of stdout")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--digest", action="store_true", help="print a SHA-256 of each workbook's dump")
+    mode.add_argument("--compare", action="store_true", help="diff the dumps of two workbooks")
+    args = parser.parse_args(argv)
+    if args.compare and len(args.workbooks) != 2:
+        parser.error("--compare takes exactly two workbooks")
+    if not (args.digest or args.compare) and len(args.workbooks) != 1:
+        parser.error("dump one workbook at a time (or use --digest)")
+
+    try:
+        if args.digest:
+            for filename in args.workbooks:
+                print(f"{workbook_digest(filename)}  {filename}")
+        elif args.compare:
+            old, new = args.workbooks
+            diff = list(difflib.unified_diff(list(dump_lines(old)), list(dump_lines(new)), old, new, lineterm=""))
+            if not diff:
+                print(f"✅ {old} and {new} have the same content")
+                return
+            print("\n".join(diff[:MAX_DIFF_LINES]))
+            if len(diff) > MAX_DIFF_LINES:
+                print(f"... {len(diff) - MAX_DIFF_LINES} more diff lines")
+            sys.exit(1)
+        elif args.output:
+            with open(args.output, "w", encoding="utf-8") as fh:
+                fh.writelines(line + "\n" for line in dump_lines(args.workbooks[0]))
+        else:
+            for line in dump_lines(args.workbooks[0]):
+                print(line)
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError) as exc:
+        parser.exit(2, f"workbook_dump.py: error: {exc}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Midnight Dough Workbook Sync
+Reads prices and recipe amounts edited in a calculator workbook back into
+the JSON data files
+
+Features:
+- Opens the workbook read-only and streams the Ingredient Prices and Recipe
+  Database rows, so memory stays flat however many rows the sheets have
+- Diffs them against src/data/ingredients.json and recipes.json: package
+  price, package size, unit, category and notes per ingredient; yield, size, total
+  dough and every line's amount and category per recipe
+- Reports each change (price changes with old/new and percent)
+- --patch writes the changes as a JSON Patch (RFC 6902) per data file
+- --apply edits only the changed values in the JSON text, so the files
+  keep their layout and the git diff shows just the edited numbers
+- Package sizes sold in another unit ("packageUnit") are converted back
+  from the sheet's price unit, as recipe line amounts are
+- Rows that no longer match the data (renamed ingredients, added or
+  reordered recipe lines) are reported and left alone, and so are values
+  the JSON does not have (a recipe without "totalDough") and the extra
+  package options ("packages"), which the sheet does not show
+
+Usage:
+    python workbook_sync.py edited_calculator.xlsx [--patch changes.json] [--apply]
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+from json.decoder import scanstring
+
+from catalog import DATA_DIR, INGREDIENTS_FILE, RECIPES_FILE, source_paths
+from units import canonical_unit, conversion_factor, ingredient_density, ingredient_grams_each
+
+PRICE_SHEET = "Ingredient Prices"
+RECIPE_SHEET = "Recipe Database"
+# First data rows, as laid out by generate_cookie_calculator.py
+PRICE_FIRST_ROW = 5
+RECIPE_FIRST_ROW = 4
+
+# Ingredient Prices column -> (JSON key, label); Price per Unit (E) is a formula
+PRICE_COLUMNS = ((1, "unit", "unit"), (2, "packageSize", "package size"),
+                 (3, "packagePrice", "package price"), (5, "category", "category"), (6, "notes", "notes"))
+RECIPE_COLUMNS = ((1, "baseYield", "base yield"), (2, "baseCookieSize", "base size"),
+                  (3, "totalDough", "total dough"))
+
+
+class Change:
+    __slots__ = ("file", "path", "old", "new", "label")
+
+    def __init__(self, file, path, old, new, label):
+        self.file = file
+        self.path = path
+        self.old = old
+        self.new = new
+        self.label = label
+
+    @property
+    def key(self):
+        return self.path[-1]
+
+    def describe(self):
+        if self.key == "packagePrice":
+            pct = f" ({(self.new - self.old) / self.old:+.1%})" if self.old else ""
+            return f"{self.label}: ${self.old:,.2f} → ${self.new:,.2f}{pct}"
+        return f"{self.label}: {self.old!r} → {self.new!r}"
+
+
+# =============================================================================
+# JSON TEXT PATCHING
+# =============================================================================
+
+_WS = re.compile(r"\s*")
+_DECODER = json.JSONDecoder()
+
+
+def value_spans(text):
+    """{path: (start, end)} of every scalar in a JSON document; paths are tuples of keys and indexes."""
+    spans = {}
+
+    def skip(pos):
+        return _WS.match(text, pos).end()
+
+    def walk(pos, path):
+        pos = skip(pos)
+        if text[pos] == "{":
+            pos = skip(pos + 1)
+            if text[pos] == "}":
+                return pos + 1
+            while True:
+                key, pos = scanstring(text, pos + 1)
+                pos = walk(skip(pos) + 1, path + (key,))
+                pos = skip(pos)
+                if text[pos] == "}":
+                    return pos + 1
+                pos = skip(pos + 1)
+        if text[pos] == "[":
+            pos = skip(pos + 1)
+            if text[pos] == "]":
+                return pos + 1
+            index = 0
+            while True:
+                pos = skip(walk(pos, path + (index,)))
+                if text[pos] == "]":
+                    return pos + 1
+                pos += 1
+                index += 1
+        _, end = _DECODER.raw_decode(text, pos)
+        spans[path] = (pos, end)
+        return end
+
+    walk(0, ())
+    return spans
+
+
+def patch_text(text, values):
+    """``text`` with the scalars at the given paths ({path: value}) replaced in place."""
+    spans = value_spans(text)
+    for path in values:
+        if path not in spans:
+            raise ValueError(f"no value at {_pointer(path)} to replace")
+    for path, value in sorted(values.items(), key=lambda item: spans[item[0]][0], reverse=True):
+        start, end = spans[path]
+        text = text[:start] + json.dumps(value, ensure_ascii=False) + text[end:]
+    return text
+
+
+def _pointer(path):
+    return "".join("/" + str(p).replace("~", "~0").replace("/", "~1") for p in path)
+
+
+def json_patch(changes):
+    """{file name: RFC 6902 operations} for ``changes``."""
+    patch = {}
+    for change in changes:
+        patch.setdefault(change.file, []).append(
+            {"op": "replace", "path": _pointer(change.path), "value": change.new})
+    return patch
+
+
+def apply_changes(changes, data_dir=DATA_DIR):
+    """Write ``changes`` into the JSON files under ``data_dir``; returns the files touched."""
+    touched = []
+    for file_name in json_patch(changes):
+        path = os.path.join(data_dir, file_name)
+        with open(path, encoding="utf-8") as fh:
+            text = fh.read()
+        values = {change.path: change.new for change in changes if change.file == file_name}
+        patched = patch_text(text, values)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(patched)
+        os.replace(tmp, path)
+        touched.append(path)
+    return touched
+
+
+# =============================================================================
+# WORKBOOK DIFF
+# =============================================================================
+
+def _number(value):
+    # Spreadsheet numbers back to the shortest float (or int) they stand for
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(f"{value:.12g}")
+    return int(value) if value.is_integer() else value
+
+
+def _same(old, new):
+    if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+        return math.isclose(old, new, rel_tol=1e-9, abs_tol=1e-12)
+    return old == new
+
+
+def _json_number(old, new):
+    # Keep ints as ints in the JSON when the edit is a whole number
+    return int(new) if isinstance(old, int) and float(new).is_integer() else new
+
+
+class _Diff:
+    def __init__(self, ingredients, recipes):
+        self.ingredients = ingredients
+        self.recipes = recipes
+        self.ingredient_rows = {item["name"]: k for k, item in enumerate(ingredients)}
+        self.ingredient_names = {item["id"]: item["name"] for item in ingredients}
+        self.recipe_rows = {item["name"]: k for k, item in enumerate(recipes)}
+        self.seen_recipes = set()
+        self.changes = []
+        self.notes = []
+
+    def compare(self, file, path, old, new, label):
+        if not _same(old, new):
+            self.changes.append(Change(file, path, old, new, label))
+
+    def price_row(self, row_no, row):
+        name = row[0]
+        if name is None:
+            return
+        if name not in self.ingredient_rows:
+            self.notes.append(f"{PRICE_SHEET}!A{row_no}: {name!r} is not in {INGREDIENTS_FILE}, skipped")
+            return
+        k = self.ingredient_rows[name]
+        item = self.ingredients[k]
+        # Unit the sheet's package size is in; None if the sheet's unit can't be used
+        unit = canonical_unit(item["unit"])
+        changes = len(self.changes)
+        for col, key, label in PRICE_COLUMNS:
+            value = row[col] if col < len(row) else None
+            old = item.get(key)
+            if key in ("packageSize", "packagePrice"):
+                new = _number(value)
+                if new is None or new <= 0:
+                    self.notes.append(f"{PRICE_SHEET}!{'ABCDEF'[col]}{row_no}: {label} of {name} "
+                                      f"must be a positive number, got {value!r}")
+                    continue
+                if key == "packageSize" and unit is None:
+                    continue
+                if key == "packageSize" and item.get("packageUnit"):
+                    # The sheet shows the package in the price unit; the JSON keeps packageUnit
+                    factor = conversion_factor(item["packageUnit"], unit,
+                                               ingredient_density(name, item.get("density")),
+                                               ingredient_grams_each(name, item.get("gramsEach")))
+                    # Unchanged unless the sheet value differs from the converted JSON size
+                    new = old if _same(old * factor, value) else _number(new / factor)
+                new = _json_number(old, new)
+            elif key == "unit":
+                try:
+                    if canonical_unit(value) == unit:
+                        continue
+                    new = canonical_unit(value)
+                except ValueError as exc:
+                    self.notes.append(f"{PRICE_SHEET}!B{row_no}: {exc}; package size skipped")
+                    unit = None
+                    continue
+                if any("unit" not in option for option in item.get("packages", ())):
+                    self.notes.append(f"{PRICE_SHEET}!B{row_no}: unit of {name} not changed to {new!r}: "
+                                      f"its package options in {INGREDIENTS_FILE} are in {old!r}; "
+                                      f"package size skipped")
+                    unit = None
+                    continue
+                unit = new
+            else:
+                new = "" if value is None else str(value)
+                if key not in item:
+                    # Nothing to replace in the JSON
+                    if new:
+                        self.notes.append(f"{PRICE_SHEET}!{'ABCDEFG'[col]}{row_no}: {label} of {name} is {new!r}, "
+                                          f"but {INGREDIENTS_FILE} has no {key!r} for it; add it there by hand")
+                    continue
+                old = old or ""
+            self.compare(INGREDIENTS_FILE, ("ingredients", k, key), old, new, f"{name} {label}")
+        if item.get("packages") and any(c.key in ("packageSize", "packagePrice") for c in self.changes[changes:]):
+            self.notes.append(f"{PRICE_SHEET}!A{row_no}: {name}'s other package options in {INGREDIENTS_FILE} "
+                              f"are not on the sheet and were left as they are")
+
+    def recipe_rows_for(self, rows):
+        """Compare one recipe's contiguous block of (row_no, row) pairs."""
+        first_no, first = rows[0]
+        name = first[0]
+        if name not in self.recipe_rows:
+            self.notes.append(f"{RECIPE_SHEET}!A{first_no}: recipe {name!r} is not in {RECIPES_FILE}, skipped")
+            return
+        if name in self.seen_recipes:
+            self.notes.append(f"{RECIPE_SHEET}!A{first_no}: more rows for {name} after other recipes, skipped")
+            return
+        self.seen_recipes.add(name)
+        k = self.recipe_rows[name]
+        recipe = self.recipes[k]
+        # Yield / size / dough are read from the recipe's first line, as the Recipe Costs sheet does
+        for col, key, label in RECIPE_COLUMNS:
+            new = _number(first[col])
+            if new is None or new <= 0:
+                self.notes.append(f"{RECIPE_SHEET}!{'ABCD'[col]}{first_no}: {label} of {name} "
+                                  f"must be a positive number, got {first[col]!r}")
+                continue
+            if key not in recipe:
+                # Nothing to replace: the sheet shows the default, yield x size
+                if not _same(recipe["baseYield"] * recipe["baseCookieSize"], new):
+                    self.notes.append(f"{RECIPE_SHEET}!{'ABCD'[col]}{first_no}: {label} of {name} is {new!r}, "
+                                      f"but {RECIPES_FILE} has no {key!r} for it; add it there by hand")
+                continue
+            old = recipe.get(key)
+            self.compare(RECIPES_FILE, ("recipes", k, key), old, _json_number(old, new), f"{name} {label}")
+
+        lines = recipe["ingredients"]
+        if len(rows) != len(lines):
+            self.notes.append(f"{RECIPE_SHEET}: {name} has {len(rows)} rows but {len(lines)} ingredient lines "
+                              f"in {RECIPES_FILE}; lines skipped")
+            return
+        for j, ((row_no, row), line) in enumerate(zip(rows, lines)):
+            ing_name = self.ingredient_names.get(line["ingredientId"])
+            if row[4] != ing_name:
+                self.notes.append(f"{RECIPE_SHEET}!E{row_no}: {name} line {j + 1} is {row[4]!r}, "
+                                  f"{RECIPES_FILE} has {ing_name!r}; skipped")
+                continue
+            amount = _number(row[5])
+            if amount is None or amount < 0:
+                self.notes.append(f"{RECIPE_SHEET}!F{row_no}: amount of {ing_name} in {name} "
+                                  f"must be a number, got {row[5]!r}")
+            else:
+                if "unit" in line:
+                    # The sheet shows the amount in the ingredient's unit; the line keeps its own
+                    item = self.ingredients[self.ingredient_rows[ing_name]]
+                    factor = conversion_factor(line["unit"], item["unit"],
+                                               ingredient_density(ing_name, item.get("density")),
+                                               ingredient_grams_each(ing_name, item.get("gramsEach")))
+                    amount = _number(amount / factor)
+                    # Unchanged unless the sheet value differs from the converted JSON amount
+                    if _same(line["amount"] * factor, row[5]):
+                        amount = line["amount"]
+                self.compare(RECIPES_FILE, ("recipes", k, "ingredients", j, "amount"), line["amount"],
+                             _json_number(line["amount"], amount), f"{name} / {ing_name} amount")
+            category = "" if row[7] is None else str(row[7])
+            self.compare(RECIPES_FILE, ("recipes", k, "ingredients", j, "category"), line.get("category", ""),
+                         category, f"{name} / {ing_name} category")
+
+
+def diff_workbook(path, data_dir=DATA_DIR):
+    """
+    (changes, notes) between a calculator workbook and the JSON data.
+    Sheets are streamed row by row (read_only); only one recipe's rows are
+    held at a time.
+    """
+    import openpyxl
+
+    ingredients_path, recipes_path = source_paths(data_dir)
+    with open(ingredients_path, encoding="utf-8") as fh:
+        ingredients = json.load(fh)["ingredients"]
+    with open(recipes_path, encoding="utf-8") as fh:
+        recipes = json.load(fh)["recipes"]
+    diff = _Diff(ingredients, recipes)
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in (PRICE_SHEET, RECIPE_SHEET):
+            if sheet not in wb.sheetnames:
+                raise ValueError(f"{path}: no {sheet!r} sheet")
+
+        rows = wb[PRICE_SHEET].iter_rows(min_row=PRICE_FIRST_ROW, max_col=7, values_only=True)
+        for row_no, row in enumerate(rows, PRICE_FIRST_ROW):
+            diff.price_row(row_no, row)
+
+        block = []
+        rows = wb[RECIPE_SHEET].iter_rows(min_row=RECIPE_FIRST_ROW, max_col=8, values_only=True)
+        for row_no, row in enumerate(rows, RECIPE_FIRST_ROW):
+            if row[0] is None:
+                continue
+            if block and row[0] != block[0][1][0]:
+                diff.recipe_rows_for(block)
+                block = []
+            block.append((row_no, row))
+        if block:
+            diff.recipe_rows_for(block)
+    finally:
+        wb.close()
+    return diff.changes, diff.notes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync prices and recipe amounts edited in a workbook "
+                                                 "back into the JSON data files")
+    parser.add_argument("workbook", help="edited calculator xlsx")
+    parser.add_argument("--patch", metavar="FILE", help="write the changes as JSON Patch operations per data file")
+    parser.add_argument("--apply", action="store_true", help="write the changes into the JSON data files")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory with ingredients.json and recipes.json")
+    args = parser.parse_args(argv)
+
+    try:
+        changes, notes = diff_workbook(args.workbook, args.data_dir)
+    except (OSError, ValueError, KeyError) as exc:
+        parser.exit(2, f"workbook_sync.py: error: {exc}\n")
+
+    prices = [c for c in changes if c.key == "packagePrice"]
+    print(f"💲 {len(prices)} price changes, {len(changes) - len(prices)} other changes in {args.workbook}")
+    for change in prices:
+        print(f"  {change.describe()}")
+    for change in changes:
+        if change.key != "packagePrice":
+            print(f"  {change.describe()}")
+    for note in notes:
+        print(f"  ⚠ {note}")
+
+    try:
+        if args.patch:
+            with open(args.patch, "w", encoding="utf-8") as fh:
+                json.dump(json_patch(changes), fh, indent=2, ensure_ascii=False)
+                fh.write("\n")
+        if args.apply and changes:
+            for path in apply_changes(changes, args.data_dir):
+                print(f"✅ Updated {path}")
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"workbook_sync.py: error: {exc}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ export interface Ingredient {
   packageSize: number
   packagePrice: number
   category: string
+  notes?: string             // Package description for staff, e.g. "Standard 1lb block"
   // Inventory tracking
   currentStock?: number      // Current amount in stock (in base units)
   minThreshold?: number      // Minimum threshold before alert